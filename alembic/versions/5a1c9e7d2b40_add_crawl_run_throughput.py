@@ -0,0 +1,37 @@
+"""add_crawl_run_throughput
+
+Revision ID: 5a1c9e7d2b40
+Revises: b2ce1ed92abc
+Create Date: 2026-10-17 09:12:03.114820
+
+Adds throughput metrics to crawl_run (concurrent crawl pipeline):
+- pages_total / pages_succeeded / pages_failed
+- wall_time_seconds / pages_per_second
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5a1c9e7d2b40"
+down_revision: Union[str, Sequence[str], None] = "b2ce1ed92abc"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("crawl_run", sa.Column("pages_total", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("crawl_run", sa.Column("pages_succeeded", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("crawl_run", sa.Column("pages_failed", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("crawl_run", sa.Column("wall_time_seconds", sa.Numeric(precision=10, scale=3), nullable=True))
+    op.add_column("crawl_run", sa.Column("pages_per_second", sa.Numeric(precision=10, scale=3), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("crawl_run", "pages_per_second")
+    op.drop_column("crawl_run", "wall_time_seconds")
+    op.drop_column("crawl_run", "pages_failed")
+    op.drop_column("crawl_run", "pages_succeeded")
+    op.drop_column("crawl_run", "pages_total")
@@ -0,0 +1,50 @@
+"""snapshot_signals_pointer
+
+Revision ID: a7c3e9d2f184
+Revises: f5d3b7a2c941
+Create Date: 2026-10-17 21:12:44.903127
+
+A snapshot of an unchanged page points at the snapshot whose signals it
+reuses instead of holding a copy of them:
+- page_snapshot.signals_snapshot_id (FK page_snapshot.id, NULL = own signals)
+
+Signals already copied by earlier runs stay where they are; they are
+still valid rows of their own snapshot.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "a7c3e9d2f184"
+down_revision: Union[str, Sequence[str], None] = "f5d3b7a2c941"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("page_snapshot", sa.Column("signals_snapshot_id", sa.BigInteger(), nullable=True))
+    op.create_foreign_key(
+        "fk_page_snapshot_signals_snapshot_id",
+        "page_snapshot",
+        "page_snapshot",
+        ["signals_snapshot_id"],
+        ["id"],
+    )
+
+
+def downgrade() -> None:
+    # Snapshots that only pointed at their signals get a copy back
+    op.execute(
+        """
+        INSERT INTO detected_signal
+            (source_type, snapshot_id, taxonomy_id, raw_text_found, signal_fingerprint, confidence_score)
+        SELECT d.source_type, s.id, d.taxonomy_id, d.raw_text_found, d.signal_fingerprint, d.confidence_score
+        FROM page_snapshot s
+        JOIN detected_signal d ON d.snapshot_id = s.signals_snapshot_id
+        """
+    )
+    op.drop_constraint("fk_page_snapshot_signals_snapshot_id", "page_snapshot", type_="foreignkey")
+    op.drop_column("page_snapshot", "signals_snapshot_id")
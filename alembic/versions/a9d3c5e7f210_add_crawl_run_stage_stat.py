@@ -0,0 +1,54 @@
+"""add_crawl_run_stage_stat
+
+Revision ID: a9d3c5e7f210
+Revises: f41b6d8e2a57
+Create Date: 2026-10-17 13:02:18.550417
+
+Adds per-stage timing instrumentation of crawl runs:
+- crawl_run_stage_stat: latency histogram + bytes of one pipeline stage,
+  per run / competitor / platform (unique run_id, scope, scope_key, stage)
+- ix_crawl_run_stage_stat_stage_scope (stage, scope, scope_key, run_id) for trends
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "a9d3c5e7f210"
+down_revision: Union[str, Sequence[str], None] = "f41b6d8e2a57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "crawl_run_stage_stat",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("run_id", sa.BigInteger(), nullable=False),
+        sa.Column("scope", sa.String(length=20), nullable=False),
+        sa.Column("scope_key", sa.String(length=100), nullable=False, server_default=""),
+        sa.Column("stage", sa.String(length=50), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_seconds", sa.Numeric(precision=12, scale=3), nullable=False, server_default="0"),
+        sa.Column("p50_seconds", sa.Numeric(precision=10, scale=3), nullable=True),
+        sa.Column("p95_seconds", sa.Numeric(precision=10, scale=3), nullable=True),
+        sa.Column("max_seconds", sa.Numeric(precision=10, scale=3), nullable=True),
+        sa.Column("bytes_total", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("histogram", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.ForeignKeyConstraint(["run_id"], ["crawl_run.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("run_id", "scope", "scope_key", "stage", name="uq_crawl_run_stage_stat"),
+    )
+    op.create_index(
+        "ix_crawl_run_stage_stat_stage_scope",
+        "crawl_run_stage_stat",
+        ["stage", "scope", "scope_key", "run_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_crawl_run_stage_stat_stage_scope", table_name="crawl_run_stage_stat")
+    op.drop_table("crawl_run_stage_stat")
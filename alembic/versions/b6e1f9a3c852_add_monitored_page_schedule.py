@@ -0,0 +1,39 @@
+"""add_monitored_page_schedule
+
+Revision ID: b6e1f9a3c852
+Revises: a9d3c5e7f210
+Create Date: 2026-10-17 13:41:07.226190
+
+Adds due-queue scheduling of monitored pages:
+- monitored_page.next_due_at / crawl_interval_seconds (filled by the
+  scheduler on its first tick from the clients' subscription tiers)
+- ix_monitored_page_next_due_at (next_due_at) WHERE is_active
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "b6e1f9a3c852"
+down_revision: Union[str, Sequence[str], None] = "a9d3c5e7f210"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("monitored_page", sa.Column("next_due_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("monitored_page", sa.Column("crawl_interval_seconds", sa.Integer(), nullable=True))
+    op.create_index(
+        "ix_monitored_page_next_due_at",
+        "monitored_page",
+        ["next_due_at"],
+        postgresql_where=sa.text("is_active"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_monitored_page_next_due_at", table_name="monitored_page")
+    op.drop_column("monitored_page", "crawl_interval_seconds")
+    op.drop_column("monitored_page", "next_due_at")
@@ -0,0 +1,37 @@
+"""add_page_change_detection
+
+Revision ID: c3d8e1f04a92
+Revises: 5a1c9e7d2b40
+Create Date: 2026-10-17 10:02:47.530196
+
+Adds conditional-GET validators and normalized body hash:
+- monitored_page.etag / last_modified / content_hash / last_fetched_at
+- page_snapshot.content_hash
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c3d8e1f04a92"
+down_revision: Union[str, Sequence[str], None] = "5a1c9e7d2b40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("monitored_page", sa.Column("etag", sa.String(length=512), nullable=True))
+    op.add_column("monitored_page", sa.Column("last_modified", sa.String(length=64), nullable=True))
+    op.add_column("monitored_page", sa.Column("content_hash", sa.String(length=64), nullable=True))
+    op.add_column("monitored_page", sa.Column("last_fetched_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("page_snapshot", sa.Column("content_hash", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("page_snapshot", "content_hash")
+    op.drop_column("monitored_page", "last_fetched_at")
+    op.drop_column("monitored_page", "content_hash")
+    op.drop_column("monitored_page", "last_modified")
+    op.drop_column("monitored_page", "etag")
@@ -0,0 +1,31 @@
+"""add_crawl_run_shards
+
+Revision ID: c3f7a1d9e024
+Revises: b6e1f9a3c852
+Create Date: 2026-10-17 16:41:09.281734
+
+Adds fan-out bookkeeping to crawl_run:
+- shards_total: shard jobs enqueued by the run coordinator
+- shards_done: shard jobs finished (the last one enqueues the finalizer)
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c3f7a1d9e024"
+down_revision: Union[str, Sequence[str], None] = "b6e1f9a3c852"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("crawl_run", sa.Column("shards_total", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("crawl_run", sa.Column("shards_done", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    op.drop_column("crawl_run", "shards_done")
+    op.drop_column("crawl_run", "shards_total")
@@ -0,0 +1,52 @@
+"""add_deep_crawl_url
+
+Revision ID: d8a2e5c71b46
+Revises: c3f7a1d9e024
+Create Date: 2026-10-17 17:20:44.903512
+
+Adds the persisted deep crawl frontier:
+- deep_crawl_url: one sitemap URL per competitor (unique competitor_id, url)
+  with its sitemap lastmod, last fetch, content hash and product
+- ix_deep_crawl_url_refresh (competitor_id, last_fetched_at) for the rolling refresh
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "d8a2e5c71b46"
+down_revision: Union[str, Sequence[str], None] = "c3f7a1d9e024"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "deep_crawl_url",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("competitor_id", sa.BigInteger(), nullable=False),
+        sa.Column("url", sa.String(length=2048), nullable=False),
+        sa.Column("sitemap_lastmod", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("first_seen_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("last_seen_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("last_fetched_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("content_hash", sa.String(length=64), nullable=True),
+        sa.Column("product_id", sa.BigInteger(), nullable=True),
+        sa.Column("fetch_failures", sa.Integer(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["competitor_id"], ["competitor.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["product_id"], ["product.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("competitor_id", "url", name="uq_deep_crawl_url"),
+    )
+    op.create_index(
+        "ix_deep_crawl_url_refresh",
+        "deep_crawl_url",
+        ["competitor_id", "last_fetched_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_deep_crawl_url_refresh", table_name="deep_crawl_url")
+    op.drop_table("deep_crawl_url")
@@ -0,0 +1,52 @@
+"""add_directus_asset
+
+Revision ID: e4b9c2f86a13
+Revises: d8a2e5c71b46
+Create Date: 2026-10-17 18:02:51.377160
+
+Adds the Directus upload deduplication map used by core.asset_uploader:
+- directus_asset: source URL / content hash (SHA-256) → Directus file id
+- uq_directus_asset_source_url (source_url)
+- uq_directus_asset_hash_no_url (content_hash) WHERE source_url IS NULL
+- ix_directus_asset_content_hash (content_hash) for identical-bytes lookups
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "e4b9c2f86a13"
+down_revision: Union[str, Sequence[str], None] = "d8a2e5c71b46"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "directus_asset",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("source_url", sa.String(length=2048), nullable=True),
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("file_id", postgresql.UUID(as_uuid=False), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("uq_directus_asset_source_url", "directus_asset", ["source_url"], unique=True)
+    op.create_index(
+        "uq_directus_asset_hash_no_url",
+        "directus_asset",
+        ["content_hash"],
+        unique=True,
+        postgresql_where=sa.text("source_url IS NULL"),
+    )
+    op.create_index("ix_directus_asset_content_hash", "directus_asset", ["content_hash"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_directus_asset_content_hash", table_name="directus_asset")
+    op.drop_index("uq_directus_asset_hash_no_url", table_name="directus_asset")
+    op.drop_index("uq_directus_asset_source_url", table_name="directus_asset")
+    op.drop_table("directus_asset")
@@ -0,0 +1,86 @@
+"""add_catalog_upsert_keys
+
+Revision ID: e7f2a4b91c03
+Revises: c3d8e1f04a92
+Create Date: 2026-10-17 11:18:05.214873
+
+Adds the unique keys used by the set-based catalog writer (ON CONFLICT):
+- product (competitor_id, sku)
+- product (competitor_id, url) WHERE sku IS NULL
+- product_variant (product_id, sku) NULLS NOT DISTINCT
+
+Existing duplicates (created by the old SELECT-then-INSERT path) are merged
+first: the oldest product row is kept and variants / price history are
+re-pointed to it.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e7f2a4b91c03"
+down_revision: Union[str, Sequence[str], None] = "c3d8e1f04a92"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_DUPLICATE_PRODUCTS = """
+    SELECT id, keep_id FROM (
+        SELECT id, MIN(id) OVER (PARTITION BY {partition}) AS keep_id
+        FROM product
+        WHERE {where}
+    ) ranked
+    WHERE id <> keep_id
+"""
+
+
+def _merge_duplicate_products(partition: str, where: str) -> None:
+    dupes = _DUPLICATE_PRODUCTS.format(partition=partition, where=where)
+    op.execute(
+        f"UPDATE product_variant v SET product_id = d.keep_id FROM ({dupes}) d WHERE v.product_id = d.id"
+    )
+    op.execute(
+        f"UPDATE price_history h SET product_id = d.keep_id FROM ({dupes}) d WHERE h.product_id = d.id"
+    )
+    op.execute(f"DELETE FROM product p USING ({dupes}) d WHERE p.id = d.id")
+
+
+def upgrade() -> None:
+    _merge_duplicate_products("competitor_id, sku", "sku IS NOT NULL")
+    _merge_duplicate_products("competitor_id, url", "sku IS NULL")
+
+    # Variants: keep the oldest row per (product_id, sku), NULL SKUs included
+    op.execute(
+        """
+        DELETE FROM product_variant v
+        USING product_variant older
+        WHERE older.product_id = v.product_id
+          AND older.sku IS NOT DISTINCT FROM v.sku
+          AND older.id < v.id
+        """
+    )
+
+    op.create_index(
+        "uq_product_competitor_sku", "product", ["competitor_id", "sku"], unique=True
+    )
+    op.create_index(
+        "uq_product_competitor_url_no_sku",
+        "product",
+        ["competitor_id", "url"],
+        unique=True,
+        postgresql_where=sa.text("sku IS NULL"),
+    )
+    op.create_unique_constraint(
+        "uq_product_variant_sku",
+        "product_variant",
+        ["product_id", "sku"],
+        postgresql_nulls_not_distinct=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_product_variant_sku", "product_variant", type_="unique")
+    op.drop_index("uq_product_competitor_url_no_sku", table_name="product")
+    op.drop_index("uq_product_competitor_sku", table_name="product")
@@ -0,0 +1,70 @@
+"""add_signal_fingerprint
+
+Revision ID: f41b6d8e2a57
+Revises: e7f2a4b91c03
+Create Date: 2026-10-17 12:03:41.902337
+
+Adds set-based diffing support:
+- detected_signal.signal_fingerprint (md5 of whitespace-normalized text), backfilled
+  in batches with core.models.signal_fingerprint itself: Postgres' regex whitespace does not
+  match Unicode spaces such as U+00A0, so a SQL backfill would not match new rows
+- ix_detected_signal_snapshot_fingerprint (snapshot_id, signal_fingerprint)
+- ix_page_snapshot_run_id
+- ix_page_snapshot_page_status_created (monitored_page_id, status, created_at)
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from core.models import signal_fingerprint
+
+# revision identifiers, used by Alembic.
+revision: str = "f41b6d8e2a57"
+down_revision: Union[str, Sequence[str], None] = "e7f2a4b91c03"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 5000
+
+
+def upgrade() -> None:
+    op.add_column("detected_signal", sa.Column("signal_fingerprint", sa.String(length=32), nullable=True))
+
+    # Fingerprints computed by the function new rows use (keyset batches by id)
+    bind = op.get_bind()
+    select_batch = sa.text(
+        "SELECT id, raw_text_found FROM detected_signal "
+        "WHERE raw_text_found IS NOT NULL AND id > :last_id ORDER BY id LIMIT :limit"
+    )
+    update_row = sa.text("UPDATE detected_signal SET signal_fingerprint = :fingerprint WHERE id = :id")
+    last_id = 0
+    while rows := bind.execute(select_batch, {"last_id": last_id, "limit": BACKFILL_BATCH}).all():
+        updates = [
+            {"id": row_id, "fingerprint": fingerprint}
+            for row_id, text in rows
+            if (fingerprint := signal_fingerprint(text)) is not None
+        ]
+        if updates:
+            bind.execute(update_row, updates)
+        last_id = rows[-1][0]
+
+    op.create_index(
+        "ix_detected_signal_snapshot_fingerprint",
+        "detected_signal",
+        ["snapshot_id", "signal_fingerprint"],
+    )
+    op.create_index("ix_page_snapshot_run_id", "page_snapshot", ["run_id"])
+    op.create_index(
+        "ix_page_snapshot_page_status_created",
+        "page_snapshot",
+        ["monitored_page_id", "status", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_page_snapshot_page_status_created", table_name="page_snapshot")
+    op.drop_index("ix_page_snapshot_run_id", table_name="page_snapshot")
+    op.drop_index("ix_detected_signal_snapshot_fingerprint", table_name="detected_signal")
+    op.drop_column("detected_signal", "signal_fingerprint")
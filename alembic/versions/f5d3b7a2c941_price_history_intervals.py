@@ -0,0 +1,56 @@
+"""price_history_intervals
+
+Revision ID: f5d3b7a2c941
+Revises: e4b9c2f86a13
+Create Date: 2026-10-17 19:41:08.215734
+
+Turns price_history into change-only intervals [valid_from, valid_to):
+- recorded_at renamed to valid_from
+- valid_to added (NULL = current state); existing rows are chained to the
+  next row of their product, so the history stays complete (duplicates
+  are merged afterwards by scripts/compact_price_history.py)
+- uq_price_history_open (product_id) WHERE valid_to IS NULL
+- ix_price_history_product_valid_from (product_id, valid_from)
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "f5d3b7a2c941"
+down_revision: Union[str, Sequence[str], None] = "e4b9c2f86a13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column("price_history", "recorded_at", new_column_name="valid_from")
+    op.add_column("price_history", sa.Column("valid_to", sa.DateTime(timezone=True), nullable=True))
+    op.execute(
+        """
+        UPDATE price_history h
+        SET valid_to = n.next_from
+        FROM (
+            SELECT id, lead(valid_from) OVER (PARTITION BY product_id ORDER BY valid_from, id) AS next_from
+            FROM price_history
+        ) n
+        WHERE h.id = n.id AND n.next_from IS NOT NULL
+        """
+    )
+    op.create_index("ix_price_history_product_valid_from", "price_history", ["product_id", "valid_from"])
+    op.create_index(
+        "uq_price_history_open",
+        "price_history",
+        ["product_id"],
+        unique=True,
+        postgresql_where=sa.text("valid_to IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_price_history_open", table_name="price_history")
+    op.drop_index("ix_price_history_product_valid_from", table_name="price_history")
+    op.drop_column("price_history", "valid_to")
+    op.alter_column("price_history", "valid_from", new_column_name="recorded_at")
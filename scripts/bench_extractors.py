@@ -0,0 +1,237 @@
+"""
+Offline extractor benchmark over a synthetic HTML corpus.
+
+Runs every extractor in ``_EXTRACTOR_REGISTRY`` over the corpus pages of its
+platform, and ``GenericHtmlExtractor`` (the fallback for any page) over all
+of them. Pages live in ``benchmarks/corpus/`` and are described by
+``manifest.json`` (file, expected platform, URL, response headers). They are
+hand-built pages modelled on each platform's markup, not captured ones.
+``generic_landing.html`` keeps a full-size mega-menu (130+ links): CTAs are
+only looked for in the first 100 links / buttons, so it finds none.
+
+Reported per extractor:
+    latency     p50 / p95 / max per page (parse + extract_all), in ms
+    heap        peak Python heap of one pass over its pages (tracemalloc)
+    rss         RSS growth of its worker process (includes lxml/libxml2)
+    found       products, variants and promo / financing / CTA signals
+
+Each extractor runs in a fresh ``spawn`` process so memory numbers are not
+polluted by the previous one. Results are checked against
+``benchmarks/expected.json`` (platform detection + counts + a digest of the
+full ExtractionResult per page): any change exits with status 1, so
+optimizations can be validated offline. Accept new output with ``--update`` when a
+change in output is intended.
+
+Usage:
+    python scripts/bench_extractors.py [--iterations 20] [--extractor VtexExtractor]
+    python scripts/bench_extractors.py --update          # accept current output
+    python scripts/bench_extractors.py --dump /tmp/out   # full results as JSON
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import dataclasses
+import hashlib
+import json
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import orjson
+
+from workers.web_monitor.document import ParsedDocument
+from workers.web_monitor.extractor_factory import _EXTRACTOR_REGISTRY
+from workers.web_monitor.extractors.base import BaseExtractor
+from workers.web_monitor.extractors.generic_html import GenericHtmlExtractor
+from workers.web_monitor.models import EcommercePlatform, ExtractionResult
+from workers.web_monitor.platform_detector import PlatformDetector
+
+BENCH_DIR = Path(__file__).parent.parent / "benchmarks"
+CORPUS_DIR = BENCH_DIR / "corpus"
+EXPECTED_PATH = BENCH_DIR / "expected.json"
+
+_EXTRACTORS: dict[str, type[BaseExtractor]] = {
+    cls.__name__: cls for cls in (*_EXTRACTOR_REGISTRY.values(), GenericHtmlExtractor)
+}
+
+
+# ── Corpus ────────────────────────────────────────────────────────────
+
+
+def load_manifest() -> list[dict]:
+    return json.loads((CORPUS_DIR / "manifest.json").read_text(encoding="utf-8"))
+
+
+def pages_for(extractor_name: str, manifest: list[dict]) -> list[dict]:
+    if _EXTRACTORS[extractor_name] is GenericHtmlExtractor:
+        return manifest
+    return [
+        page for page in manifest
+        if _EXTRACTOR_REGISTRY.get(EcommercePlatform(page["platform"])) is _EXTRACTORS[extractor_name]
+    ]
+
+
+def summarize(result: ExtractionResult) -> dict:
+    """Counts + digest of the full result: any output change alters the digest."""
+    payload = orjson.dumps(dataclasses.asdict(result), option=orjson.OPT_SORT_KEYS)
+    return {
+        "products": len(result.products),
+        "variants": sum(len(product.variants) for product in result.products),
+        "promos": len(result.promos),
+        "financing": len(result.financing),
+        "ctas": len(result.ctas),
+        "digest": hashlib.sha256(payload).hexdigest()[:16],
+    }
+
+
+# ── Worker (one process per extractor) ────────────────────────────────
+
+
+async def _run_once(cls: type[BaseExtractor], html: str, page: dict) -> ExtractionResult:
+    # A fresh document per run: parsing is part of the per-page cost
+    document = ParsedDocument(html, page["url"])
+    return await cls(html, page["headers"], page["url"], document=document).extract_all()
+
+
+async def _bench(extractor_name: str, pages: list[dict], iterations: int, dump: str | None) -> dict:
+    cls = _EXTRACTORS[extractor_name]
+    htmls = {page["file"]: (CORPUS_DIR / page["file"]).read_text(encoding="utf-8") for page in pages}
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    latencies: list[float] = []
+    results: dict[str, dict] = {}
+    for page in pages:
+        html = htmls[page["file"]]
+        result = await _run_once(cls, html, page)  # warm-up (selector caches, imports)
+        results[page["file"]] = summarize(result)
+        if dump:
+            out = Path(dump) / f"{extractor_name}.{page['file']}.json"
+            out.write_bytes(orjson.dumps(dataclasses.asdict(result), option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+        for _ in range(iterations):
+            started = time.perf_counter()
+            await _run_once(cls, html, page)
+            latencies.append(time.perf_counter() - started)
+
+    rss_growth_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+
+    tracemalloc.start()
+    for page in pages:
+        await _run_once(cls, htmls[page["file"]], page)
+    heap_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {"latencies": latencies, "heap_peak": heap_peak, "rss_growth_kb": rss_growth_kb, "results": results}
+
+
+def _bench_in_worker(extractor_name: str, pages: list[dict], iterations: int, dump: str | None) -> dict:
+    return asyncio.run(_bench(extractor_name, pages, iterations, dump))
+
+
+# ── Report ────────────────────────────────────────────────────────────
+
+
+def _percentile(values: list[float], pct: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+def _print_report(runs: dict[str, dict]) -> None:
+    header = f"{'extractor':<24}{'pages':>6}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}{'heap MB':>9}{'rss MB':>8}{'products':>10}{'variants':>10}{'promos':>8}{'financ.':>8}{'ctas':>6}"
+    print(header)
+    print("─" * len(header))
+    for name, run in runs.items():
+        ms = [latency * 1000 for latency in run["latencies"]]
+        totals = {
+            key: sum(result[key] for result in run["results"].values())
+            for key in ("products", "variants", "promos", "financing", "ctas")
+        }
+        print(
+            f"{name:<24}{len(run['results']):>6}"
+            f"{_percentile(ms, 50):>9.1f}{_percentile(ms, 95):>9.1f}{max(ms, default=0):>9.1f}"
+            f"{run['heap_peak'] / 1e6:>9.2f}{run['rss_growth_kb'] / 1024:>8.1f}"
+            f"{totals['products']:>10}{totals['variants']:>10}{totals['promos']:>8}{totals['financing']:>8}{totals['ctas']:>6}"
+        )
+
+
+def _check(actual: dict, expected: dict) -> list[str]:
+    changes = []
+    for section in sorted(actual.keys() | expected.keys()):
+        got, want = actual.get(section, {}), expected.get(section, {})
+        for key in sorted(got.keys() | want.keys()):
+            if got.get(key) != want.get(key):
+                changes.append(f"  {section} / {key}: expected {want.get(key)} → got {got.get(key)}")
+    return changes
+
+
+# ── Main ──────────────────────────────────────────────────────────────
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20, help="timed runs per page (after one warm-up)")
+    parser.add_argument("--extractor", action="append", choices=sorted(_EXTRACTORS), help="only these extractors")
+    parser.add_argument("--update", action="store_true", help="record current results in expected.json")
+    parser.add_argument("--dump", metavar="DIR", help="write every full ExtractionResult as JSON into DIR")
+    args = parser.parse_args()
+
+    manifest = load_manifest()
+    names = args.extractor or list(_EXTRACTORS)
+    if args.dump:
+        Path(args.dump).mkdir(parents=True, exist_ok=True)
+
+    actual: dict[str, dict] = {
+        "detection": {
+            page["file"]: PlatformDetector.detect(
+                (CORPUS_DIR / page["file"]).read_text(encoding="utf-8"), page["headers"]
+            ).value
+            for page in manifest
+        }
+    }
+    runs: dict[str, dict] = {}
+    spawn = multiprocessing.get_context("spawn")
+    for name in names:
+        pages = pages_for(name, manifest)
+        if not pages:
+            print(f"⚠️  {name}: no corpus pages for its platform, skipped")
+            continue
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+            runs[name] = pool.submit(_bench_in_worker, name, pages, args.iterations, args.dump).result()
+        actual[name] = runs[name]["results"]
+
+    print(f"📊 Extractor benchmark — {len(manifest)} pages, {args.iterations} iterations per page\n")
+    _print_report(runs)
+
+    expected = json.loads(EXPECTED_PATH.read_text(encoding="utf-8")) if EXPECTED_PATH.exists() else {}
+    if args.update:
+        if args.extractor:
+            expected.update(actual)
+        else:
+            expected = actual
+        EXPECTED_PATH.write_text(json.dumps(expected, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"\n💾 Expected results recorded in {EXPECTED_PATH.relative_to(BENCH_DIR.parent)}")
+        return 0
+
+    if args.extractor:
+        expected = {key: val for key, val in expected.items() if key in actual}
+    changes = _check(actual, expected)
+    if changes:
+        print(f"\n❌ Extraction results changed ({len(changes)}):")
+        print("\n".join(changes))
+        print("If the change is intended, re-record with --update.")
+        return 1
+    print("\n✅ Extraction results match expected.json")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
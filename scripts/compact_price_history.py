@@ -0,0 +1,34 @@
+"""
+Compact Price History
+
+One-off: merges the per-crawl price_history rows written before the switch
+to change-only intervals (migration f5d3b7a2c941) into one row per actual
+price / stock change. Safe to re-run; processes a batch of products per
+transaction, so the workers can keep crawling meanwhile.
+
+Usage:
+    python scripts/compact_price_history.py [--batch 5000]
+    VACUUM (ANALYZE) price_history;   -- afterwards, to return the space
+"""
+import asyncio
+import logging
+import argparse
+
+from workers.web_monitor.price_history import COMPACT_BATCH, compact_price_history
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - [%(levelname)s] - %(name)s - %(message)s")
+logger = logging.getLogger("price_history_compactor")
+
+async def async_main(batch: int):
+    stats = await compact_price_history(batch)
+    logger.info(
+        "Price history compacted: %d duplicate rows removed in %d batches (%d intervals re-chained).",
+        stats["deleted"], stats["batches"], stats["rechained"],
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge duplicate price_history rows into intervals")
+    parser.add_argument("--batch", type=int, default=COMPACT_BATCH, help="Product ids per transaction")
+    args = parser.parse_args()
+
+    asyncio.run(async_main(args.batch))
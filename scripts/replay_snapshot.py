@@ -0,0 +1,69 @@
+"""
+Replay extraction offline from stored raw HTML.
+
+Reads the zstd-compressed document referenced by ``PageSnapshot.raw_storage_path``
+and re-runs platform detection + extraction without touching the live site.
+
+Usage:
+    python scripts/replay_snapshot.py <snapshot_id> [<snapshot_id> ...]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from sqlalchemy import select
+from core.database import async_session_factory
+from core.models import MonitoredPage, PageSnapshot
+from workers.web_monitor.extractor_factory import ExtractorFactory
+from workers.web_monitor.platform_detector import PlatformDetector
+from workers.web_monitor.snapshot_store import snapshot_store
+
+
+async def replay(snapshot_id: int) -> None:
+    async with async_session_factory() as session:
+        result = await session.execute(
+            select(PageSnapshot, MonitoredPage)
+            .join(MonitoredPage, MonitoredPage.id == PageSnapshot.monitored_page_id)
+            .where(PageSnapshot.id == snapshot_id)
+        )
+        row = result.first()
+
+    if row is None:
+        print(f"❌ Snapshot #{snapshot_id} not found")
+        return
+    snapshot, page = row
+    if not snapshot.raw_storage_path or not snapshot_store.exists(snapshot.raw_storage_path):
+        print(f"❌ Snapshot #{snapshot_id} has no stored raw HTML")
+        return
+
+    html = await asyncio.to_thread(snapshot_store.read_text, snapshot.raw_storage_path)
+    detection = PlatformDetector.analyze(html, {})
+    platform = detection.platform
+    result = await ExtractorFactory.create(platform, html, {}, page.url).extract_all()
+
+    print(f"🔁 Snapshot #{snapshot_id} — {page.url}")
+    print(f"  Stored: {snapshot.raw_storage_path} ({len(html)} chars)")
+    print(f"  Platform: {platform} (confidence {detection.confidence:.2f})")
+    for candidate, score in sorted(detection.scores.items(), key=lambda kv: -kv[1]):
+        print(f"    {candidate}: {score} ← {', '.join(detection.evidence[candidate])}")
+    print(
+        f"  Extracted: {len(result.promos)} promos, {len(result.financing)} financing, "
+        f"{len(result.ctas)} CTAs, {len(result.products)} products"
+    )
+
+
+async def main() -> None:
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    for arg in sys.argv[1:]:
+        await replay(int(arg))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
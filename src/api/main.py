@@ -15,6 +15,7 @@ from fastapi import FastAPI
 from api.routes.suggestions import router as suggestions_router
 from api.routes.onboarding import router as onboarding_router
 from api.routes.ai import router as ai_router
+from api.routes.crawl_runs import router as crawl_runs_router
 
 
 @asynccontextmanager
@@ -38,6 +39,7 @@ app = FastAPI(
 app.include_router(suggestions_router)
 app.include_router(onboarding_router)
 app.include_router(ai_router)
+app.include_router(crawl_runs_router)
 
 
 @app.get("/health")
@@ -0,0 +1,165 @@
+"""Crawl Runs API — run throughput and per-stage timings (regression tracking)."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import desc, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.database import get_db
+from core.models import CrawlRun, CrawlRunStageStat
+
+router = APIRouter(prefix="/api/crawl-runs", tags=["crawl-runs"])
+
+
+# ── Response schemas ──────────────────────────────────────────────────
+
+class CrawlRunSummary(BaseModel):
+    run_id: int
+    started_at: datetime
+    ended_at: datetime | None
+    status: str
+    pages_total: int
+    pages_succeeded: int
+    pages_failed: int
+    wall_time_seconds: float | None
+    pages_per_second: float | None
+
+
+class StageStat(BaseModel):
+    scope: str
+    scope_key: str
+    stage: str
+    count: int
+    total_seconds: float
+    p50_seconds: float | None
+    p95_seconds: float | None
+    max_seconds: float | None
+    bytes_total: int
+
+
+class StageTrendPoint(BaseModel):
+    run_id: int
+    started_at: datetime
+    count: int
+    total_seconds: float
+    mean_seconds: float
+    p50_seconds: float | None
+    p95_seconds: float | None
+    max_seconds: float | None
+    bytes_total: int
+
+
+def _float(value) -> float | None:
+    return float(value) if value is not None else None
+
+
+def _run_summary(run: CrawlRun) -> CrawlRunSummary:
+    return CrawlRunSummary(
+        run_id=run.id,
+        started_at=run.started_at,
+        ended_at=run.ended_at,
+        status=run.status.value if run.status else "UNKNOWN",
+        pages_total=run.pages_total or 0,
+        pages_succeeded=run.pages_succeeded or 0,
+        pages_failed=run.pages_failed or 0,
+        wall_time_seconds=_float(run.wall_time_seconds),
+        pages_per_second=_float(run.pages_per_second),
+    )
+
+
+# ── Endpoints ─────────────────────────────────────────────────────────
+
+@router.get("", response_model=list[CrawlRunSummary])
+async def list_crawl_runs(
+    limit: int = Query(20, ge=1, le=200),
+    session: AsyncSession = Depends(get_db),
+):
+    """Most recent crawl runs with their throughput."""
+    result = await session.execute(select(CrawlRun).order_by(desc(CrawlRun.id)).limit(limit))
+    return [_run_summary(run) for run in result.scalars().all()]
+
+
+@router.get("/stages/trend", response_model=list[StageTrendPoint])
+async def stage_trend(
+    stage: str,
+    scope: str = Query("run", pattern="^(run|competitor|platform)$"),
+    key: str = "",
+    limit: int = Query(30, ge=1, le=500),
+    session: AsyncSession = Depends(get_db),
+):
+    """
+    One stage's latency across the last ``limit`` runs (oldest first).
+
+    ``scope=competitor&key=<competitor_id>`` or ``scope=platform&key=VTEX``
+    narrows the series to one competitor / platform.
+    """
+    result = await session.execute(
+        select(CrawlRunStageStat, CrawlRun.started_at)
+        .join(CrawlRun, CrawlRun.id == CrawlRunStageStat.run_id)
+        .where(
+            CrawlRunStageStat.stage == stage,
+            CrawlRunStageStat.scope == scope,
+            CrawlRunStageStat.scope_key == key,
+        )
+        .order_by(desc(CrawlRunStageStat.run_id))
+        .limit(limit)
+    )
+    points = []
+    for stat, started_at in reversed(result.all()):
+        total = float(stat.total_seconds or 0)
+        points.append(StageTrendPoint(
+            run_id=stat.run_id,
+            started_at=started_at,
+            count=stat.count,
+            total_seconds=total,
+            mean_seconds=round(total / stat.count, 3) if stat.count else 0.0,
+            p50_seconds=_float(stat.p50_seconds),
+            p95_seconds=_float(stat.p95_seconds),
+            max_seconds=_float(stat.max_seconds),
+            bytes_total=stat.bytes_total,
+        ))
+    return points
+
+
+@router.get("/{run_id}", response_model=CrawlRunSummary)
+async def get_crawl_run(run_id: int, session: AsyncSession = Depends(get_db)):
+    run = await session.get(CrawlRun, run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"CrawlRun #{run_id} not found")
+    return _run_summary(run)
+
+
+@router.get("/{run_id}/stages", response_model=list[StageStat])
+async def get_crawl_run_stages(
+    run_id: int,
+    scope: str | None = Query(None, pattern="^(run|competitor|platform)$"),
+    session: AsyncSession = Depends(get_db),
+):
+    """Per-stage timings of one run (all scopes unless ``scope`` is given), slowest first."""
+    query = select(CrawlRunStageStat).where(CrawlRunStageStat.run_id == run_id)
+    if scope is not None:
+        query = query.where(CrawlRunStageStat.scope == scope)
+    result = await session.execute(
+        query.order_by(CrawlRunStageStat.scope, CrawlRunStageStat.scope_key, desc(CrawlRunStageStat.total_seconds))
+    )
+    stats = result.scalars().all()
+    if not stats and await session.get(CrawlRun, run_id) is None:
+        raise HTTPException(status_code=404, detail=f"CrawlRun #{run_id} not found")
+    return [
+        StageStat(
+            scope=stat.scope,
+            scope_key=stat.scope_key,
+            stage=stat.stage,
+            count=stat.count,
+            total_seconds=float(stat.total_seconds or 0),
+            p50_seconds=_float(stat.p50_seconds),
+            p95_seconds=_float(stat.p95_seconds),
+            max_seconds=_float(stat.max_seconds),
+            bytes_total=stat.bytes_total,
+        )
+        for stat in stats
+    ]
@@ -0,0 +1,271 @@
+"""
+Shared Directus asset uploader — deduplicated, streaming, bounded.
+
+Product images and homepage screenshots end up in Directus ``/files``.
+Catalog crawls see the same image URL (and the same bytes behind
+different URLs) over and over, so every upload goes through one place:
+
+1. source URL already known           → stored Directus file id, no I/O
+2. download streamed into a spooled temp file while hashing (SHA-256)
+3. identical bytes already uploaded   → stored file id, no upload
+4. streaming multipart upload; the (source URL, content hash, file id)
+   mapping is persisted in ``directus_asset``
+
+URLs longer than ``directus_asset.source_url`` are only deduplicated by
+content hash (stored as a URL-less row): they are downloaded again on
+every run, but never uploaded twice.
+
+Concurrent requests for the same URL / bytes share one upload, at most
+``directus_upload_concurrency`` uploads run at a time, and a single pooled
+``httpx.AsyncClient`` serves every download and upload.
+
+Usage:
+    file_id = await asset_uploader.upload_url(image_url, title="Zapatilla X")
+    file_id = await asset_uploader.upload_file(path, title="Snapshot 12")
+    await asset_uploader.close()   # worker shutdown
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import os
+import tempfile
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import IO
+from urllib.parse import urlparse
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from core.config import settings
+from core.models import DirectusAsset
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 64 * 1024
+# Downloads bigger than this spill from memory to a temp file
+_SPOOL_MAX_BYTES = 1024 * 1024
+_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+MAX_SOURCE_URL_LENGTH = DirectusAsset.__table__.c.source_url.type.length
+
+
+class DirectusAssetUploader:
+    """Deduplicating Directus ``/files`` uploader with a pooled HTTP client."""
+
+    def __init__(self, *, max_concurrent: int | None = None) -> None:
+        self.max_concurrent = max_concurrent or settings.directus_upload_concurrency
+        self._client: httpx.AsyncClient | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        # Known mappings of this process (source URL / content hash → file id)
+        self._by_url: dict[str, str] = {}
+        self._by_hash: dict[str, str] = {}
+        # In-flight work shared by concurrent callers
+        self._inflight: dict[str, asyncio.Future[str | None]] = {}
+        self._stats = {"uploads": 0, "url_hits": 0, "hash_hits": 0, "failures": 0, "bytes_uploaded": 0}
+
+    # ── Lifecycle ──────────────────────────────────────────────────────
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.directus_key)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=_TIMEOUT,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=self.max_concurrent * 2),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+
+    # ── Public API ─────────────────────────────────────────────────────
+
+    async def upload_url(self, url: str, *, title: str = "") -> str | None:
+        """Directus file id of the asset at ``url`` (uploaded only if new). None on failure."""
+        if not self.enabled:
+            return None
+        if url in self._by_url:
+            self._stats["url_hits"] += 1
+            return self._by_url[url]
+        return await self._once(f"url:{url}", lambda: self._upload_url(url, title))
+
+    async def upload_file(
+        self,
+        path: str | os.PathLike,
+        *,
+        title: str = "",
+        content_type: str | None = None,
+    ) -> str | None:
+        """Directus file id of a local file (uploaded only if its bytes are new). None on failure."""
+        if not self.enabled:
+            return None
+        path = Path(path)
+        digest = await asyncio.to_thread(_file_sha256, path)
+        content_type = content_type or mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+        with path.open("rb") as fp:
+            return await self._store(fp, digest, None, path.name, content_type, title)
+
+    def stats(self) -> dict:
+        return dict(self._stats)
+
+    # ── Internals ──────────────────────────────────────────────────────
+
+    async def _once(self, key: str, work: Callable[[], Awaitable[str | None]]) -> str | None:
+        """Run ``work`` once per key at a time; concurrent callers await the same result."""
+        future = self._inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await work()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            logger.warning("Directus upload failed (%s): %s", key, exc)
+            self._stats["failures"] += 1
+            result = None
+        finally:
+            self._inflight.pop(key, None)
+        future.set_result(result)
+        return result
+
+    async def _upload_url(self, url: str, title: str) -> str | None:
+        source_url: str | None = url
+        if len(url) > MAX_SOURCE_URL_LENGTH:
+            logger.warning(
+                "Asset URL longer than %d chars, deduplicated by content only: %.120s...",
+                MAX_SOURCE_URL_LENGTH, url,
+            )
+            source_url = None
+        else:
+            file_id = await _lookup(source_url=url)
+            if file_id is not None:
+                self._by_url[url] = file_id
+                self._stats["url_hits"] += 1
+                return file_id
+
+        client = self._get_client()
+        with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_BYTES) as spool:
+            sha = hashlib.sha256()
+            async with self._semaphore:
+                async with client.stream("GET", url) as response:
+                    response.raise_for_status()
+                    content_type = response.headers.get("content-type", "").split(";")[0].strip()
+                    async for chunk in response.aiter_bytes(_CHUNK_SIZE):
+                        sha.update(chunk)
+                        spool.write(chunk)
+            spool.seek(0)
+            filename = os.path.basename(urlparse(url).path) or "asset"
+            content_type = content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            file_id = await self._store(spool, sha.hexdigest(), source_url, filename, content_type, title)
+        if file_id is not None:
+            self._by_url[url] = file_id
+        return file_id
+
+    async def _store(
+        self,
+        fp: IO[bytes],
+        digest: str,
+        source_url: str | None,
+        filename: str,
+        content_type: str,
+        title: str,
+    ) -> str | None:
+        """Reuse the upload of identical bytes, or stream ``fp`` to Directus; record the mapping."""
+        file_id = await self._once(
+            f"hash:{digest}", lambda: self._upload_bytes(fp, digest, filename, content_type, title)
+        )
+        if file_id is not None:
+            await _remember(source_url, digest, file_id)
+        return file_id
+
+    async def _upload_bytes(
+        self,
+        fp: IO[bytes],
+        digest: str,
+        filename: str,
+        content_type: str,
+        title: str,
+    ) -> str | None:
+        file_id = self._by_hash.get(digest) or await _lookup(content_hash=digest)
+        if file_id is not None:
+            self._stats["hash_hits"] += 1
+        else:
+            client = self._get_client()
+            fp.seek(0, os.SEEK_END)
+            size = fp.tell()
+            fp.seek(0)
+            async with self._semaphore:
+                # httpx streams file objects in chunks; form fields go before the file
+                response = await client.post(
+                    f"{settings.directus_url}/files",
+                    headers={"Authorization": f"Bearer {settings.directus_key}"},
+                    data={"title": title} if title else None,
+                    files={"file": (filename, fp, content_type)},
+                )
+            if response.status_code != 200:
+                logger.error("Directus rejected %s: HTTP %d %s", filename, response.status_code, response.text[:200])
+                self._stats["failures"] += 1
+                return None
+            file_id = response.json().get("data", {}).get("id")
+            if not file_id:
+                return None
+            self._stats["uploads"] += 1
+            self._stats["bytes_uploaded"] += size
+
+        self._by_hash[digest] = file_id
+        return file_id
+
+
+def _file_sha256(path: Path) -> str:
+    sha = hashlib.sha256()
+    with path.open("rb") as fp:
+        while chunk := fp.read(_CHUNK_SIZE):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+async def _lookup(*, source_url: str | None = None, content_hash: str | None = None) -> str | None:
+    from core.database import async_session_factory
+
+    query = select(DirectusAsset.file_id)
+    if source_url is not None:
+        query = query.where(DirectusAsset.source_url == source_url)
+    else:
+        query = query.where(DirectusAsset.content_hash == content_hash)
+    async with async_session_factory() as session:
+        return await session.scalar(query.limit(1))
+
+
+async def _remember(source_url: str | None, digest: str, file_id: str) -> None:
+    """Persist the mapping (one row per source URL; one URL-less row per content hash)."""
+    from core.database import async_session_factory
+
+    stmt = pg_insert(DirectusAsset).values(source_url=source_url, content_hash=digest, file_id=file_id)
+    if source_url is not None:
+        stmt = stmt.on_conflict_do_nothing(index_elements=["source_url"])
+    else:
+        stmt = stmt.on_conflict_do_nothing(
+            index_elements=["content_hash"], index_where=DirectusAsset.source_url.is_(None)
+        )
+    async with async_session_factory() as session:
+        await session.execute(stmt)
+        await session.commit()
+
+
+# Shared instance (one pooled client per process)
+asset_uploader = DirectusAssetUploader()
@@ -0,0 +1,152 @@
+"""
+Shared Playwright browser pool for screenshots.
+
+Launching Chromium costs ~1s and 100+ MB per call. ``BrowserPool`` keeps a
+single browser process per ARQ worker and hands out short-lived, isolated
+browser contexts (cookies/storage are not shared between pages), bounded
+by a semaphore.
+
+The browser is launched lazily on first use, so workers that never take a
+screenshot never start Chromium. The pool lives in ``ctx["browser_pool"]``
+and is closed in the worker ``shutdown`` hook.
+
+Usage:
+    async with BrowserPool() as pool:
+        latency = await pool.screenshot("https://www.example.com/", "shot.jpg")
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import statistics
+import time
+from types import TracebackType
+
+from playwright.async_api import Browser, Playwright, async_playwright
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from core.config import settings
+from core.http_client import DEFAULT_HEADERS
+
+logger = logging.getLogger(__name__)
+
+VIEWPORT = {"width": 1280, "height": 800}
+NAVIGATION_TIMEOUT_MS = 15_000
+
+
+class BrowserPool:
+    """One Chromium process, many short-lived contexts with bounded concurrency."""
+
+    def __init__(
+        self,
+        *,
+        max_contexts: int | None = None,
+        settle_timeout_ms: int | None = None,
+    ) -> None:
+        self.max_contexts = max_contexts or settings.screenshot_concurrency
+        self.settle_timeout_ms = settle_timeout_ms or settings.screenshot_settle_timeout_ms
+        self._semaphore = asyncio.Semaphore(self.max_contexts)
+        self._launch_lock = asyncio.Lock()
+        self._playwright: Playwright | None = None
+        self._browser: Browser | None = None
+        self._launches = 0
+        self._failures = 0
+        self._latencies: list[float] = []
+
+    # ── Lifecycle ──────────────────────────────────────────────────────
+
+    async def _get_browser(self) -> Browser:
+        """Launch Chromium on first use (or relaunch it after a crash)."""
+        if self._browser is not None and self._browser.is_connected():
+            return self._browser
+        async with self._launch_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=True)
+            self._launches += 1
+            logger.info(
+                "BrowserPool: Chromium launched (max_contexts=%d, launch #%d)",
+                self.max_contexts, self._launches,
+            )
+            return self._browser
+
+    async def close(self) -> None:
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except PlaywrightError:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def __aenter__(self) -> BrowserPool:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    # ── Screenshots ────────────────────────────────────────────────────
+
+    async def screenshot(self, url: str, path: str) -> float:
+        """
+        Navigate to ``url`` in a fresh context and save a JPEG viewport screenshot.
+
+        Instead of sleeping a fixed time, waits for the page to be ready:
+        DOM loaded → network idle (capped by ``settle_timeout_ms``) → web fonts.
+        Pages that never go idle (analytics long-polling, 403 walls) are
+        captured as soon as the cap expires.
+
+        Returns the capture latency in seconds. Raises PlaywrightError on failure.
+        """
+        async with self._semaphore:
+            started = time.perf_counter()
+            browser = await self._get_browser()
+            context = await browser.new_context(
+                user_agent=DEFAULT_HEADERS["User-Agent"],
+                viewport=VIEWPORT,
+            )
+            try:
+                page = await context.new_page()
+                try:
+                    await page.goto(url, wait_until="domcontentloaded", timeout=NAVIGATION_TIMEOUT_MS)
+                    await page.wait_for_load_state("networkidle", timeout=self.settle_timeout_ms)
+                    await page.evaluate("document.fonts.ready.then(() => true)")
+                except PlaywrightTimeoutError:
+                    logger.debug("Page %s not idle after %dms, capturing anyway", url, self.settle_timeout_ms)
+                except PlaywrightError as nav_e:
+                    logger.debug("Playwright navigation incomplete, but taking screenshot anyway: %s", nav_e)
+
+                await page.screenshot(path=path, type="jpeg", quality=60, full_page=False)
+            except PlaywrightError:
+                self._failures += 1
+                raise
+            finally:
+                await context.close()
+
+        latency = time.perf_counter() - started
+        self._latencies.append(latency)
+        logger.info("  📸 Screenshot of %s in %.2fs", url, latency)
+        return latency
+
+    # ── Metrics ────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        latencies = self._latencies
+        return {
+            "captures": len(latencies),
+            "failures": self._failures,
+            "browser_launches": self._launches,
+            "latency_p50_seconds": round(statistics.median(latencies), 3) if latencies else 0.0,
+            "latency_max_seconds": round(max(latencies), 3) if latencies else 0.0,
+        }
@@ -8,6 +8,8 @@ con un mensaje claro (fail-fast).
 
 from __future__ import annotations
 
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -37,6 +39,143 @@ class Settings(BaseSettings):
         description="Redis connection string for ARQ workers.",
     )
 
+    # ── Web Monitor / Crawl ───────────────────────────────────────────
+    crawl_concurrency: int = Field(
+        default=8,
+        description="Max monitored pages processed concurrently in a crawl run.",
+    )
+    crawl_per_host_concurrency: int = Field(
+        default=2,
+        description="Max concurrent pages per competitor domain (polite crawling).",
+    )
+    crawl_host_rate_per_second: float = Field(
+        default=1.0,
+        description="Initial requests/second per host (adaptive: grows while the host answers).",
+    )
+    crawl_host_min_rate_per_second: float = Field(
+        default=0.05,
+        description="Floor of the adaptive per-host request rate.",
+    )
+    crawl_host_max_rate_per_second: float = Field(
+        default=4.0,
+        description="Ceiling of the adaptive per-host request rate.",
+    )
+    crawl_host_slow_seconds: float = Field(
+        default=10.0,
+        description="Responses slower than this halve the host's request rate.",
+    )
+    crawl_host_breaker_failures: int = Field(
+        default=5,
+        description="Consecutive failures (429/503/5xx/timeouts) before a host is skipped for the rest of the run.",
+    )
+    crawl_host_max_backoff_seconds: float = Field(
+        default=120.0,
+        description="Longest backoff / Retry-After honoured; a longer Retry-After opens the host's circuit.",
+    )
+    fetch_max_connections: int = Field(
+        default=32,
+        description="Connection pool size of the shared worker FetchClient.",
+    )
+    fetch_per_host_connections: int = Field(
+        default=4,
+        description="Max open connections to a single host in the shared FetchClient.",
+    )
+    snapshot_store_dir: str = Field(
+        default="storage/snapshots",
+        description="Directory of the content-addressed raw HTML snapshot store.",
+    )
+    snapshot_zstd_level: int = Field(
+        default=10,
+        description="zstd compression level for stored raw HTML (1-22).",
+    )
+    screenshot_concurrency: int = Field(
+        default=3,
+        description="Max browser contexts open at once in the worker BrowserPool.",
+    )
+    screenshot_settle_timeout_ms: int = Field(
+        default=5000,
+        description="Max wait for network idle before taking a screenshot anyway.",
+    )
+    extraction_mode: Literal["inline", "process"] = Field(
+        default="process",
+        description=(
+            "Where detection + extraction run: 'process' in a worker process pool "
+            "(keeps the event loop free for I/O), 'inline' on the event loop."
+        ),
+    )
+    extraction_workers: int = Field(
+        default=2,
+        description="Processes in the extraction pool (extraction_mode='process').",
+    )
+    extraction_max_tasks_per_child: int = Field(
+        default=500,
+        description="Pages an extraction process handles before it is recycled.",
+    )
+    crawl_schedule: Literal["due", "all"] = Field(
+        default="due",
+        description=(
+            "Which pages a web monitor run crawls: 'due' only the pages whose tier-based "
+            "next_due_at has passed (ticked every scheduler_tick_minutes), 'all' every "
+            "active page (legacy 4-hourly cron)."
+        ),
+    )
+    scheduler_tick_minutes: int = Field(
+        default=10,
+        description="Minutes between due-queue scheduler ticks (divisor of 60).",
+    )
+    scheduler_max_pages_per_tick: int = Field(
+        default=200,
+        description="Max due pages claimed by one scheduler tick (the rest wait for the next one).",
+    )
+    crawl_fanout: bool = Field(
+        default=True,
+        description=(
+            "Under ARQ, split each crawl run into shard jobs (whole competitors, "
+            "enqueued through Redis) so every worker process takes part. Off: the "
+            "tick job crawls all its pages itself."
+        ),
+    )
+    crawl_shard_max_pages: int = Field(
+        default=25,
+        description="Target pages per shard job (a competitor is never split across shards).",
+    )
+    crawl_shard_timeout_seconds: int = Field(
+        default=900,
+        description=(
+            "ARQ timeout of one shard job (25 pages of one host paced at the 0.05 req/s "
+            "floor take ~500s). A run still open after (shards + 1) x this is closed by "
+            "the stalled-run sweeper."
+        ),
+    )
+    diff_mode: Literal["page", "run"] = Field(
+        default="run",
+        description=(
+            "Signal diffing: 'page' diffs each page inline during the crawl, "
+            "'run' diffs every page of the CrawlRun in one SQL pass at the end."
+        ),
+    )
+
+    # ── Deep Crawl ────────────────────────────────────────────────────
+    deep_crawl_refresh_fraction: float = Field(
+        default=0.05,
+        description=(
+            "Share of a competitor's unchanged sitemap URLs re-fetched on every deep crawl "
+            "(least recently fetched first), on top of the new / changed ones."
+        ),
+    )
+    deep_crawl_fetch_workers: int = Field(
+        default=8,
+        description="Concurrent page fetches of a deep crawl (also paced by the per-host rate limiter).",
+    )
+    deep_crawl_commit_every: int = Field(
+        default=200,
+        description="Products (or pages) written per deep crawl DB commit.",
+    )
+    deep_crawl_upload_workers: int = Field(
+        default=4,
+        description="Concurrent product image uploads to Directus during a deep crawl.",
+    )
+
     # ── Notifications ─────────────────────────────────────────────────
     slack_webhook_url: str = Field(
         default="",
@@ -68,6 +207,10 @@ class Settings(BaseSettings):
     # ── Directus ──────────────────────────────────────────────────────
     directus_key: str = Field(default="")
     directus_url: str = Field(default="http://localhost:8055")
+    directus_upload_concurrency: int = Field(
+        default=4,
+        description="Max concurrent uploads of the shared Directus asset uploader (per process).",
+    )
 
     # ── Email IMAP ────────────────────────────────────────────────────
     email_server_host: str = Field(default="imap.gmail.com")
@@ -0,0 +1,222 @@
+"""
+Shared HTTP fetch client (curl_cffi) for all scrapers.
+
+One long-lived ``FetchClient`` per ARQ worker keeps TLS sessions,
+keep-alive connections and HTTP/2 multiplexing warm across pages, so
+repeated requests to the same competitor skip the handshake.
+
+The client is created in the worker ``startup`` hook (``ctx["fetch_client"]``)
+and closed in ``shutdown``. Code paths without a worker context (scripts,
+smoke tests) can use it as an async context manager.
+
+Usage:
+    async with FetchClient() as client:
+        response = await client.get("https://www.example.com/")
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from types import TracebackType
+from urllib.parse import urlparse
+
+from curl_cffi import AsyncCurl, CurlInfo, CurlMOpt
+from curl_cffi.requests import AsyncSession as CurlSession, RequestsError, Response
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/121.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "es-AR,es;q=0.9,en;q=0.8",
+}
+REQUEST_TIMEOUT = 30.0
+IMPERSONATE = "chrome120"
+
+
+@dataclass(slots=True)
+class HostStats:
+    """Connection-reuse counters for a single host."""
+
+    requests: int = 0
+    errors: int = 0
+    new_connections: int = 0
+    reused_connections: int = 0
+    bytes_received: int = 0
+    tls_handshake_seconds: float = 0.0
+
+
+class FetchClient:
+    """
+    Long-lived, connection-pooling HTTP client with per-host limits.
+
+    - ``max_connections``: curl handles (concurrent transfers) in the pool.
+    - ``per_host_connections``: max open connections to a single host
+      (extra transfers queue inside libcurl until a connection frees up).
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections: int | None = None,
+        per_host_connections: int | None = None,
+        timeout: float = REQUEST_TIMEOUT,
+        impersonate: str = IMPERSONATE,
+    ) -> None:
+        self.max_connections = max_connections or settings.fetch_max_connections
+        self.per_host_connections = per_host_connections or settings.fetch_per_host_connections
+        self.timeout = timeout
+        self.impersonate = impersonate
+        self._acurl: AsyncCurl | None = None
+        self._session: CurlSession | None = None
+        self._stats: dict[str, HostStats] = {}
+
+    # ── Lifecycle ──────────────────────────────────────────────────────
+
+    async def start(self) -> None:
+        """Create the curl multi handle and session (needs a running loop)."""
+        if self._session is not None:
+            return
+        self._acurl = AsyncCurl(loop=asyncio.get_running_loop())
+        self._acurl.setopt(CurlMOpt.MAX_HOST_CONNECTIONS, self.per_host_connections)
+        self._acurl.setopt(CurlMOpt.MAX_TOTAL_CONNECTIONS, self.max_connections)
+        self._session = CurlSession(
+            async_curl=self._acurl,
+            max_clients=self.max_connections,
+            headers=DEFAULT_HEADERS,
+            timeout=self.timeout,
+            impersonate=self.impersonate,
+            curl_infos=[CurlInfo.NUM_CONNECTS, CurlInfo.APPCONNECT_TIME],
+        )
+        logger.info(
+            "FetchClient started (max_connections=%d, per_host=%d)",
+            self.max_connections, self.per_host_connections,
+        )
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._acurl is not None:
+            await self._acurl.close()
+            self._acurl = None
+
+    async def __aenter__(self) -> FetchClient:
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    # ── Requests ───────────────────────────────────────────────────────
+
+    async def get(
+        self,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        timeout: float | None = None,
+    ) -> Response:
+        """
+        GET a URL through the shared pool. Does NOT raise on HTTP errors;
+        callers decide (``response.raise_for_status()``).
+        Raises RequestsError on network failures.
+        """
+        if self._session is None:
+            await self.start()
+
+        host = urlparse(url).netloc.lower()
+        stats = self._stats.setdefault(host, HostStats())
+        stats.requests += 1
+
+        try:
+            response = await self._session.get(
+                url,
+                headers=headers,
+                timeout=timeout or self.timeout,
+            )
+        except RequestsError:
+            stats.errors += 1
+            raise
+
+        self._record(stats, response)
+        stats.bytes_received += len(response.content or b"")
+        return response
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        timeout: float | None = None,
+    ) -> AsyncIterator[Response]:
+        """
+        Streaming GET through the shared pool: the body is read chunk by
+        chunk with ``response.aiter_content()`` instead of being buffered.
+        Does NOT raise on HTTP errors. Raises RequestsError on network failures.
+
+        Usage:
+            async with client.stream(url) as response:
+                async for chunk in response.aiter_content():
+                    ...
+        """
+        if self._session is None:
+            await self.start()
+
+        host = urlparse(url).netloc.lower()
+        stats = self._stats.setdefault(host, HostStats())
+        stats.requests += 1
+
+        try:
+            async with self._session.stream(
+                "GET",
+                url,
+                headers=headers,
+                timeout=timeout or self.timeout,
+            ) as response:
+                self._record(stats, response)
+                yield response
+                stats.bytes_received += response.download_size or 0
+        except RequestsError:
+            stats.errors += 1
+            raise
+
+    def _record(self, stats: HostStats, response: Response) -> None:
+        # NUM_CONNECTS = new connections libcurl had to open for this transfer
+        if response.infos.get(CurlInfo.NUM_CONNECTS, 0):
+            stats.new_connections += 1
+        else:
+            stats.reused_connections += 1
+        stats.tls_handshake_seconds += float(response.infos.get(CurlInfo.APPCONNECT_TIME, 0.0) or 0.0)
+
+    # ── Metrics ────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        """Per-host and total connection-reuse metrics."""
+        hosts = {host: asdict(s) for host, s in self._stats.items()}
+        total_requests = sum(s.requests for s in self._stats.values())
+        reused = sum(s.reused_connections for s in self._stats.values())
+        completed = reused + sum(s.new_connections for s in self._stats.values())
+        return {
+            "requests": total_requests,
+            "errors": sum(s.errors for s in self._stats.values()),
+            "reused_connections": reused,
+            "new_connections": completed - reused,
+            "reuse_ratio": round(reused / completed, 3) if completed else 0.0,
+            "hosts": hosts,
+        }
@@ -20,6 +20,8 @@ Tables are grouped by functional area:
 
 from __future__ import annotations
 
+import hashlib
+import re
 from datetime import datetime
 from enum import Enum as PyEnum
 
@@ -30,12 +32,14 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
     Text,
     UniqueConstraint,
     func,
+    text,
 )
 from sqlalchemy.dialects.postgresql import JSONB, ARRAY, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -395,6 +399,10 @@ class MonitoredPage(Base):
     Auto-discovered (header/footer scan) or manually added.
     """
     __tablename__ = "monitored_page"
+    __table_args__ = (
+        # Scheduler: earliest due active pages
+        Index("ix_monitored_page_next_due_at", "next_due_at", postgresql_where=text("is_active")),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     competitor_id: Mapped[int] = mapped_column(ForeignKey("competitor.id"), nullable=False)
@@ -404,6 +412,16 @@ class MonitoredPage(Base):
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
+    # Change detection (conditional GET + normalized body hash)
+    etag: Mapped[str | None] = mapped_column(String(512), nullable=True)
+    last_modified: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    last_fetched_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # Due-queue scheduling (workers.web_monitor.scheduler); NULL = not scheduled
+    next_due_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    crawl_interval_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
     # Relationships
     competitor: Mapped["Competitor"] = relationship("Competitor", back_populates="monitored_pages")
     snapshots: Mapped[list["PageSnapshot"]] = relationship("PageSnapshot", back_populates="page")
@@ -476,23 +494,79 @@ class CrawlRun(Base):
     ended_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     status: Mapped[JobStatus] = mapped_column(Enum(JobStatus), default=JobStatus.RUNNING)
 
+    # Throughput (for worker sizing)
+    pages_total: Mapped[int] = mapped_column(Integer, default=0)
+    pages_succeeded: Mapped[int] = mapped_column(Integer, default=0)
+    pages_failed: Mapped[int] = mapped_column(Integer, default=0)
+    wall_time_seconds: Mapped[float | None] = mapped_column(Numeric(10, 3), nullable=True)
+    pages_per_second: Mapped[float | None] = mapped_column(Numeric(10, 3), nullable=True)
+
+    # Fan-out: one ARQ shard job per group of competitors; the last one to finish finalizes
+    shards_total: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    shards_done: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+
     # Relationships
     snapshots: Mapped[list["PageSnapshot"]] = relationship("PageSnapshot", back_populates="run")
+    stage_stats: Mapped[list["CrawlRunStageStat"]] = relationship(
+        "CrawlRunStageStat", back_populates="run", cascade="all, delete-orphan"
+    )
+
+
+class CrawlRunStageStat(Base):
+    """
+    Latency / bytes summary of one pipeline stage (fetch, extraction, ...)
+    in a CrawlRun, for the whole run or one competitor / platform.
+    Written once at the end of the run (workers.web_monitor.instrumentation).
+    """
+    __tablename__ = "crawl_run_stage_stat"
+    __table_args__ = (
+        UniqueConstraint("run_id", "scope", "scope_key", "stage", name="uq_crawl_run_stage_stat"),
+        # Regression tracking: one stage of one scope across runs
+        Index("ix_crawl_run_stage_stat_stage_scope", "stage", "scope", "scope_key", "run_id"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    run_id: Mapped[int] = mapped_column(ForeignKey("crawl_run.id", ondelete="CASCADE"), nullable=False)
+    scope: Mapped[str] = mapped_column(String(20), nullable=False)               # run | competitor | platform
+    scope_key: Mapped[str] = mapped_column(String(100), nullable=False, default="")  # competitor id / platform
+    stage: Mapped[str] = mapped_column(String(50), nullable=False)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+    total_seconds: Mapped[float] = mapped_column(Numeric(12, 3), default=0)
+    p50_seconds: Mapped[float | None] = mapped_column(Numeric(10, 3), nullable=True)
+    p95_seconds: Mapped[float | None] = mapped_column(Numeric(10, 3), nullable=True)
+    max_seconds: Mapped[float | None] = mapped_column(Numeric(10, 3), nullable=True)
+    bytes_total: Mapped[int] = mapped_column(BigInteger, default=0)
+    histogram: Mapped[dict | None] = mapped_column(JSONB, nullable=True)  # {"bounds": [...], "counts": [...]}
+
+    # Relationships
+    run: Mapped["CrawlRun"] = relationship("CrawlRun", back_populates="stage_stats")
 
 
 class PageSnapshot(Base):
     """
     A raw HTML capture of a monitored page at a point in time.
     Append-only. Signal extraction happens after this is saved.
+
+    A snapshot of an unchanged page holds no signals of its own:
+    signals_snapshot_id points at the snapshot whose DetectedSignal rows
+    it shares, so readers resolve coalesce(signals_snapshot_id, id).
     """
     __tablename__ = "page_snapshot"
+    __table_args__ = (
+        # Diff engine: snapshots of a run / previous extracted snapshot of a page
+        Index("ix_page_snapshot_run_id", "run_id"),
+        Index("ix_page_snapshot_page_status_created", "monitored_page_id", "status", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     monitored_page_id: Mapped[int] = mapped_column(ForeignKey("monitored_page.id"), nullable=False)
     run_id: Mapped[int | None] = mapped_column(ForeignKey("crawl_run.id"), nullable=True)
     raw_storage_path: Mapped[str | None] = mapped_column(String(1024), nullable=True)
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)  # normalized body
     screenshot_url: Mapped[str | None] = mapped_column(String(1024), nullable=True)
     status: Mapped[SnapshotStatus] = mapped_column(Enum(SnapshotStatus), default=SnapshotStatus.PENDING_EXTRACTION)
+    # Unchanged page: the snapshot whose signals this one reuses (never itself a reuse)
+    signals_snapshot_id: Mapped[int | None] = mapped_column(ForeignKey("page_snapshot.id"), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
@@ -613,6 +687,17 @@ class Product(Base):
     A product SKU from a competitor's catalog (Phase 2).
     """
     __tablename__ = "product"
+    __table_args__ = (
+        # Upsert keys of the catalog writer
+        Index("uq_product_competitor_sku", "competitor_id", "sku", unique=True),
+        Index(
+            "uq_product_competitor_url_no_sku",
+            "competitor_id",
+            "url",
+            unique=True,
+            postgresql_where=text("sku IS NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     competitor_id: Mapped[int] = mapped_column(ForeignKey("competitor.id"), nullable=False)
@@ -631,6 +716,7 @@ class Product(Base):
     discovered_from: Mapped[str | None] = mapped_column(String(2048), nullable=True)
     rating_avg: Mapped[float | None] = mapped_column(Numeric(3, 2), nullable=True)
     review_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    badges: Mapped[list | None] = mapped_column(JSONB, nullable=True)
     
     directus_image_id: Mapped[str | None] = mapped_column(UUID(as_uuid=False), nullable=True)
 
@@ -646,11 +732,66 @@ class Product(Base):
     price_history: Mapped[list["PriceHistory"]] = relationship("PriceHistory", back_populates="product")
 
 
+class DeepCrawlUrl(Base):
+    """
+    Deep crawl frontier: one URL of a competitor's sitemaps, with what the
+    sitemap says about it and what the last fetch found
+    (workers.deep_crawl.frontier).
+    """
+    __tablename__ = "deep_crawl_url"
+    __table_args__ = (
+        UniqueConstraint("competitor_id", "url", name="uq_deep_crawl_url"),
+        # Rolling refresh: least recently fetched URLs of a competitor
+        Index("ix_deep_crawl_url_refresh", "competitor_id", "last_fetched_at"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    competitor_id: Mapped[int] = mapped_column(ForeignKey("competitor.id", ondelete="CASCADE"), nullable=False)
+    url: Mapped[str] = mapped_column(String(2048), nullable=False)
+    sitemap_lastmod: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    first_seen_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    last_seen_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())  # last listed in a sitemap
+    last_fetched_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    product_id: Mapped[int | None] = mapped_column(ForeignKey("product.id", ondelete="SET NULL"), nullable=True)
+    fetch_failures: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+
+
+class DirectusAsset(Base):
+    """
+    Files already uploaded to Directus, for deduplication (core.asset_uploader):
+    one row per source URL, plus one URL-less row per content hash for local
+    files (screenshots, sitemaps).
+    """
+    __tablename__ = "directus_asset"
+    __table_args__ = (
+        Index("uq_directus_asset_source_url", "source_url", unique=True),
+        Index(
+            "uq_directus_asset_hash_no_url",
+            "content_hash",
+            unique=True,
+            postgresql_where=text("source_url IS NULL"),
+        ),
+        Index("ix_directus_asset_content_hash", "content_hash"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    source_url: Mapped[str | None] = mapped_column(String(2048), nullable=True)
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)  # SHA-256 of the bytes
+    file_id: Mapped[str] = mapped_column(UUID(as_uuid=False), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
 class ProductVariant(Base):
     """
     A specific variation of a product (e.g., Size: 42, Color: Red).
     """
     __tablename__ = "product_variant"
+    __table_args__ = (
+        UniqueConstraint(
+            "product_id", "sku", name="uq_product_variant_sku", postgresql_nulls_not_distinct=True
+        ),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     product_id: Mapped[int] = mapped_column(ForeignKey("product.id"), nullable=False)
@@ -668,9 +809,22 @@ class ProductVariant(Base):
 
 class PriceHistory(Base):
     """
-    Price snapshots for a product over time (Phase 2).
+    Price of a product over time (Phase 2), written only on change.
+
+    Each row holds one price / stock state over ``[valid_from, valid_to)``;
+    ``valid_to`` IS NULL marks the current state (one per product).
+    See workers.web_monitor.price_history.
     """
     __tablename__ = "price_history"
+    __table_args__ = (
+        Index("ix_price_history_product_valid_from", "product_id", "valid_from"),
+        Index(
+            "uq_price_history_open",
+            "product_id",
+            unique=True,
+            postgresql_where=text("valid_to IS NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     product_id: Mapped[int] = mapped_column(ForeignKey("product.id"), nullable=False)
@@ -679,7 +833,8 @@ class PriceHistory(Base):
     sale_price: Mapped[float | None] = mapped_column(Numeric(12, 2), nullable=True)
     currency: Mapped[str] = mapped_column(String(10), default="ARS")
     is_in_stock: Mapped[bool] = mapped_column(Boolean, default=True)
-    recorded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    valid_from: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    valid_to: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     # Relationships
     product: Mapped["Product"] = relationship("Product", back_populates="price_history")
@@ -689,17 +844,39 @@ class PriceHistory(Base):
 # 5. RESULTS / PROCESSED
 # ══════════════════════════════════════════════════════════════════════
 
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def signal_fingerprint(text: str | None) -> str | None:
+    """MD5 of the whitespace-normalized signal text (diff key between snapshots)."""
+    if not text:
+        return None
+    normalized = _WHITESPACE_RE.sub(" ", text).strip()
+    return hashlib.md5(normalized.encode("utf-8")).hexdigest() if normalized else None
+
+
+def _signal_fingerprint_default(context) -> str | None:
+    return signal_fingerprint(context.get_current_parameters().get("raw_text_found"))
+
+
 class DetectedSignal(Base):
     """
     A commercial signal extracted from a web snapshot or email.
     """
     __tablename__ = "detected_signal"
+    __table_args__ = (
+        Index("ix_detected_signal_snapshot_fingerprint", "snapshot_id", "signal_fingerprint"),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     source_type: Mapped[SignalSource] = mapped_column(Enum(SignalSource))
     snapshot_id: Mapped[int | None] = mapped_column(ForeignKey("page_snapshot.id"), nullable=True)
     taxonomy_id: Mapped[int | None] = mapped_column(ForeignKey("signal_taxonomy.id"), nullable=True)
     raw_text_found: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Filled automatically from raw_text_found on INSERT
+    signal_fingerprint: Mapped[str | None] = mapped_column(
+        String(32), nullable=True, default=_signal_fingerprint_default
+    )
     confidence_score: Mapped[float | None] = mapped_column(Numeric(5, 4), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
@@ -0,0 +1 @@
+"""Deep crawl package: full-catalog crawling of a competitor from its sitemaps."""
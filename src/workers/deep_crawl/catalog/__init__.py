@@ -0,0 +1,53 @@
+"""
+Catalog harvesters: whole catalogs from storefront JSON listings.
+
+Usage:
+    harvester = create_harvester(EcommercePlatform.SHOPIFY, client, "https://www.example.com")
+    if harvester is not None:
+        stats = await write_catalog(competitor.id, harvester)
+"""
+
+from __future__ import annotations
+
+from core.http_client import FetchClient
+from workers.deep_crawl.catalog.base import CatalogHarvester, write_catalog
+from workers.deep_crawl.catalog.shopify import ShopifyCatalogHarvester
+from workers.deep_crawl.catalog.tiendanube import TiendanubeCatalogHarvester
+from workers.deep_crawl.catalog.vtex import VtexCatalogHarvester
+from workers.deep_crawl.catalog.woocommerce import WooCommerceCatalogHarvester
+from workers.web_monitor.models import EcommercePlatform
+
+# ── Registry: maps EcommercePlatform → catalog harvester class ─────────
+
+HARVESTERS: dict[EcommercePlatform, type[CatalogHarvester]] = {
+    EcommercePlatform.SHOPIFY: ShopifyCatalogHarvester,
+    EcommercePlatform.VTEX: VtexCatalogHarvester,
+    EcommercePlatform.WOOCOMMERCE: WooCommerceCatalogHarvester,
+    EcommercePlatform.TIENDANUBE: TiendanubeCatalogHarvester,
+}
+
+
+def create_harvester(
+    platform: EcommercePlatform | str,
+    client: FetchClient,
+    base_url: str,
+    **kwargs,
+) -> CatalogHarvester | None:
+    """Harvester for ``platform``, or None when it has no JSON catalog support."""
+    try:
+        cls = HARVESTERS.get(EcommercePlatform(platform))
+    except ValueError:
+        return None
+    return cls(client, base_url, **kwargs) if cls is not None else None
+
+
+__all__ = [
+    "CatalogHarvester",
+    "HARVESTERS",
+    "ShopifyCatalogHarvester",
+    "TiendanubeCatalogHarvester",
+    "VtexCatalogHarvester",
+    "WooCommerceCatalogHarvester",
+    "create_harvester",
+    "write_catalog",
+]
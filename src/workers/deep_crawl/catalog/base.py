@@ -0,0 +1,197 @@
+"""
+Bulk catalog harvesting through storefront JSON listings.
+
+Several platforms publish their whole catalog as paginated JSON (Shopify
+``/products.json``...). Reading it takes a few dozen listing requests where
+a sitemap crawl fetches and parses one PDP per product, and the JSON carries
+every variant with its prices. A harvester pages through the listing
+(paced per host by ``HostRateLimiter``) and streams ``ProductData`` as pages
+arrive; ``write_catalog`` upserts them in batches through the shared
+catalog writer and uploads the images of new products.
+
+Usage:
+    harvester = ShopifyCatalogHarvester(client, "https://www.example.com")
+    async for product in harvester.iter_products():
+        print(product.sku, product.sale_price)
+
+    stats = await write_catalog(competitor.id, harvester)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Callable
+from typing import Any, ClassVar
+
+import orjson
+from curl_cffi.requests import RequestsError, Response
+from lxml import etree, html as lxml_html
+from sqlalchemy import update
+
+from core.asset_uploader import asset_uploader
+from core.config import settings
+from core.http_client import FetchClient
+from core.models import Product
+from workers.web_monitor.catalog_writer import save_products
+from workers.web_monitor.concurrency import HostRateLimiter
+from workers.web_monitor.models import EcommercePlatform, ProductData, VariantData
+
+logger = logging.getLogger(__name__)
+
+JSON_HEADERS = {"Accept": "application/json"}
+PAGE_TIMEOUT = 30.0
+
+
+class CatalogHarvester(ABC):
+    """Streams a competitor's catalog from a platform's public JSON listing."""
+
+    platform: ClassVar[EcommercePlatform]
+
+    def __init__(
+        self,
+        client: FetchClient,
+        base_url: str,
+        *,
+        rate_limiter: HostRateLimiter | None = None,
+        currency: str = "ARS",
+        max_pages: int = 1000,
+    ) -> None:
+        self.client = client
+        self.base_url = base_url.rstrip("/")
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.currency = currency
+        self.max_pages = max_pages
+        self._stats = {"requests": 0, "pages": 0, "products": 0, "failures": 0}
+
+    @abstractmethod
+    def iter_products(self) -> AsyncIterator[ProductData]:
+        """Stream every product of the catalog once (duplicates across listings dropped)."""
+
+    def stats(self) -> dict:
+        return dict(self._stats)
+
+    async def _get(self, url: str) -> Response:
+        """GET one JSON page, paced per host. Raises RequestsError on failures and HTTP errors."""
+        await self.rate_limiter.acquire(url)
+        self._stats["requests"] += 1
+        with self.rate_limiter.track(url):
+            response = await self.client.get(url, headers=JSON_HEADERS, timeout=PAGE_TIMEOUT)
+            response.raise_for_status()
+        return response
+
+    async def _get_json(self, url: str) -> Any:
+        """Decoded body of ``_get``. Also raises orjson.JSONDecodeError."""
+        return orjson.loads((await self._get(url)).content)
+
+    async def _iter_pages(
+        self,
+        page_url: Callable[[int], str],
+        items: Callable[[Any], list | None],
+        *,
+        page_size: int,
+    ) -> AsyncIterator[list]:
+        """
+        Items of pages 0, 1, 2... of a listing, until a short or empty page.
+
+        A page that fails ends the listing (logged): the next ones would
+        most likely fail the same way.
+        """
+        for page in range(self.max_pages):
+            url = page_url(page)
+            try:
+                batch = items(await self._get_json(url))
+            except (RequestsError, orjson.JSONDecodeError) as exc:
+                logger.warning("Catalog listing %s failed: %s", url, exc)
+                self._stats["failures"] += 1
+                return
+            if not batch:
+                return
+            self._stats["pages"] += 1
+            yield batch
+            if len(batch) < page_size:
+                return
+
+
+def parse_price(value: Any) -> float | None:
+    """Price as published by the JSON APIs (number or decimal string) → float."""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def headline_variant(variants: list[VariantData]) -> VariantData | None:
+    """Variant whose prices headline the product: the cheapest in stock, else the cheapest."""
+    priced = [v for v in variants if v.sale_price is not None]
+    in_stock = [v for v in priced if v.is_in_stock]
+    return min(in_stock or priced, key=lambda v: v.sale_price, default=None)
+
+
+def strip_html(body: str | None) -> str | None:
+    """Text of an HTML description, whitespace collapsed (None when empty)."""
+    if not body or not body.strip():
+        return None
+    try:
+        text = lxml_html.fragment_fromstring(body, create_parent="div").text_content()
+    except (etree.ParserError, ValueError):
+        return None
+    return " ".join(text.split()) or None
+
+
+def absolute_url(src: str) -> str:
+    """Protocol-relative CDN URLs (``//cdn...``) → https."""
+    return f"https:{src}" if src.startswith("//") else src
+
+
+async def write_catalog(
+    competitor_id: int,
+    harvester: CatalogHarvester,
+    *,
+    commit_every: int | None = None,
+    upload_images: bool = True,
+) -> dict:
+    """Upsert every harvested product (committing per batch); returns the run stats."""
+    from core.database import async_session_factory
+
+    commit_every = commit_every or settings.deep_crawl_commit_every
+    discovered_from = f"{harvester.platform}_CATALOG"
+    stats = {"products": 0, "commits": 0, "images_uploaded": 0}
+
+    async def _flush(session, batch: list[ProductData]) -> None:
+        saved = await save_products(
+            session, competitor_id, batch, page_url=harvester.base_url, discovered_from=discovered_from
+        )
+        await session.commit()
+        stats["products"] += len(saved)
+        stats["commits"] += 1
+
+        pending = [p for p in saved if p.directus_image_id is None and p.data.images]
+        if not (upload_images and pending and asset_uploader.enabled):
+            return
+        # The uploader dedupes and bounds its own concurrency
+        file_ids = await asyncio.gather(
+            *(asset_uploader.upload_url(p.data.images[0], title=(p.data.title or "Product Image")[:100]) for p in pending)
+        )
+        images = [{"id": p.id, "directus_image_id": fid} for p, fid in zip(pending, file_ids) if fid]
+        if images:
+            await session.execute(update(Product), images)
+            await session.commit()
+            stats["images_uploaded"] += len(images)
+
+    batch: list[ProductData] = []
+    async with async_session_factory() as session:
+        async for product in harvester.iter_products():
+            batch.append(product)
+            if len(batch) >= commit_every:
+                await _flush(session, batch)
+                batch = []
+        if batch:
+            await _flush(session, batch)
+
+    stats.update({f"http_{key}": value for key, value in harvester.stats().items()})
+    logger.info("%s catalog of competitor %d written: %s", harvester.platform, competitor_id, stats)
+    return stats
@@ -0,0 +1,133 @@
+"""
+Shopify catalog harvester — storefront ``/products.json``.
+
+Every Shopify store serves its published products as JSON, 250 per page:
+``/products.json?limit=250&page=N`` for the whole catalog, or
+``/collections/<handle>/products.json`` for one collection. Each product
+lists all its variants with ``price`` and ``compare_at_price`` (decimal
+strings, in the store currency) and availability.
+
+Prices follow the extractors' convention: ``sale_price`` is the price
+charged, ``list_price`` the compare-at ("before") price when it is higher,
+otherwise the charged price. The product's prices are those of its cheapest
+variant in stock (the cheapest overall when none is).
+
+Usage:
+    harvester = ShopifyCatalogHarvester(client, "https://tienda.example.com", collections=["running"])
+    async for product in harvester.iter_products():
+        print(product.title, product.list_price, product.sale_price, len(product.variants))
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import AsyncIterator, Sequence
+from urllib.parse import quote
+
+from workers.deep_crawl.catalog.base import (
+    CatalogHarvester,
+    absolute_url,
+    headline_variant,
+    parse_price,
+    strip_html,
+)
+from workers.web_monitor.models import EcommercePlatform, ProductData, VariantData
+
+logger = logging.getLogger(__name__)
+
+# Largest page Shopify serves
+PAGE_SIZE = 250
+
+
+def parse_shopify_product(
+    raw: dict,
+    base_url: str,
+    *,
+    currency: str = "ARS",
+    source_url: str | None = None,
+) -> ProductData | None:
+    """One ``products.json`` product → ProductData with every variant."""
+    handle = raw.get("handle")
+    raw_variants = raw.get("variants") or []
+    if not handle and not raw_variants:
+        return None
+
+    variants = []
+    for v in raw_variants:
+        price = parse_price(v.get("price"))
+        compare_at = parse_price(v.get("compare_at_price"))
+        variants.append(
+            VariantData(
+                sku=v.get("sku") or str(v.get("id")),
+                title=v.get("title"),
+                is_in_stock=bool(v.get("available", True)),
+                list_price=compare_at if compare_at and price and compare_at > price else price,
+                sale_price=price,
+                raw_metadata={"shopify_variant_id": str(v.get("id"))},
+            )
+        )
+
+    # Headline prices: the cheapest variant in stock, with its own compare-at price
+    cheapest = headline_variant(variants)
+    images = [absolute_url(img["src"]) for img in raw.get("images") or [] if img.get("src")]
+    product_type = (raw.get("product_type") or "").strip()
+    v0 = raw_variants[0] if raw_variants else {}
+
+    return ProductData(
+        # Same key as ShopifyExtractor on the PDP (JSON-LD sku: the first variant's).
+        # Without a SKU the PDP is keyed by URL; here the variant id stands in
+        sku=str(v0.get("sku") or v0.get("id")) if v0 else None,
+        title=raw.get("title"),
+        url=f"{base_url}/products/{handle}" if handle else None,
+        brand=raw.get("vendor") or None,
+        category_path=product_type or None,
+        category_tree=[product_type] if product_type else [],
+        list_price=cheapest.list_price if cheapest else None,
+        sale_price=cheapest.sale_price if cheapest else None,
+        currency=currency,
+        image_url=images[0] if images else None,
+        images=images,
+        description=strip_html(raw.get("body_html")),
+        is_in_stock=any(v.is_in_stock for v in variants) if variants else True,
+        variants=variants,
+        source_url=source_url,
+        raw_metadata={"shopify_product_id": str(raw.get("id")), "handle": handle or ""},
+    )
+
+
+class ShopifyCatalogHarvester(CatalogHarvester):
+    """Pages through ``/products.json`` (or the given collections' listings)."""
+
+    platform = EcommercePlatform.SHOPIFY
+
+    def __init__(self, *args, collections: Sequence[str] = (), **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.collections = list(collections)
+
+    def _listings(self) -> list[str]:
+        if self.collections:
+            return [f"{self.base_url}/collections/{quote(handle)}/products.json" for handle in self.collections]
+        return [f"{self.base_url}/products.json"]
+
+    async def iter_products(self) -> AsyncIterator[ProductData]:
+        seen: set = set()
+        for listing in self._listings():
+            pages = self._iter_pages(
+                lambda page, listing=listing: f"{listing}?limit={PAGE_SIZE}&page={page + 1}",
+                lambda data: data.get("products") if isinstance(data, dict) else None,
+                page_size=PAGE_SIZE,
+            )
+            async for raw_products in pages:
+                for raw in raw_products:
+                    # A product listed in several collections is yielded once
+                    key = raw.get("id") or raw.get("handle")
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    product = parse_shopify_product(
+                        raw, self.base_url, currency=self.currency, source_url=listing
+                    )
+                    if product is not None:
+                        self._stats["products"] += 1
+                        yield product
+        logger.info("Shopify catalog of %s: %s", self.base_url, self.stats())
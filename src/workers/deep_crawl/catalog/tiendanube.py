@@ -0,0 +1,184 @@
+"""
+Tiendanube / Nuvemshop catalog harvester — storefront listing.
+
+Tiendanube has no public catalog API, but its storefront listing serves
+every product card with the product's variants as JSON: the infinite
+scroll requests ``/productos/page/N/?results_only=true`` and gets only the
+cards (no layout), each with a ``data-variants`` attribute holding
+``price_number``, ``compare_at_price_number``, ``stock`` / ``available``,
+``sku``, options, image and ``installments_data`` per variant. Reading
+those fragments replaces a full PDP fetch + extraction per product; only
+the card's name, link and the JSON are parsed.
+
+Usage:
+    harvester = TiendanubeCatalogHarvester(client, "https://www.example.com.ar")
+    async for product in harvester.iter_products():
+        print(product.sku, product.sale_price, product.installments)
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import AsyncIterator
+from urllib.parse import urljoin
+
+import orjson
+from curl_cffi.requests import RequestsError
+from lxml import etree, html as lxml_html
+
+from workers.deep_crawl.catalog.base import CatalogHarvester, absolute_url, headline_variant, parse_price
+from workers.web_monitor.models import EcommercePlatform, ProductData, VariantData
+
+logger = logging.getLogger(__name__)
+
+LISTING_PATH = "/productos/"  # "/produtos/" on Brazilian (Nuvemshop) stores
+_NAME_XPATH = ".//*[contains(@class, 'js-item-name') or contains(@class, 'item-name')]"
+
+
+def _installments(variant: dict) -> str | None:
+    """Longest plan of ``installments_data`` (a JSON string keyed by gateway, then count)."""
+    data = variant.get("installments_data")
+    if isinstance(data, str):
+        try:
+            data = orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return None
+    if not isinstance(data, dict):
+        return None
+    best: tuple[int, float | None] | None = None
+    for plans in data.values():
+        if not isinstance(plans, dict):
+            continue
+        for count, plan in plans.items():
+            if not str(count).isdigit() or not isinstance(plan, dict):
+                continue
+            if best is None or int(count) > best[0]:
+                best = (int(count), parse_price(plan.get("installment_value")))
+    if best is None or best[0] <= 1:
+        return None
+    return f"{best[0]} cuotas de ${best[1]}"
+
+
+def _variant(raw: dict) -> VariantData:
+    sale_price = parse_price(raw.get("price_number"))
+    compare_at = parse_price(raw.get("compare_at_price_number"))
+    options = [str(raw[k]) for k in ("option0", "option1", "option2") if raw.get(k)]
+    return VariantData(
+        sku=raw.get("sku") or str(raw.get("id")),
+        title=" / ".join(options) or None,
+        is_in_stock=bool(raw.get("available", True)),
+        list_price=compare_at if compare_at and sale_price and compare_at > sale_price else sale_price,
+        sale_price=sale_price,
+        raw_metadata={"tiendanube_variant_id": str(raw.get("id"))},
+    )
+
+
+def parse_tiendanube_card(card: etree._Element, base_url: str, *, currency: str = "ARS") -> ProductData | None:
+    """One listing card (the element holding ``data-variants``) → ProductData with every variant."""
+    try:
+        raw_variants = orjson.loads(card.get("data-variants") or "[]")
+    except orjson.JSONDecodeError:
+        return None
+    if not isinstance(raw_variants, list) or not raw_variants:
+        return None
+
+    # Name / link live on the card container, which may wrap the element with the JSON
+    item = next(
+        (el for el in card.iterancestors() if el.get("data-product-id") or "js-item-product" in (el.get("class") or "")),
+        card,
+    )
+    name_el = next(iter(item.xpath(_NAME_XPATH)), None)
+    title = name_el.text_content().strip() if name_el is not None else None
+    links = [a.get("href") for a in item.iter("a") if a.get("href")]
+    link = next((href for href in links if "/productos/" in href or "/produtos/" in href), links[0] if links else None)
+    if not title:
+        img = next(item.iter("img"), None)
+        title = (img.get("alt") or "").strip() if img is not None else None
+
+    variants = [_variant(v) for v in raw_variants if isinstance(v, dict)]
+    cheapest = headline_variant(variants)
+    images: list[str] = []
+    for v in raw_variants:
+        src = v.get("image_url") if isinstance(v, dict) else None
+        if src and absolute_url(src) not in images:
+            images.append(absolute_url(src))
+    product_id = raw_variants[0].get("product_id") or item.get("data-product-id")
+
+    return ProductData(
+        sku=variants[0].sku,
+        title=title or None,
+        url=urljoin(f"{base_url}/", link) if link else None,
+        list_price=cheapest.list_price if cheapest else None,
+        sale_price=cheapest.sale_price if cheapest else None,
+        currency=currency,
+        image_url=images[0] if images else None,
+        images=images,
+        is_in_stock=any(v.is_in_stock for v in variants),
+        variants=variants,
+        installments=_installments(raw_variants[0]),
+        source_url=base_url,
+        raw_metadata={"tiendanube_product_id": str(product_id)},
+    )
+
+
+class TiendanubeCatalogHarvester(CatalogHarvester):
+    """Pages through the storefront listing fragments (``results_only``)."""
+
+    platform = EcommercePlatform.TIENDANUBE
+
+    def __init__(self, *args, listing_path: str = LISTING_PATH, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.listing_path = "/" + listing_path.strip("/") + "/"
+
+    def _listing_url(self, page: int) -> str:
+        page_path = f"page/{page + 1}/" if page else ""
+        return f"{self.base_url}{self.listing_path}{page_path}?results_only=true"
+
+    async def _fragment(self, url: str) -> tuple[str, bool] | None:
+        """(cards HTML, has next page) of one listing page; None (logged) on failure."""
+        try:
+            response = await self._get(url)
+        except RequestsError as exc:
+            logger.warning("Tiendanube listing %s failed: %s", url, exc)
+            self._stats["failures"] += 1
+            return None
+        body = response.text
+        # Some themes wrap the cards in JSON ({"html": ..., "has_next": ...})
+        if body.lstrip().startswith("{"):
+            try:
+                data = orjson.loads(body)
+            except orjson.JSONDecodeError:
+                return body, True
+            return str(data.get("html") or ""), bool(data.get("has_next", True))
+        return body, True
+
+    async def iter_products(self) -> AsyncIterator[ProductData]:
+        seen: set[str] = set()
+        for page in range(self.max_pages):
+            url = self._listing_url(page)
+            fragment = await self._fragment(url)
+            if fragment is None or not fragment[0].strip():
+                break
+            body, has_next = fragment
+            try:
+                cards = lxml_html.fromstring(body).xpath("//*[@data-variants]")
+            except (etree.ParserError, ValueError):
+                break
+            self._stats["pages"] += 1
+
+            new = 0
+            for card in cards:
+                product = parse_tiendanube_card(card, self.base_url, currency=self.currency)
+                if product is None:
+                    continue
+                key = product.raw_metadata["tiendanube_product_id"]
+                if key in seen:
+                    continue
+                seen.add(key)
+                new += 1
+                self._stats["products"] += 1
+                yield product
+            # Past the last page some stores serve the first one again
+            if not new or not has_next:
+                break
+        logger.info("Tiendanube catalog of %s: %s", self.base_url, self.stats())
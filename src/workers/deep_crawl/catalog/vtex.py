@@ -0,0 +1,249 @@
+"""
+VTEX catalog harvester — public catalog search API.
+
+``/api/catalog_system/pub/products/search?_from=0&_to=49`` returns up to 50
+products with every SKU (item), its sellers' ``commertialOffer`` (Price,
+ListPrice, AvailableQuantity, Installments) and images; the ``resources``
+response header (``0-49/1234``) carries the total. VTEX refuses ranges past
+the first 2,500 results, so bigger catalogs are split by category facets
+(``fq=C:/1/7/``, from ``/api/catalog_system/pub/category/tree/<depth>``):
+
+- a facet within the window is read page by page
+- a facet over the window is split into its subcategories
+- a leaf category still over the window is read from both ends of the
+  price ordering (up to twice the window)
+
+Products and SKUs are mapped like VtexExtractor maps ``__STATE__``
+(``VtexStateIndex`` offers and installments, ``variants_price_range``);
+the product's price range only counts SKUs in stock while there are any.
+
+Usage:
+    harvester = VtexCatalogHarvester(client, "https://www.example.com.ar")
+    async for product in harvester.iter_products():
+        print(product.sku, product.sale_price, product.installments)
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import AsyncIterator
+from urllib.parse import urlencode
+
+import orjson
+from curl_cffi.requests import RequestsError
+
+from workers.deep_crawl.catalog.base import CatalogHarvester
+from workers.web_monitor.extractors.vtex import VtexStateIndex, variants_price_range
+from workers.web_monitor.models import EcommercePlatform, ProductData, VariantData
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PATH = "/api/catalog_system/pub/products/search"
+CATEGORY_TREE_PATH = "/api/catalog_system/pub/category/tree"
+# Largest range VTEX serves per request, and the deepest result it serves
+PAGE_SIZE = 50
+RESULT_WINDOW = 2500
+# Leaf facets over the window are read in both orders
+_WINDOW_ORDERS = ("OrderByPriceASC", "OrderByPriceDESC")
+
+
+def _parse_total(resources: str | None) -> int | None:
+    """Total from a ``resources: 0-49/1234`` header."""
+    if not resources or "/" not in resources:
+        return None
+    try:
+        return int(resources.rsplit("/", 1)[1])
+    except ValueError:
+        return None
+
+
+def parse_vtex_product(
+    raw: dict,
+    base_url: str,
+    *,
+    currency: str = "ARS",
+    source_url: str | None = None,
+) -> ProductData | None:
+    """One search API product → ProductData with every SKU."""
+    product_id = raw.get("productId")
+    if not product_id:
+        return None
+    # Search results are inline (no Apollo pointers): resolve() returns the objects as-is
+    index = VtexStateIndex({})
+    items = raw.get("items") or []
+
+    variants = []
+    images: list[str] = []
+    for item in items:
+        offer = index.sku_offer(item)
+        variants.append(
+            VariantData(
+                sku=item.get("itemId"),
+                title=item.get("name") or item.get("nameComplete"),
+                is_in_stock=offer["available"],
+                list_price=offer["list_price"],
+                sale_price=offer["sale_price"],
+                raw_metadata={"vtex_sku_id": str(item.get("itemId"))},
+            )
+        )
+        for img in item.get("images") or []:
+            img_url = img.get("imageUrl")
+            if img_url and img_url not in images:
+                images.append(img_url)
+
+    # Headline prices from the SKUs in stock (sold-out ones may keep an old or zero price)
+    in_stock = [v for v in variants if v.is_in_stock]
+    prices = variants_price_range(in_stock) or variants_price_range(variants) or {}
+    categories = raw.get("categories") or []
+    cat_path = categories[0] if categories else None
+    highlights = raw.get("clusterHighlights")
+    link_text = raw.get("linkText")
+
+    return ProductData(
+        sku=product_id,
+        title=raw.get("productName") or raw.get("productTitle") or link_text,
+        url=raw.get("link") or (f"{base_url}/{link_text}/p" if link_text else None),
+        brand=raw.get("brand"),
+        category_path=cat_path,
+        category_tree=[c for c in cat_path.split("/") if c] if cat_path else [],
+        list_price=prices.get("list_price"),
+        sale_price=prices.get("sale_price"),
+        currency=currency,
+        image_url=images[0] if images else None,
+        images=images,
+        description=raw.get("description") or None,
+        is_in_stock=any(v.is_in_stock for v in variants) if variants else True,
+        variants=variants,
+        installments=index.sku_installments(items[0]) if items else None,
+        badges=list(highlights.values()) if isinstance(highlights, dict) else [],
+        source_url=source_url,
+        raw_metadata={"vtex_product_id": str(product_id)},
+    )
+
+
+class VtexCatalogHarvester(CatalogHarvester):
+    """Pages through the catalog search API, split by category facets past the result window."""
+
+    platform = EcommercePlatform.VTEX
+
+    def __init__(self, *args, category_depth: int = 5, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.category_depth = category_depth
+        # Facet (None = whole catalog) → its subcategory facets; loaded on first need
+        self._subfacets: dict[str | None, list[str]] | None = None
+
+    async def iter_products(self) -> AsyncIterator[ProductData]:
+        seen: set[str] = set()
+        async for raw_products, source_url in self._iter_facet(None):
+            for raw in raw_products:
+                # The ASC / DESC reads of an oversized leaf overlap
+                product_id = raw.get("productId")
+                if product_id in seen:
+                    continue
+                seen.add(product_id)
+                product = parse_vtex_product(raw, self.base_url, currency=self.currency, source_url=source_url)
+                if product is not None:
+                    self._stats["products"] += 1
+                    yield product
+        logger.info("VTEX catalog of %s: %s", self.base_url, self.stats())
+
+    def _search_url(self, fq: str | None, start: int, order: str | None = None) -> str:
+        params: dict[str, str | int] = {"_from": start, "_to": start + PAGE_SIZE - 1}
+        if fq:
+            params["fq"] = fq
+        if order:
+            params["O"] = order
+        return f"{self.base_url}{SEARCH_PATH}?{urlencode(params)}"
+
+    async def _search(self, url: str) -> tuple[list[dict], int | None] | None:
+        """Products and total of one range; None (logged) when the request fails."""
+        try:
+            response = await self._get(url)
+            data = orjson.loads(response.content)
+        except (RequestsError, orjson.JSONDecodeError) as exc:
+            logger.warning("VTEX catalog search %s failed: %s", url, exc)
+            self._stats["failures"] += 1
+            return None
+        products = data if isinstance(data, list) else []
+        return products, _parse_total(response.headers.get("resources"))
+
+    async def _iter_facet(self, fq: str | None) -> AsyncIterator[tuple[list[dict], str]]:
+        """Pages (products, URL) of one facet, split into subcategories past the window."""
+        url = self._search_url(fq, 0)
+        first = await self._search(url)
+        if first is None:
+            return
+        products, total = first
+
+        if total is None or total <= RESULT_WINDOW:
+            if products:
+                self._stats["pages"] += 1
+                yield products, url
+            if len(products) == PAGE_SIZE:
+                async for page in self._iter_window(fq, PAGE_SIZE, total):
+                    yield page
+            return
+
+        # Products attached to a non-leaf category itself are not reachable this way;
+        # VTEX stores assign products to leaf categories
+        subfacets = (await self._load_subfacets()).get(fq) or []
+        if subfacets:
+            logger.info(
+                "VTEX facet %s: %d products past the %d window, split into %d subcategories",
+                fq or "catalog", total, RESULT_WINDOW, len(subfacets),
+            )
+            for subfacet in subfacets:
+                async for page in self._iter_facet(subfacet):
+                    yield page
+            return
+
+        logger.warning(
+            "VTEX facet %s: %d products in a leaf category, reading the %d cheapest and most expensive",
+            fq or "catalog", total, RESULT_WINDOW,
+        )
+        for order in _WINDOW_ORDERS:
+            async for page in self._iter_window(fq, 0, total, order):
+                yield page
+
+    async def _iter_window(
+        self,
+        fq: str | None,
+        start: int,
+        total: int | None,
+        order: str | None = None,
+    ) -> AsyncIterator[tuple[list[dict], str]]:
+        end = min(total, RESULT_WINDOW) if total is not None else RESULT_WINDOW
+        while start < end:
+            url = self._search_url(fq, start, order)
+            page = await self._search(url)
+            if page is None or not page[0]:
+                return
+            self._stats["pages"] += 1
+            yield page[0], url
+            if len(page[0]) < PAGE_SIZE:
+                return
+            start += PAGE_SIZE
+
+    async def _load_subfacets(self) -> dict[str | None, list[str]]:
+        if self._subfacets is not None:
+            return self._subfacets
+        self._subfacets = {}
+        url = f"{self.base_url}{CATEGORY_TREE_PATH}/{self.category_depth}"
+        try:
+            tree = await self._get_json(url)
+        except (RequestsError, orjson.JSONDecodeError) as exc:
+            logger.warning("VTEX category tree %s failed: %s", url, exc)
+            self._stats["failures"] += 1
+            return self._subfacets
+
+        def _walk(nodes: list, parent_fq: str | None, parent_path: str) -> None:
+            for node in nodes or []:
+                if not isinstance(node, dict) or node.get("id") is None:
+                    continue
+                path = f"{parent_path}{node['id']}/"
+                fq = f"C:{path}"
+                self._subfacets.setdefault(parent_fq, []).append(fq)
+                _walk(node.get("children"), fq, path)
+
+        _walk(tree if isinstance(tree, list) else [], None, "/")
+        return self._subfacets
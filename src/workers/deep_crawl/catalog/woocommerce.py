@@ -0,0 +1,168 @@
+"""
+WooCommerce catalog harvester — Store API.
+
+``/wp-json/wc/store/products?per_page=100&page=N`` is public on every
+WooCommerce store with the block-based cart (WC 5.5+). Each product
+carries its prices in minor units (``prices.price`` / ``regular_price`` /
+``sale_price`` + ``currency_minor_unit``), stock, categories, images and
+rating. Variable products only list their variations' ids and attributes,
+so variations are read first in the same paged way (``type=variation``:
+each one is a product with its own prices, stock and ``parent`` id) and
+attached to their parent as VariantData.
+
+Usage:
+    harvester = WooCommerceCatalogHarvester(client, "https://www.example.com.ar")
+    async for product in harvester.iter_products():
+        print(product.sku, product.list_price, product.sale_price, len(product.variants))
+"""
+
+from __future__ import annotations
+
+import html
+import logging
+from collections.abc import AsyncIterator
+
+from workers.deep_crawl.catalog.base import (
+    CatalogHarvester,
+    absolute_url,
+    headline_variant,
+    parse_price,
+    strip_html,
+)
+from workers.web_monitor.models import EcommercePlatform, ProductData, VariantData
+
+logger = logging.getLogger(__name__)
+
+STORE_API_PATH = "/wp-json/wc/store/products"
+# Largest page the Store API serves
+PAGE_SIZE = 100
+
+
+def _money(prices: dict, key: str) -> float | None:
+    """A Store API amount ("129900" with currency_minor_unit 2) → 1299.0."""
+    amount = parse_price(prices.get(key))
+    if amount is None:
+        return None
+    return amount / 10 ** int(prices.get("currency_minor_unit") or 0)
+
+
+def _prices(raw: dict) -> tuple[float | None, float | None]:
+    """(list_price, sale_price): regular price and the price charged."""
+    prices = raw.get("prices") or {}
+    sale = _money(prices, "price")
+    regular = _money(prices, "regular_price")
+    if sale is None and prices.get("price_range"):
+        # Variable product without a price of its own: cheapest variation
+        sale = _money({**prices, **prices["price_range"]}, "min_amount")
+    return (regular if regular and sale and regular > sale else sale), sale
+
+
+def parse_woocommerce_variation(raw: dict) -> VariantData:
+    """One Store API variation (``type=variation``) → VariantData."""
+    list_price, sale_price = _prices(raw)
+    title = html.unescape(raw.get("variation") or "") or " / ".join(
+        str(a.get("value")) for a in raw.get("attributes") or [] if a.get("value")
+    )
+    return VariantData(
+        sku=raw.get("sku") or str(raw.get("id")),
+        title=title or None,
+        is_in_stock=bool(raw.get("is_in_stock", True)),
+        list_price=list_price,
+        sale_price=sale_price,
+        raw_metadata={"woocommerce_variation_id": str(raw.get("id"))},
+    )
+
+
+def parse_woocommerce_product(
+    raw: dict,
+    variants: list[VariantData] | None = None,
+    *,
+    currency: str = "ARS",
+    source_url: str | None = None,
+) -> ProductData | None:
+    """One Store API product (+ its parsed variations) → ProductData."""
+    if raw.get("id") is None:
+        return None
+    variants = variants or []
+    list_price, sale_price = _prices(raw)
+    # Variable products: headline prices from the cheapest variation in stock
+    cheapest = headline_variant(variants)
+    if cheapest is not None:
+        list_price, sale_price = cheapest.list_price, cheapest.sale_price
+
+    categories = [html.unescape(c["name"]) for c in raw.get("categories") or [] if c.get("name")]
+    brands = [html.unescape(b["name"]) for b in raw.get("brands") or [] if b.get("name")]
+    images = [absolute_url(img["src"]) for img in raw.get("images") or [] if img.get("src")]
+    rating = parse_price(raw.get("average_rating"))
+
+    return ProductData(
+        sku=raw.get("sku") or str(raw["id"]),
+        title=html.unescape(raw.get("name") or "") or None,
+        url=raw.get("permalink"),
+        brand=brands[0] if brands else None,
+        category_path=categories[0] if categories else None,
+        category_tree=categories,
+        list_price=list_price,
+        sale_price=sale_price,
+        currency=(raw.get("prices") or {}).get("currency_code") or currency,
+        image_url=images[0] if images else None,
+        images=images,
+        description=strip_html(raw.get("short_description")) or strip_html(raw.get("description")),
+        is_in_stock=bool(raw.get("is_in_stock", True)) or any(v.is_in_stock for v in variants),
+        variants=variants,
+        rating=rating or None,
+        review_count=raw.get("review_count"),
+        badges=["Oferta"] if raw.get("on_sale") else [],
+        source_url=source_url,
+        raw_metadata={"woocommerce_product_id": str(raw["id"]), "type": str(raw.get("type") or "")},
+    )
+
+
+class WooCommerceCatalogHarvester(CatalogHarvester):
+    """Pages through the Store API: variations first, then products with their variations attached."""
+
+    platform = EcommercePlatform.WOOCOMMERCE
+
+    def _listing_url(self, page: int, product_type: str | None = None) -> str:
+        url = f"{self.base_url}{STORE_API_PATH}?per_page={PAGE_SIZE}&page={page + 1}"
+        return f"{url}&type={product_type}" if product_type else url
+
+    async def _variations(self) -> dict[int, list[VariantData]]:
+        by_parent: dict[int, list[VariantData]] = {}
+        async for raw_variations in self._iter_pages(
+            lambda page: self._listing_url(page, "variation"),
+            lambda data: data if isinstance(data, list) else None,
+            page_size=PAGE_SIZE,
+        ):
+            for raw in raw_variations:
+                if raw.get("parent"):
+                    by_parent.setdefault(raw["parent"], []).append(parse_woocommerce_variation(raw))
+        return by_parent
+
+    async def iter_products(self) -> AsyncIterator[ProductData]:
+        variations = await self._variations()
+        logger.info(
+            "WooCommerce catalog of %s: %d variations of %d products",
+            self.base_url, sum(len(v) for v in variations.values()), len(variations),
+        )
+        seen: set[int] = set()
+        async for raw_products in self._iter_pages(
+            self._listing_url,
+            lambda data: data if isinstance(data, list) else None,
+            page_size=PAGE_SIZE,
+        ):
+            for raw in raw_products:
+                product_id = raw.get("id")
+                if product_id in seen:
+                    continue
+                seen.add(product_id)
+                product = parse_woocommerce_product(
+                    raw,
+                    variations.get(product_id),
+                    currency=self.currency,
+                    source_url=f"{self.base_url}{STORE_API_PATH}",
+                )
+                if product is not None:
+                    self._stats["products"] += 1
+                    yield product
+        logger.info("WooCommerce catalog of %s: %s", self.base_url, self.stats())
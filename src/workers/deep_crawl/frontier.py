@@ -0,0 +1,224 @@
+"""
+Persisted URL frontier for incremental deep crawls.
+
+Every URL listed in a competitor's sitemaps is kept in ``deep_crawl_url``
+with its sitemap ``lastmod`` and what the last fetch found (time, content
+hash, product). A deep crawl then:
+
+1. ``sync_frontier``     streams the sitemaps into the table (batched upserts)
+2. ``select_crawl_batch`` picks what to fetch:
+     - new URLs (never fetched)
+     - changed URLs (sitemap lastmod after the last fetch)
+     - a rolling refresh slice of the rest (least recently fetched first,
+       ``deep_crawl_refresh_fraction`` of the URLs still in the sitemap),
+       which also covers sitemaps without lastmod
+3. ``record_fetches``     stores the outcome; an unchanged content hash lets
+   the crawler skip extraction altogether
+
+URLs that disappeared from the sitemaps stay in the table (with their old
+``last_seen_at``) but are no longer selected.
+
+Usage:
+    synced_at = await sync_frontier(session, competitor.id, iter_sitemap_urls(client, url))
+    batch = await select_crawl_batch(session, competitor.id, seen_since=synced_at)
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from collections.abc import AsyncIterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy import false, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.models import DeepCrawlUrl
+from workers.deep_crawl.sitemap import SitemapEntry
+
+logger = logging.getLogger(__name__)
+
+UPSERT_BATCH = 1000
+# Length of deep_crawl_url.url: longer URLs would fail the whole batch insert
+MAX_URL_LENGTH = DeepCrawlUrl.__table__.c.url.type.length
+
+
+@dataclass(slots=True)
+class FrontierUrl:
+    """A URL selected for fetching, with what is known from the last fetch."""
+
+    id: int
+    url: str
+    content_hash: str | None
+    product_id: int | None
+    reason: str  # new | changed | refresh
+
+
+async def _upsert_batch(
+    session: AsyncSession, competitor_id: int, batch: dict[str, SitemapEntry], seen_at: datetime
+) -> None:
+    stmt = pg_insert(DeepCrawlUrl).values(
+        [
+            {
+                "competitor_id": competitor_id,
+                "url": entry.loc,
+                "sitemap_lastmod": entry.lastmod,
+                "last_seen_at": seen_at,
+            }
+            for entry in batch.values()
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_deep_crawl_url",
+        set_={
+            "sitemap_lastmod": stmt.excluded.sitemap_lastmod,
+            "last_seen_at": stmt.excluded.last_seen_at,
+        },
+    )
+    await session.execute(stmt)
+
+
+async def sync_frontier(
+    session: AsyncSession,
+    competitor_id: int,
+    entries: AsyncIterable[SitemapEntry],
+    *,
+    batch_size: int = UPSERT_BATCH,
+) -> datetime:
+    """
+    Upsert every streamed sitemap entry into the frontier (committing per batch).
+
+    Returns the sync timestamp: URLs with ``last_seen_at`` >= it are the ones
+    currently listed in the sitemaps.
+    """
+    seen_at = datetime.now(timezone.utc)
+    # Keyed by URL: a URL listed twice must not hit ON CONFLICT twice in one statement
+    batch: dict[str, SitemapEntry] = {}
+    total = 0
+    skipped = 0
+    async for entry in entries:
+        if len(entry.loc) > MAX_URL_LENGTH:
+            skipped += 1
+            logger.warning("Skipping sitemap URL longer than %d chars: %.120s...", MAX_URL_LENGTH, entry.loc)
+            continue
+        batch[entry.loc] = entry
+        if len(batch) >= batch_size:
+            await _upsert_batch(session, competitor_id, batch, seen_at)
+            await session.commit()
+            total += len(batch)
+            batch = {}
+    if batch:
+        await _upsert_batch(session, competitor_id, batch, seen_at)
+        await session.commit()
+        total += len(batch)
+
+    logger.info(
+        "Frontier of competitor %d synced: %d sitemap URLs (%d too long, skipped)",
+        competitor_id, total, skipped,
+    )
+    return seen_at
+
+
+async def select_crawl_batch(
+    session: AsyncSession,
+    competitor_id: int,
+    *,
+    seen_since: datetime,
+    refresh_fraction: float | None = None,
+    limit: int = 0,
+) -> list[FrontierUrl]:
+    """
+    URLs to fetch in this crawl: new + changed, then the rolling refresh slice.
+
+    ``limit`` (0 = no limit) caps the whole batch, new / changed URLs first.
+    """
+    if refresh_fraction is None:
+        refresh_fraction = settings.deep_crawl_refresh_fraction
+
+    listed = (
+        DeepCrawlUrl.competitor_id == competitor_id,
+        DeepCrawlUrl.last_seen_at >= seen_since,
+    )
+    # COALESCE: without lastmod the comparison is NULL, and NOT NULL would
+    # drop those URLs from the refresh slice as well
+    changed = or_(
+        DeepCrawlUrl.last_fetched_at.is_(None),
+        func.coalesce(DeepCrawlUrl.sitemap_lastmod > DeepCrawlUrl.last_fetched_at, false()),
+    )
+    columns = (
+        DeepCrawlUrl.id,
+        DeepCrawlUrl.url,
+        DeepCrawlUrl.content_hash,
+        DeepCrawlUrl.product_id,
+        DeepCrawlUrl.last_fetched_at,
+    )
+
+    query = select(*columns).where(*listed, changed).order_by(DeepCrawlUrl.id)
+    if limit > 0:
+        query = query.limit(limit)
+    batch = [
+        FrontierUrl(url_id, url, hash_, product_id, "new" if fetched_at is None else "changed")
+        for url_id, url, hash_, product_id, fetched_at in (await session.execute(query)).all()
+    ]
+
+    listed_total = await session.scalar(select(func.count()).select_from(DeepCrawlUrl).where(*listed))
+    refresh_size = math.ceil((listed_total or 0) * refresh_fraction)
+    if limit > 0:
+        refresh_size = min(refresh_size, limit - len(batch))
+    if refresh_size > 0:
+        result = await session.execute(
+            select(*columns[:4])
+            .where(*listed, ~changed)
+            .order_by(DeepCrawlUrl.last_fetched_at, DeepCrawlUrl.id)
+            .limit(refresh_size)
+        )
+        batch.extend(FrontierUrl(*row, "refresh") for row in result.all())
+
+    logger.info(
+        "Frontier of competitor %d: %d listed → %d to fetch (%d new/changed, %d refresh)",
+        competitor_id, listed_total or 0, len(batch),
+        sum(1 for u in batch if u.reason != "refresh"),
+        sum(1 for u in batch if u.reason == "refresh"),
+    )
+    return batch
+
+
+async def record_fetches(session: AsyncSession, outcomes: list[dict]) -> None:
+    """
+    Store fetch outcomes in one bulk UPDATE (does not commit).
+
+    Each outcome: ``{"id", "content_hash", "product_id"}`` for a fetched URL
+    (``product_id`` None keeps the known one), or ``{"id", "failed": True}``.
+    Failed URLs are stamped too, so they wait for the rolling refresh
+    instead of being retried on every crawl.
+    """
+    if not outcomes:
+        return
+    now = datetime.now(timezone.utc)
+    fetched = [o for o in outcomes if not o.get("failed")]
+    failed_ids = [o["id"] for o in outcomes if o.get("failed")]
+
+    if fetched:
+        await session.execute(
+            update(DeepCrawlUrl),
+            [
+                {
+                    "id": o["id"],
+                    "last_fetched_at": now,
+                    "content_hash": o.get("content_hash"),
+                    "fetch_failures": 0,
+                    **({"product_id": o["product_id"]} if o.get("product_id") else {}),
+                }
+                for o in fetched
+            ],
+        )
+    if failed_ids:
+        await session.execute(
+            update(DeepCrawlUrl)
+            .where(DeepCrawlUrl.id.in_(failed_ids))
+            .values(last_fetched_at=now, fetch_failures=DeepCrawlUrl.fetch_failures + 1)
+            .execution_options(synchronize_session=False)
+        )
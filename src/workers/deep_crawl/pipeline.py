@@ -0,0 +1,323 @@
+"""
+Concurrent deep crawl pipeline.
+
+A deep crawl fetches thousands of PDPs of one competitor. Processing
+them one by one (fetch → extract → commit → upload image) leaves the
+network idle during extraction and the CPU idle during fetches, and pays a
+commit per URL. The pipeline runs the stages side by side, connected by
+bounded queues (a slow stage pauses the ones before it):
+
+    fetch     ``fetch_workers`` tasks, paced per host by ``HostRateLimiter``;
+              pages whose body hash matches the last fetch skip extraction
+    extract   the ``ExtractionExecutor`` (process pool: off the event loop)
+    write     one task, one session: products upserted page by page,
+              committed with the frontier outcomes every ``commit_every``
+              products
+    upload    ``upload_workers`` tasks uploading the first image of new
+              products, written back to ``product.directus_image_id`` in batches
+
+Progress and throughput are logged every ``progress_interval`` seconds.
+
+Usage:
+    pipeline = DeepCrawlPipeline(competitor.id, client, extraction_executor=executor)
+    stats = await pipeline.run(batch)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+
+from curl_cffi.requests import RequestsError
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.http_client import FetchClient
+from core.models import Product
+from workers.deep_crawl.frontier import FrontierUrl, record_fetches
+from workers.web_monitor.catalog_writer import save_products
+from workers.web_monitor.change_detection import content_hash
+from workers.web_monitor.concurrency import HostRateLimiter
+from workers.web_monitor.extraction_executor import ExtractionExecutor
+from workers.web_monitor.models import ProductData
+
+logger = logging.getLogger(__name__)
+
+# (image_url, title) → Directus file id (None when the upload failed)
+ImageUploader = Callable[[str, str], Awaitable[str | None]]
+
+# product.discovered_from of deep crawled products (value already stored by earlier crawls)
+DISCOVERED_FROM = "SIETEMAP_DEEP_CRAWL"
+PAGE_TIMEOUT = 15.0
+IMAGE_UPDATE_BATCH = 100
+
+
+@dataclass(slots=True)
+class DeepCrawlStats:
+    """Counters of one pipeline run."""
+
+    urls: int = 0
+    fetched: int = 0
+    failed: int = 0
+    unchanged: int = 0
+    pages_with_products: int = 0
+    products: int = 0
+    commits: int = 0
+    images_uploaded: int = 0
+    images_failed: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    def as_dict(self) -> dict:
+        elapsed = time.monotonic() - self.started
+        done = self.fetched + self.failed
+        return {
+            "urls": self.urls,
+            "fetched": self.fetched,
+            "failed": self.failed,
+            "unchanged": self.unchanged,
+            "pages_with_products": self.pages_with_products,
+            "products": self.products,
+            "commits": self.commits,
+            "images_uploaded": self.images_uploaded,
+            "images_failed": self.images_failed,
+            "elapsed_seconds": round(elapsed, 1),
+            "urls_per_second": round(done / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+
+
+@dataclass(slots=True)
+class _FetchedPage:
+    item: FrontierUrl
+    html: str
+    headers: dict[str, str]
+    content_hash: str
+
+
+@dataclass(slots=True)
+class _PageResult:
+    """What the writer receives: a failure, an unchanged page or extracted products."""
+
+    item: FrontierUrl
+    content_hash: str | None = None
+    products: list[ProductData] | None = None
+    failed: bool = False
+
+
+class DeepCrawlPipeline:
+    """Fetch → extract → batched write → image upload, stages running concurrently."""
+
+    def __init__(
+        self,
+        competitor_id: int,
+        client: FetchClient,
+        *,
+        extraction_executor: ExtractionExecutor | None = None,
+        upload_image: ImageUploader | None = None,
+        rate_limiter: HostRateLimiter | None = None,
+        fetch_workers: int | None = None,
+        commit_every: int | None = None,
+        upload_workers: int | None = None,
+        progress_interval: float = 10.0,
+    ) -> None:
+        self.competitor_id = competitor_id
+        self.client = client
+        self.extraction_executor = extraction_executor or ExtractionExecutor()
+        self.upload_image = upload_image
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.fetch_workers = fetch_workers or settings.deep_crawl_fetch_workers
+        self.extract_workers = max(1, self.extraction_executor.max_workers)
+        self.commit_every = commit_every or settings.deep_crawl_commit_every
+        self.upload_workers = upload_workers or settings.deep_crawl_upload_workers
+        self.progress_interval = progress_interval
+        self.stats = DeepCrawlStats()
+
+        self._url_q: asyncio.Queue[FrontierUrl | None] = asyncio.Queue(self.fetch_workers * 2)
+        self._extract_q: asyncio.Queue[_FetchedPage | None] = asyncio.Queue(self.extract_workers * 2)
+        self._write_q: asyncio.Queue[_PageResult | None] = asyncio.Queue(100)
+        self._upload_q: asyncio.Queue[tuple[int, str, str] | None] = asyncio.Queue(1000)
+        self._image_q: asyncio.Queue[tuple[int, str] | None] = asyncio.Queue()
+
+    # ── Run ────────────────────────────────────────────────────────────
+
+    async def run(self, urls: Iterable[FrontierUrl]) -> dict:
+        """Crawl ``urls`` through every stage; returns the final stats."""
+        fetchers = [asyncio.create_task(self._fetcher()) for _ in range(self.fetch_workers)]
+        extractors = [asyncio.create_task(self._extractor()) for _ in range(self.extract_workers)]
+        writer = asyncio.create_task(self._writer())
+        uploaders = [asyncio.create_task(self._uploader()) for _ in range(self.upload_workers)]
+        image_writer = asyncio.create_task(self._image_writer())
+        progress = asyncio.create_task(self._report_progress())
+        tasks = [*fetchers, *extractors, writer, *uploaders, image_writer]
+
+        async def _feed_and_drain() -> None:
+            for item in urls:
+                self.stats.urls += 1
+                await self._url_q.put(item)
+            # Drain stage by stage: each one ends once the previous has finished
+            await self._close(self._url_q, fetchers)
+            await self._close(self._extract_q, extractors)
+            await self._close(self._write_q, [writer])
+            await self._close(self._upload_q, uploaders)
+            await self._close(self._image_q, [image_writer])
+
+        feeder = asyncio.create_task(_feed_and_drain())
+        tasks.append(feeder)
+        try:
+            # A crashed stage would leave the others blocked on its queue: stop everything
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+        finally:
+            progress.cancel()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(progress, *tasks, return_exceptions=True)
+
+        stats = self.stats.as_dict()
+        logger.info("Deep crawl of competitor %d finished: %s", self.competitor_id, stats)
+        return stats
+
+    @staticmethod
+    async def _close(queue: asyncio.Queue, workers: list[asyncio.Task]) -> None:
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+
+    async def _report_progress(self) -> None:
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            stats = self.stats.as_dict()
+            logger.info(
+                "Deep crawl progress: %d/%d URLs (%.2f/s), %d failed, %d unchanged, "
+                "%d products, %d images | queues fetch=%d extract=%d write=%d upload=%d",
+                stats["fetched"] + stats["failed"], stats["urls"], stats["urls_per_second"],
+                stats["failed"], stats["unchanged"], stats["products"], stats["images_uploaded"],
+                self._url_q.qsize(), self._extract_q.qsize(), self._write_q.qsize(), self._upload_q.qsize(),
+            )
+
+    # ── Stages ─────────────────────────────────────────────────────────
+
+    async def _fetcher(self) -> None:
+        while (item := await self._url_q.get()) is not None:
+            try:
+                await self.rate_limiter.acquire(item.url)
+                with self.rate_limiter.track(item.url):
+                    response = await self.client.get(item.url, timeout=PAGE_TIMEOUT)
+                    response.raise_for_status()
+            except RequestsError as exc:
+                logger.warning("Error fetching %s: %s", item.url, exc)
+                self.stats.failed += 1
+                await self._write_q.put(_PageResult(item, failed=True))
+                continue
+
+            self.stats.fetched += 1
+            html = response.text
+            page_hash = content_hash(html)
+            # Same page as last time (lastmod bumped, or refresh slice): nothing to extract
+            if page_hash == item.content_hash and item.product_id is not None:
+                self.stats.unchanged += 1
+                await self._write_q.put(_PageResult(item, content_hash=page_hash))
+                continue
+            await self._extract_q.put(_FetchedPage(item, html, dict(response.headers), page_hash))
+
+    async def _extractor(self) -> None:
+        while (page := await self._extract_q.get()) is not None:
+            try:
+                outcome = await self.extraction_executor.extract(page.html, page.headers, page.item.url)
+                products = outcome.result.products
+            except Exception:
+                logger.exception("Extraction failed on %s", page.item.url)
+                products = []
+            await self._write_q.put(_PageResult(page.item, content_hash=page.content_hash, products=products))
+
+    async def _writer(self) -> None:
+        from core.database import async_session_factory
+
+        pending: list[_PageResult] = []
+        pending_products = 0
+        async with async_session_factory() as session:
+            while (result := await self._write_q.get()) is not None:
+                pending.append(result)
+                pending_products += len(result.products or ())
+                # Failed / unchanged pages count too: the frontier outcomes must not pile up
+                if pending_products >= self.commit_every or len(pending) >= self.commit_every:
+                    await self._flush(session, pending)
+                    pending, pending_products = [], 0
+            if pending:
+                await self._flush(session, pending)
+
+    async def _flush(self, session: AsyncSession, results: list[_PageResult]) -> None:
+        """Upsert the products of ``results`` and their frontier outcomes in one transaction."""
+        outcomes: list[dict] = []
+        uploads: list[tuple[int, str, str]] = []
+        try:
+            for result in results:
+                if result.failed:
+                    outcomes.append({"id": result.item.id, "failed": True})
+                    continue
+                product_id = None
+                if result.products:
+                    saved = await save_products(
+                        session,
+                        self.competitor_id,
+                        result.products,
+                        page_url=result.item.url,
+                        discovered_from=DISCOVERED_FROM,
+                        record_prices=False,
+                    )
+                    self.stats.pages_with_products += 1
+                    self.stats.products += len(saved)
+                    product_id = saved[0].id if saved else None
+                    for product in saved:
+                        # Only products that don't have an image in Directus yet
+                        if product.directus_image_id is None and product.data.images:
+                            title = (product.data.title or "Product Image")[:100]
+                            uploads.append((product.id, product.data.images[0], title))
+                outcomes.append(
+                    {"id": result.item.id, "content_hash": result.content_hash, "product_id": product_id}
+                )
+            await record_fetches(session, outcomes)
+            await session.commit()
+            self.stats.commits += 1
+        except Exception:
+            logger.exception("Deep crawl batch of %d pages could not be saved", len(results))
+            await session.rollback()
+            return
+
+        if self.upload_image is not None:
+            for upload in uploads:
+                await self._upload_q.put(upload)
+
+    async def _uploader(self) -> None:
+        while (upload := await self._upload_q.get()) is not None:
+            product_id, image_url, title = upload
+            try:
+                file_id = await self.upload_image(image_url, title)
+            except Exception as exc:
+                logger.warning("Image upload failed for product %d: %s", product_id, exc)
+                file_id = None
+            if file_id:
+                self.stats.images_uploaded += 1
+                await self._image_q.put((product_id, file_id))
+            else:
+                self.stats.images_failed += 1
+
+    async def _image_writer(self) -> None:
+        from core.database import async_session_factory
+
+        pending: list[dict] = []
+        async with async_session_factory() as session:
+            while (image := await self._image_q.get()) is not None:
+                pending.append({"id": image[0], "directus_image_id": image[1]})
+                if len(pending) >= IMAGE_UPDATE_BATCH:
+                    await session.execute(update(Product), pending)
+                    await session.commit()
+                    pending = []
+            if pending:
+                await session.execute(update(Product), pending)
+                await session.commit()
@@ -0,0 +1,200 @@
+"""
+Streaming sitemap ingestion for the deep crawler.
+
+Large retailers publish sitemap indexes pointing to dozens of 50k-URL
+shards (often ``.xml.gz``). Loading each file into memory and into a
+DOM costs hundreds of MB, so this module never holds a whole file:
+
+- shards are fetched concurrently (``concurrency`` at a time) with a
+  streaming GET, product sitemaps first
+- gzip bodies are decompressed chunk by chunk (detected by magic bytes,
+  so both ``.xml.gz`` files and gzip-encoded responses work)
+- the XML is parsed with lxml's incremental ``XMLPullParser``; every
+  ``<url>`` / ``<sitemap>`` element is dropped as soon as it is read
+- URLs are handed to the consumer through a bounded queue, so a slow
+  consumer pauses the fetchers instead of buffering the catalog
+
+Memory stays flat whatever the sitemap size.
+
+Usage:
+    async for entry in iter_sitemap_urls(client, "https://www.example.com/sitemap.xml"):
+        print(entry.loc, entry.lastmod)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import zlib
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from curl_cffi.requests import RequestsError
+from lxml import etree
+
+from core.http_client import FetchClient
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b"\x1f\x8b"
+# Sub-sitemaps whose URL contains one of these are fetched first
+PRIORITY_HINTS = ("product", "produto", "producto", "sku")
+# Entries buffered between the fetchers and the consumer
+QUEUE_SIZE = 1000
+
+
+@dataclass(slots=True, frozen=True)
+class SitemapEntry:
+    """One ``<url>`` of a sitemap."""
+
+    loc: str
+    lastmod: datetime | None
+    sitemap: str  # shard it was listed in
+
+
+def parse_lastmod(value: str | None) -> datetime | None:
+    """W3C datetime (``2024-05-01``, ``2024-05-01T10:00:00Z``...) → aware datetime."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class _SitemapParser:
+    """Incremental parser of one sitemap / sitemap index body (fed in chunks)."""
+
+    def __init__(self) -> None:
+        self._parser = etree.XMLPullParser(
+            events=("end",), resolve_entities=False, no_network=True, huge_tree=True
+        )
+        self._inflate: zlib._Decompress | None = None
+        self._sniffed = False
+
+    def feed(self, chunk: bytes) -> list[tuple[str, str, str | None]]:
+        if not self._sniffed:
+            self._sniffed = True
+            if chunk[:2] == GZIP_MAGIC:
+                self._inflate = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        if self._inflate is not None:
+            chunk = self._inflate.decompress(chunk)
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def close(self) -> list[tuple[str, str, str | None]]:
+        if self._inflate is not None:
+            self._parser.feed(self._inflate.flush())
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self) -> list[tuple[str, str, str | None]]:
+        """(kind, loc, lastmod) of the ``<url>`` / ``<sitemap>`` elements completed so far."""
+        items = []
+        for _event, element in self._parser.read_events():
+            kind = etree.QName(element).localname
+            if kind not in ("url", "sitemap"):
+                continue
+            loc = lastmod = None
+            for child in element:
+                name = etree.QName(child).localname
+                if name == "loc":
+                    loc = (child.text or "").strip()
+                elif name == "lastmod":
+                    lastmod = (child.text or "").strip()
+            if loc:
+                items.append((kind, loc, lastmod))
+            # Drop the element and the already-read siblings: the tree stays tiny
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+        return items
+
+
+def _priority(url: str) -> int:
+    lowered = url.lower()
+    return 0 if any(hint in lowered for hint in PRIORITY_HINTS) else 1
+
+
+async def iter_sitemap_urls(
+    client: FetchClient,
+    sitemap_url: str,
+    *,
+    concurrency: int = 4,
+    max_sitemaps: int = 500,
+    sitemap_filter: Callable[[str, datetime | None], bool] | None = None,
+) -> AsyncIterator[SitemapEntry]:
+    """
+    Stream every URL reachable from ``sitemap_url`` (sitemap or index, recursively).
+
+    ``sitemap_filter(url, lastmod)`` can skip sub-sitemaps listed in an index
+    (e.g. shards unchanged since the last crawl). A shard that fails is
+    logged and skipped. Stopping the iteration early cancels the fetchers.
+    """
+    pending: asyncio.PriorityQueue[tuple[int, int, str]] = asyncio.PriorityQueue()
+    entries: asyncio.Queue[SitemapEntry | None] = asyncio.Queue(maxsize=QUEUE_SIZE)
+    order = itertools.count()
+    seen = {sitemap_url}
+    outstanding = 1
+    await pending.put((0, next(order), sitemap_url))
+
+    def _schedule(url: str, lastmod: str | None) -> None:
+        nonlocal outstanding
+        if url in seen or len(seen) >= max_sitemaps:
+            return
+        if sitemap_filter is not None and not sitemap_filter(url, parse_lastmod(lastmod)):
+            return
+        seen.add(url)
+        outstanding += 1
+        pending.put_nowait((_priority(url), next(order), url))
+
+    async def _ingest(url: str) -> None:
+        parser = _SitemapParser()
+        urls = 0
+        async with client.stream(url) as response:
+            if response.status_code >= 400:
+                logger.warning("Sitemap %s returned HTTP %d", url, response.status_code)
+                return
+            async for chunk in response.aiter_content():
+                for kind, loc, lastmod in parser.feed(chunk):
+                    if kind == "sitemap":
+                        _schedule(loc, lastmod)
+                    else:
+                        urls += 1
+                        await entries.put(SitemapEntry(loc, parse_lastmod(lastmod), url))
+        for kind, loc, lastmod in parser.close():
+            if kind == "sitemap":
+                _schedule(loc, lastmod)
+            else:
+                urls += 1
+                await entries.put(SitemapEntry(loc, parse_lastmod(lastmod), url))
+        logger.info("Sitemap %s: %d URLs", url, urls)
+
+    async def _fetcher() -> None:
+        nonlocal outstanding
+        while True:
+            _prio, _seq, url = await pending.get()
+            try:
+                await _ingest(url)
+            except (RequestsError, etree.XMLSyntaxError, zlib.error) as exc:
+                logger.warning("Failed reading sitemap %s: %s", url, exc)
+            except Exception:
+                # Any other error skips this sitemap only: the fetcher must keep
+                # draining the queue, or the stream would never end
+                logger.exception("Unexpected error reading sitemap %s", url)
+            finally:
+                outstanding -= 1
+                if outstanding == 0:
+                    await entries.put(None)  # every sitemap read: end of stream
+
+    fetchers = [asyncio.create_task(_fetcher()) for _ in range(max(1, concurrency))]
+    try:
+        while (entry := await entries.get()) is not None:
+            yield entry
+    finally:
+        for task in fetchers:
+            task.cancel()
+        await asyncio.gather(*fetchers, return_exceptions=True)
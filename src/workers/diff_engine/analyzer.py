@@ -3,6 +3,14 @@ Diff Engine — Detects changes between consecutive page snapshots.
 
 Compares the most recent DetectedSignal set against the previous one
 and generates ChangeEvent records with severity levels.
+
+Signals are matched by ``signal_fingerprint`` (hash of the normalized
+text), either page by page during the crawl or for a whole CrawlRun in a
+single SQL pass once the crawl is done (``settings.diff_mode``).
+
+A snapshot of an unchanged page shares the signals of an earlier one
+(``PageSnapshot.signals_snapshot_id``); both modes resolve it with
+``_signals_of`` and skip pairs that resolve to the same signal set.
 """
 
 from __future__ import annotations
@@ -10,8 +18,9 @@ from __future__ import annotations
 import logging
 import re
 
-from sqlalchemy import desc, select
+from sqlalchemy import and_, desc, func, or_, select, true
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from core.models import (
     ChangeEvent,
@@ -20,6 +29,7 @@ from core.models import (
     MonitoredPage,
     PageSnapshot,
     Severity,
+    SnapshotStatus,
 )
 
 logger = logging.getLogger(__name__)
@@ -35,19 +45,61 @@ _EVENT_SEVERITY: dict[EventType, Severity] = {
 }
 
 
+def _signals_of(snapshot):
+    """The snapshot whose DetectedSignal rows hold ``snapshot``'s signals."""
+    return func.coalesce(snapshot.signals_snapshot_id, snapshot.id)
+
+
+def _build_events(
+    competitor_id: int,
+    new_texts: list[str],
+    removed_texts: list[str],
+) -> list[ChangeEvent]:
+    events: list[ChangeEvent] = []
+
+    # New promos
+    for text in new_texts:
+        evt_type = EventType.FLASH_SALE if _is_flash_sale(text) else EventType.NEW_PROMO
+        events.append(
+            ChangeEvent(
+                competitor_id=competitor_id,
+                event_type=evt_type,
+                severity=_EVENT_SEVERITY[evt_type],
+                new_value=text,
+            )
+        )
+
+    # Removed promos
+    for text in removed_texts:
+        events.append(
+            ChangeEvent(
+                competitor_id=competitor_id,
+                event_type=EventType.REMOVED_PROMO,
+                severity=Severity.MEDIUM,
+                old_value=text,
+            )
+        )
+    return events
+
+
 async def analyze_changes(
     session: AsyncSession,
     page: MonitoredPage,
 ) -> list[ChangeEvent]:
     """
-    Compare signals from the latest snapshot against the previous one.
+    Compare signals from the latest extracted snapshot against the previous one.
 
-    Returns a list of ChangeEvent records (already added to session).
+    Per-page mode (``diff_mode="page"``); see ``analyze_run_changes`` for
+    the set-based variant. Returns a list of ChangeEvent records (already
+    added to session).
     """
-    # Get the two most recent snapshots for this page
+    # Get the two most recent extracted snapshots for this page
     result = await session.execute(
-        select(PageSnapshot.id)
-        .where(PageSnapshot.monitored_page_id == page.id)
+        select(_signals_of(PageSnapshot))
+        .where(
+            PageSnapshot.monitored_page_id == page.id,
+            PageSnapshot.status == SnapshotStatus.EXTRACTED,
+        )
         .order_by(desc(PageSnapshot.created_at))
         .limit(2)
     )
@@ -58,52 +110,151 @@ async def analyze_changes(
         return []
 
     current_id, previous_id = snapshot_ids[0], snapshot_ids[1]
+    if current_id == previous_id:
+        # Unchanged page: both snapshots share the same signals
+        return []
 
-    # Fetch signals for both snapshots
-    current_texts = await _get_signal_texts(session, current_id)
-    previous_texts = await _get_signal_texts(session, previous_id)
-
-    events: list[ChangeEvent] = []
-    competitor_id = page.competitor_id
-
-    # New promos
-    for text in current_texts - previous_texts:
-        evt_type = EventType.FLASH_SALE if _is_flash_sale(text) else EventType.NEW_PROMO
-        event = ChangeEvent(
-            competitor_id=competitor_id,
-            event_type=evt_type,
-            severity=_EVENT_SEVERITY[evt_type],
-            new_value=text,
+    # Fetch signals for both snapshots in one query, keyed by fingerprint
+    result = await session.execute(
+        select(
+            DetectedSignal.snapshot_id,
+            DetectedSignal.signal_fingerprint,
+            DetectedSignal.raw_text_found,
+        ).where(
+            DetectedSignal.snapshot_id.in_((current_id, previous_id)),
+            DetectedSignal.signal_fingerprint.is_not(None),
         )
-        session.add(event)
-        events.append(event)
+    )
+    current: dict[str, str] = {}
+    previous: dict[str, str] = {}
+    for snapshot_id, fingerprint, text in result.all():
+        target = current if snapshot_id == current_id else previous
+        target.setdefault(fingerprint, text.strip())
 
-    # Removed promos
-    for text in previous_texts - current_texts:
-        event = ChangeEvent(
-            competitor_id=competitor_id,
-            event_type=EventType.REMOVED_PROMO,
-            severity=Severity.MEDIUM,
-            old_value=text,
-        )
-        session.add(event)
-        events.append(event)
+    events = _build_events(
+        page.competitor_id,
+        [current[fp] for fp in current.keys() - previous.keys()],
+        [previous[fp] for fp in previous.keys() - current.keys()],
+    )
+    session.add_all(events)
 
     if events:
         logger.info(
             "Detected %d changes for %s (competitor_id=%d)",
-            len(events), page.url, competitor_id,
+            len(events), page.url, page.competitor_id,
         )
 
     return events
 
 
-async def _get_signal_texts(session: AsyncSession, snapshot_id: int) -> set[str]:
-    result = await session.execute(
-        select(DetectedSignal.raw_text_found)
-        .where(DetectedSignal.snapshot_id == snapshot_id)
+async def analyze_run_changes(session: AsyncSession, run_id: int) -> list[ChangeEvent]:
+    """
+    Set-based diff for every page of a CrawlRun in one SQL statement.
+
+    For each extracted snapshot of the run, the previous extracted snapshot
+    of the same page is found with a LATERAL lookup, and the two signal sets
+    are compared with a FULL OUTER JOIN on ``signal_fingerprint``. Pairs
+    sharing one signal set (unchanged pages) are dropped before the join.
+    Only the differences travel back to Python.
+
+    Returns a list of ChangeEvent records (already added to session).
+    """
+    current = (
+        select(
+            PageSnapshot.id.label("snapshot_id"),
+            _signals_of(PageSnapshot).label("signals_id"),
+            PageSnapshot.created_at,
+            PageSnapshot.monitored_page_id,
+            MonitoredPage.competitor_id,
+        )
+        .join(MonitoredPage, MonitoredPage.id == PageSnapshot.monitored_page_id)
+        .where(
+            PageSnapshot.run_id == run_id,
+            PageSnapshot.status == SnapshotStatus.EXTRACTED,
+        )
+        .cte("current_snapshot")
+    )
+
+    prev_snapshot = aliased(PageSnapshot)
+    previous = (
+        select(_signals_of(prev_snapshot).label("signals_id"))
+        .where(
+            prev_snapshot.monitored_page_id == current.c.monitored_page_id,
+            prev_snapshot.status == SnapshotStatus.EXTRACTED,
+            prev_snapshot.created_at < current.c.created_at,
+        )
+        .order_by(desc(prev_snapshot.created_at))
+        .limit(1)
+        .lateral("previous_snapshot")
+    )
+    pairs = (
+        select(
+            current.c.snapshot_id,
+            current.c.competitor_id,
+            current.c.signals_id,
+            previous.c.signals_id.label("previous_signals_id"),
+        )
+        .join(previous, true())
+        .where(current.c.signals_id != previous.c.signals_id)
+        .cte("snapshot_pair")
     )
-    return {row[0].strip() for row in result.all() if row[0]}
+
+    def _signals(snapshot_col, name: str):
+        return (
+            select(
+                pairs.c.snapshot_id.label("pair_id"),
+                pairs.c.competitor_id,
+                DetectedSignal.signal_fingerprint,
+                func.min(DetectedSignal.raw_text_found).label("text"),
+            )
+            .join(DetectedSignal, DetectedSignal.snapshot_id == snapshot_col)
+            .where(DetectedSignal.signal_fingerprint.is_not(None))
+            .group_by(pairs.c.snapshot_id, pairs.c.competitor_id, DetectedSignal.signal_fingerprint)
+            .cte(name)
+        )
+
+    cur_sig = _signals(pairs.c.signals_id, "current_signal")
+    prev_sig = _signals(pairs.c.previous_signals_id, "previous_signal")
+
+    stmt = (
+        select(
+            func.coalesce(cur_sig.c.competitor_id, prev_sig.c.competitor_id),
+            cur_sig.c.text,
+            prev_sig.c.text,
+        )
+        .select_from(cur_sig)
+        .join(
+            prev_sig,
+            and_(
+                prev_sig.c.pair_id == cur_sig.c.pair_id,
+                prev_sig.c.signal_fingerprint == cur_sig.c.signal_fingerprint,
+            ),
+            full=True,
+        )
+        .where(or_(cur_sig.c.signal_fingerprint.is_(None), prev_sig.c.signal_fingerprint.is_(None)))
+    )
+    result = await session.execute(stmt)
+
+    added: dict[int, list[str]] = {}
+    removed: dict[int, list[str]] = {}
+    for competitor_id, new_text, old_text in result.all():
+        if new_text is not None:
+            added.setdefault(competitor_id, []).append(new_text.strip())
+        else:
+            removed.setdefault(competitor_id, []).append(old_text.strip())
+
+    events: list[ChangeEvent] = []
+    for competitor_id in added.keys() | removed.keys():
+        events.extend(
+            _build_events(competitor_id, added.get(competitor_id, []), removed.get(competitor_id, []))
+        )
+    session.add_all(events)
+
+    logger.info(
+        "Diff for CrawlRun #%d: %d changes across %d competitors",
+        run_id, len(events), len(added.keys() | removed.keys()),
+    )
+    return events
 
 
 def _is_flash_sale(text: str) -> bool:
@@ -3,13 +3,17 @@
 from __future__ import annotations
 
 import logging
-import re
-from bs4 import BeautifulSoup
 
-from core.models import NewsletterMessage, DetectedSignal, SignalType
+from core.models import DetectedSignal, NewsletterMessage, SignalSource
+from workers.signal_engine.rules import signal_engine
+from workers.web_monitor.document import ParsedDocument
+from workers.web_monitor.models import SignalType
 
 logger = logging.getLogger(__name__)
 
+# Signal kinds looked for in newsletters, in priority order (one signal per text)
+_NEWSLETTER_KINDS = (SignalType.PROMO, SignalType.FINANCING, SignalType.SHIPPING)
+
 
 class NewsletterParser:
     """Extracts signals and prices from newsletter emails."""
@@ -17,7 +21,7 @@ class NewsletterParser:
     def __init__(self, message: NewsletterMessage, html_content: str) -> None:
         self.message = message
         self.html = html_content
-        self.soup = BeautifulSoup(html_content, "html.parser")
+        self.document = ParsedDocument(html_content)
 
     def extract_signals(self) -> list[DetectedSignal]:
         """
@@ -26,29 +30,28 @@ class NewsletterParser:
         Uses common newsletter patterns (alt text, headline text, buttons).
         """
         signals: list[DetectedSignal] = []
+        tree = self.document.tree
         
         # 1. Subject line is often the best signal
         subject = self.message.subject or ""
         self._add_signals_from_text(subject, "SUBJECT_LINE", signals)
 
         # 2. Extract from <img> alt texts (common in retail newsletters)
-        imgs = self.soup.find_all("img", alt=True)
-        for img in imgs:
-            alt = img["alt"].strip()
+        for img in tree.iterfind(".//img[@alt]"):
+            alt = img.get("alt").strip()
             if len(alt) > 5:
                 self._add_signals_from_text(alt, "IMG_ALT", signals)
 
         # 3. Extract from CTA buttons/links
-        links = self.soup.find_all("a")
-        for link in links:
-            text = link.get_text().strip()
+        for link in tree.iter("a"):
+            text = link.text_content().strip()
             if len(text) > 5:
                 # Common patterns: "Comprar con 20% OFF", "Ver cuotas"
                 self._add_signals_from_text(text, "CTA_LINK", signals)
 
         # 4. Extract from visible headlines (H1/H2)
-        for h in self.soup.find_all(["h1", "h2", "strong", "b"]):
-            text = h.get_text().strip()
+        for h in tree.iter("h1", "h2", "strong", "b"):
+            text = h.text_content().strip()
             if 10 < len(text) < 150:
                 self._add_signals_from_text(text, "HEADLINE", signals)
 
@@ -63,49 +66,17 @@ class NewsletterParser:
         return unique_signals
 
     def _add_signals_from_text(self, text: str, source: str, signals: list[DetectedSignal]) -> None:
-        """Helper to find promos and financing in a snippet of text."""
-        # -- Discount detection --
-        # 20% OFF, 2x1, 3x2, hasta 50% desc, etc.
-        promo_patterns = [
-            r"\d{1,3}%\s*(?:off|desc|descuento|ahorro|dscto)",
-            r"\d\s*x\s*\d",
-            r"(?:promo|oferta|liquidaci[oó]n|sale|hot\s*sale)",
-            r"2do\s+al\s+\d{1,3}%",
-            r"llev[at]\s*\d\s*pag[at]\s*\d"
-        ]
-        for pattern in promo_patterns:
-            match = re.search(pattern, text, re.I)
-            if match:
-                signals.append(DetectedSignal(
-                    raw_text_found=text,
-                    source_type=SignalType.PROMO,
-                    metadata_json={"source_origin": source, "detected_pattern": match.group(0)}
-                ))
-                break
-
-        # -- Financing detection --
-        # 3 cuotas, 6 sin interés, Plan Z, etc.
-        fin_patterns = [
-            r"\d{1,2}\s*cuotas",
-            r"sin\s*inter[eé]s",
-            r"(?:visa|mastercard|amex|naranja|cabal)",
-            r"ahora\s*\d{1,2}"
-        ]
-        for pattern in fin_patterns:
-            match = re.search(pattern, text, re.I)
-            if match:
-                signals.append(DetectedSignal(
-                    raw_text_found=text,
-                    source_type=SignalType.FINANCIACION,
-                    metadata_json={"source_origin": source, "detected_pattern": match.group(0)}
-                ))
-                break
-
-        # -- Shipping detection --
-        ship_match = re.search(r"(env[ií]o\s*grat[ií]s|gratis\s*a\s*todo\s*el\s*pa[ií]s|entrega\s*sin\s*cargo)", text, re.I)
-        if ship_match:
+        """Helper to find promos, financing and shipping in a snippet of text (one scan)."""
+        hits = signal_engine.scan(text)
+        for kind in _NEWSLETTER_KINDS:
+            of_kind = [hit for hit in hits if hit.rule.kind == kind]
+            if not of_kind:
+                continue
+            # Strongest rule of the kind wins (e.g. "20% OFF" over a bare "promo")
+            best = max(of_kind, key=lambda hit: hit.rule.confidence)
+            logger.debug("  %s [%s] %s ← %r", kind, source, best.rule.name, best.text)
             signals.append(DetectedSignal(
+                source_type=SignalSource.EMAIL,
                 raw_text_found=text,
-                source_type=SignalType.ENVIO,
-                metadata_json={"source_origin": source, "detected_pattern": ship_match.group(0)}
+                confidence_score=best.rule.confidence,
             ))
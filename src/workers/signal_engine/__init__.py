@@ -0,0 +1 @@
+"""Signal Engine package: compiled promo / financing / shipping rules shared by web and email."""
@@ -0,0 +1,214 @@
+"""
+Signal Rules — one compiled rule set for web pages and newsletters.
+
+Every promo / financing / shipping / CTA pattern lives here once, so the
+web extractor (``GenericHtmlExtractor``) and the email parser
+(``NewsletterParser``) can no longer drift apart. Patterns are calibrated
+for Spanish-language Argentine eCommerce.
+
+``SignalRuleEngine`` compiles all rules into a single scanner: each text
+block is walked once, and at every position where some rule can start,
+one zero-width probe per rule records which rules match there. Only those
+hits are re-matched with the rule's own pattern to get its groups. The
+result is the same as running ``finditer`` per rule, without N passes.
+
+Usage:
+    for hit in signal_engine.scan("12 cuotas sin interés con Visa"):
+        hit.rule.name, hit.text, hit.groups
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from workers.web_monitor.models import SignalType
+
+
+@dataclass(frozen=True, slots=True)
+class SignalRule:
+    """A named pattern that flags one kind of commercial signal."""
+
+    name: str
+    kind: SignalType
+    pattern: str
+    confidence: float                  # 0.0 – 1.0
+    discount_type: str | None = None   # PERCENTAGE, FIXED, 2X1, COMBO (promos only)
+
+
+@dataclass(frozen=True, slots=True)
+class RuleMatch:
+    """One occurrence of a rule in a text block."""
+
+    rule: SignalRule
+    text: str                          # matched substring
+    start: int
+    end: int
+    groups: tuple[str | None, ...]     # the rule pattern's own capture groups
+
+
+# ── Rules ─────────────────────────────────────────────────────────────
+# Order matters: within a kind, consumers take the first matching rule.
+# Each pattern is the union of the former web and newsletter variants.
+# Patterns are lowercase-only: the scanner matches them against text.lower().
+
+SIGNAL_RULES: tuple[SignalRule, ...] = (
+    # Promo: "30% OFF", "30% de descuento", "20% desc."
+    SignalRule(
+        "percentage_off", SignalType.PROMO,
+        r"(\d{1,3})\s*%\s*(?:de\s+)?(?:off|descuento|desc\.?|ahorro|dscto\.?)",
+        0.90, "PERCENTAGE",
+    ),
+    # Promo: "$5.000 de descuento"
+    SignalRule(
+        "fixed_amount_off", SignalType.PROMO,
+        r"\$\s*(\d[\d.,]+)\s*(?:de\s+)?(?:descuento|ahorro|off)\b",
+        0.85, "FIXED",
+    ),
+    # Promo: "2x1", "3 x 2", "dos por uno", "2do al 50%", "2do gratis", "llevá 3 pagá 2"
+    SignalRule(
+        "multi_buy", SignalType.PROMO,
+        r"\b(\d\s*[x×]\s*\d|dos\s+por\s+uno|2do\s+(?:al\s+)?(?:\d+%?|gratis)|"
+        r"llev[aá]\s*\d\s*pag[aá]\s*\d)(?!\w)",
+        0.88, "2X1",
+    ),
+    # Promo: "combo", "pack", "kit", "llevá 3"
+    SignalRule(
+        "bundle", SignalType.PROMO,
+        r"\b(combo|pack|kit|bundle|llev[aá]\s*\d+)\b",
+        0.70, "COMBO",
+    ),
+    # Promo (weak): sale wording without a concrete offer
+    SignalRule(
+        "sale_keyword", SignalType.PROMO,
+        r"\b(?:promo(?:s|ci[oó]n|ciones)?|ofertas?|liquidaci[oó]n|hot\s*sale|cyber\s*monday|"
+        r"black\s*friday|sale)\b",
+        0.50,
+    ),
+    # Financing: "12 cuotas sin interés", "6 cuotas con Visa"
+    SignalRule(
+        "installments", SignalType.FINANCING,
+        r"(\d{1,2})\s*(?:cuotas?|pagos?|meses?)\s*"
+        r"(?:(sin|con)\s+inter[eé]s)?"
+        r"(?:\s+(?:con|en)\s+([a-záéíóú]{2,}(?:\s+[a-záéíóú]{2,})?))?",
+        0.85,
+    ),
+    # Financing: "Ahora 12" (programa de cuotas)
+    SignalRule("ahora_plan", SignalType.FINANCING, r"\bahora\s*(\d{1,2})\b", 0.80),
+    SignalRule("interest_free", SignalType.FINANCING, r"sin\s*inter[eé]s", 0.70),
+    # Financing: common Argentine banks / cards / wallets
+    SignalRule(
+        "bank", SignalType.FINANCING,
+        r"\b(visa|mastercard|amex|american\s+express|naranja|cabal|galicia|"
+        r"santander|bbva|hsbc|itaú|banco\s+naci[oó]n|bna|macro|patagonia|"
+        r"mercado\s*pago|mercadopago|mp\b|uala|ual[aá])\b",
+        0.60,
+    ),
+    # Shipping: "envío gratis", "gratis a todo el país", "entrega sin cargo"
+    SignalRule(
+        "free_shipping", SignalType.SHIPPING,
+        r"\b(env[íi]o\s+grat[íi]s|env[íi]o\s+(?:sin\s+cargo|incluido|express|"
+        r"r[aá]pido|same.?day)|despacho\s+gratis|retiro\s+gratis|"
+        r"gratis\s+a\s+todo\s+el\s+pa[íi]s|entrega\s+sin\s+cargo)\b",
+        0.80,
+    ),
+    # CTA buttons: "Comprar", "Ver oferta", "Aprovechá", etc.
+    SignalRule(
+        "cta", SignalType.CTA,
+        r"\b(comprar?|ver\s+oferta|ver\s+m[aá]s|aprovech[aá]|quiero|lo\s+quiero|"
+        r"agregar|a[ñn]adir|saber\s+m[aá]s|pedir|solicitar|descubr[íi]|"
+        r"explorar|ir\s+a\s+tienda|shop\s+now|buy\s+now|order\s+now)\b",
+        0.90,
+    ),
+)
+
+
+# ── Engine ────────────────────────────────────────────────────────────
+
+# (compiled scanner, rule indexes it covers, group number of each rule probe)
+_Scanner = tuple[re.Pattern[str], tuple[int, ...], tuple[int, ...]]
+
+
+class SignalRuleEngine:
+    """All rules compiled into one single-pass scanner (plus one per kind)."""
+
+    def __init__(self, rules: Iterable[SignalRule] = SIGNAL_RULES) -> None:
+        self.rules = tuple(rules)
+        self._order = {rule: i for i, rule in enumerate(self.rules)}
+        self._patterns = tuple(re.compile(rule.pattern, re.IGNORECASE) for rule in self.rules)
+        self._scanners: dict[SignalType | None, _Scanner] = {None: self._compile(range(len(self.rules)))}
+        for kind in {rule.kind for rule in self.rules}:
+            self._scanners[kind] = self._compile(
+                i for i, rule in enumerate(self.rules) if rule.kind == kind
+            )
+
+    def _compile(self, indexes: Iterable[int]) -> _Scanner:
+        """
+        ``(?=A|B|…)`` guard + one optional zero-width probe per rule.
+
+        The guard rejects most positions with a single alternation attempt;
+        where it passes, every probe runs and the empty group ``r<i>``
+        participates only if rule ``i`` matches at that position.
+
+        Rules are written in lowercase and the scanner runs case-sensitively
+        over ``text.lower()``, which is ~2x faster than IGNORECASE in ``re``.
+        """
+        indexes = tuple(indexes)
+        guard = "|".join(f"(?:{self.rules[i].pattern})" for i in indexes)
+        probes = "".join(f"(?:(?=(?:{self.rules[i].pattern}))(?P<r{i}>))?" for i in indexes)
+        scanner = re.compile(f"(?=(?:{guard})){probes}")
+        return scanner, indexes, tuple(scanner.groupindex[f"r{i}"] for i in indexes)
+
+    def scan(self, text: str, kind: SignalType | None = None) -> list[RuleMatch]:
+        """
+        All rule matches in ``text`` (optionally of one ``kind``), by position.
+
+        Per rule, matches do not overlap — same as ``re.finditer``.
+        """
+        if not text:
+            return []
+        scanner, indexes, group_numbers = self._scanners[kind]
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few characters change length when lowercased: offsets would not line up
+            return self._scan_per_rule(text, indexes)
+
+        resume_at = [0] * len(self.rules)
+        hits: list[RuleMatch] = []
+        for probe in scanner.finditer(lowered):
+            pos = probe.start()
+            for i, probed in zip(indexes, probe.group(0, *group_numbers)[1:]):
+                if probed is None or pos < resume_at[i]:
+                    continue
+                # Re-match on the original text: groups keep their case ("Visa")
+                match = self._patterns[i].match(text, pos)
+                if match is None:
+                    continue
+                resume_at[i] = max(match.end(), pos + 1)
+                hits.append(self._hit(i, match))
+        return hits
+
+    def _scan_per_rule(self, text: str, indexes: tuple[int, ...]) -> list[RuleMatch]:
+        hits = [self._hit(i, match) for i in indexes for match in self._patterns[i].finditer(text)]
+        hits.sort(key=lambda hit: hit.start)
+        return hits
+
+    def _hit(self, index: int, match: re.Match[str]) -> RuleMatch:
+        return RuleMatch(
+            rule=self.rules[index],
+            text=match.group(0),
+            start=match.start(),
+            end=match.end(),
+            groups=match.groups(),
+        )
+
+    def first(self, text: str, kind: SignalType) -> RuleMatch | None:
+        """The first rule (in rule order) of ``kind`` that matches ``text``."""
+        hits = self.scan(text, kind)
+        if not hits:
+            return None
+        return min(hits, key=lambda hit: (self._order[hit.rule], hit.start))
+
+
+signal_engine = SignalRuleEngine()
@@ -11,25 +11,37 @@ import logging
 from datetime import datetime
 import re
 
+import lxml.html
+from lxml.html import HtmlElement
+from pywappalyzer.utils import Site, TechnologiesProcessor
 from pywappalyzer.wappalyzer import Pywappalyzer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from curl_cffi.requests import AsyncSession as CurlSession
-
+from core.http_client import DEFAULT_HEADERS, FetchClient
 from core.models import (
     CompetitorTechProfile,
     TechProfileChange,
     TechProfileHistory,
 )
+from workers.web_monitor.document import ParsedDocument
 
 logger = logging.getLogger(__name__)
 
+# Inline <script> bodies bigger than this are data blobs (__STATE__, JSON),
+# not tracking snippets: skip them to keep Wappalyzer's regex scan cheap.
+_MAX_INLINE_SCRIPT = 64 * 1024
+
+
+def _markup(element: HtmlElement) -> str:
+    return lxml.html.tostring(element, encoding="unicode", with_tail=False)
+
 
 class TechFingerprinter:
     """Detects and tracks technology changes in competitors."""
 
-    def __init__(self) -> None:
+    def __init__(self, fetch_client: FetchClient | None = None) -> None:
         self.wappalyzer = Pywappalyzer()
+        self.fetch_client = fetch_client
 
     def _sanitize_html(self, html: str) -> str:
         """Limit total size to 250KB for safety."""
@@ -37,23 +49,56 @@ class TechFingerprinter:
 
     async def _fetch_url(self, url: str) -> tuple[str, dict[str, str]]:
         """Fetch URL using curl_cffi to bypass protections and get raw headers."""
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/121.0.0.0 Safari/537.36"
-            ),
-            "Accept-Language": "es-AR,es;q=0.9,en;q=0.8",
+        if self.fetch_client is None:
+            async with FetchClient(max_connections=1) as client:
+                return await self._fetch_with(client, url)
+        return await self._fetch_with(self.fetch_client, url)
+
+    async def _fetch_with(self, client: FetchClient, url: str) -> tuple[str, dict[str, str]]:
+        try:
+            response = await client.get(url, headers=DEFAULT_HEADERS, timeout=15.0)
+            return response.text, dict(response.headers)
+        except Exception as e:
+            logger.warning("Failed to fetch %s for fingerprinting: %s", url, e)
+            return "", {}
+
+    def _analyze_document(self, document: ParsedDocument) -> dict[str, list[str]]:
+        """
+        Run Wappalyzer's style/script matchers on the page's shared parse tree.
+        ``Pywappalyzer.analyze_html`` would re-parse the HTML three more times.
+        """
+        tree = document.tree
+        site = Site(url="", static=True)
+        # Wappalyzer matches its patterns against the tags' markup
+        site.meta = {
+            "html": b"",
+            "js": {},
+            "headers": {},
+            "host": "",
+            "styles": [_markup(tag) for tag in tree.iter("link", "style")],
+            "scripts": [
+                _markup(script)
+                for script in tree.iter("script")
+                if script.get("src") or len(script.text or "") <= _MAX_INLINE_SCRIPT
+            ],
         }
-        async with CurlSession(impersonate="chrome120", timeout=15.0) as client:
-            try:
-                response = await client.get(url, headers=headers)
-                return response.text, dict(response.headers)
-            except Exception as e:
-                logger.warning("Failed to fetch %s for fingerprinting: %s", url, e)
-                return "", {}
-
-    def _detect_ecommerce_platform(self, html: str, headers: dict[str, str]) -> str | None:
+        processor = TechnologiesProcessor(
+            headers={},
+            site=site,
+            technologies=self.wappalyzer.technologies,
+            categories=self.wappalyzer.categories,
+        )
+        return {
+            key: list(set(value))
+            for key, value in {**processor.analyze_styles(), **processor.analyze_scripts()}.items()
+        }
+
+    def _detect_ecommerce_platform(
+        self,
+        html: str,
+        headers: dict[str, str],
+        html_lower: str | None = None,
+    ) -> str | None:
         """Custom aggressive detection for LATAM ecosystem platforms."""
         headers_lower = {k.lower(): v.lower() for k, v in headers.items()}
         
@@ -66,7 +111,7 @@ class TechFingerprinter:
             return "PrestaShop"
 
         # 2. Check HTML Footprints
-        html_lower = html.lower()
+        html_lower = html_lower if html_lower is not None else html.lower()
         if "vtex" in html_lower or "vtexassets.com" in html_lower or "__state__" in html_lower:
             return "VTEX"
         if "shopify.com" in html_lower or "cdn.shopify.com" in html_lower:
@@ -86,14 +131,19 @@ class TechFingerprinter:
         competitor_id: int,
         url: str,
         html: str | None = None,
+        *,
+        document: ParsedDocument | None = None,
     ) -> CompetitorTechProfile | None:
         """
         Analyze a URL/HTML to detect technologies and update the profile.
+        Pass the page's ``document`` to reuse its parse tree.
         """
         try:
             logger.info("  Fingerprinting tech for competitor %d (URL: %s)", competitor_id, url)
             
             headers = {}
+            if document is not None:
+                html = document.html
             if not html:
                 logger.info("    Fetching URL internally...")
                 html, headers = await self._fetch_url(url)
@@ -103,13 +153,18 @@ class TechFingerprinter:
                 return None
 
             # Detect platform via custom fast paths
-            platform = self._detect_ecommerce_platform(html, headers)
+            platform = self._detect_ecommerce_platform(
+                html, headers, document.lower_html if document is not None else None
+            )
             if platform:
                 logger.info("    Aggressive detection matched: %s", platform)
 
             # Analyze other scripts using Wappalyzer
-            sanitized = self._sanitize_html(html)
-            results = self.wappalyzer.analyze_html(html=sanitized.encode("utf-8"))
+            if document is not None:
+                results = self._analyze_document(document)
+            else:
+                sanitized = self._sanitize_html(html)
+                results = self.wappalyzer.analyze_html(html=sanitized.encode("utf-8"))
             
             # Map Wappalyzer categories
             cat_map = {
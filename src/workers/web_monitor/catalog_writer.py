@@ -0,0 +1,205 @@
+"""
+Catalog Writer — set-based product / variant / price persistence.
+
+Persists every ``ProductData`` of one ``ExtractionResult`` in a handful of
+statements instead of one SELECT + INSERT per product and per variant:
+
+1. ``INSERT ... ON CONFLICT DO UPDATE`` for products
+   - with SKU    → keyed on (competitor_id, sku)
+   - without SKU → keyed on (competitor_id, url) WHERE sku IS NULL
+2. ``INSERT ... ON CONFLICT DO UPDATE`` for all variants, keyed on (product_id, sku)
+3. Change-only ``price_history`` intervals (see price_history.py): products
+   whose price / stock did not change write nothing
+
+Updates follow the previous row-by-row semantics: new non-empty values win,
+missing ones keep what is already stored; the URL and the origin of a
+product are kept from its first insert.
+
+Shared by the web monitor orchestrator and the deep crawler.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from sqlalchemy import func, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.models import Product, ProductVariant
+from workers.web_monitor.models import ProductData
+from workers.web_monitor.price_history import record_price_changes
+
+logger = logging.getLogger(__name__)
+
+# Columns refreshed on conflict with COALESCE(new, existing). ``url`` is only
+# set on INSERT: listing pages fill it with their own URL (extractors rarely
+# know the product's), which must not replace a stored product page URL.
+_PRODUCT_MERGE_COLUMNS = (
+    "brand",
+    "title",
+    "category_path",
+    "category_tree",
+    "description",
+    "images",
+    "current_price",
+    "financing_options",
+    "rating_avg",
+    "review_count",
+    "badges",
+)
+# Rows per INSERT: asyncpg caps a statement at 32767 bind parameters
+UPSERT_CHUNK = 1000
+
+
+def _chunks(rows: list, size: int = UPSERT_CHUNK):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+@dataclass(slots=True)
+class SavedProduct:
+    """A product row as it stands after the upsert."""
+
+    id: int
+    data: ProductData
+    directus_image_id: str | None = None
+
+
+def _product_row(
+    competitor_id: int,
+    data: ProductData,
+    page_url: str,
+    discovered_from: str | None,
+) -> dict:
+    return {
+        "competitor_id": competitor_id,
+        "sku": data.sku,
+        "url": data.url or page_url,
+        "brand": data.brand,
+        "title": data.title,
+        "category_path": data.category_path,
+        # Empty lists → NULL so COALESCE keeps the stored value
+        "category_tree": data.category_tree or None,
+        "description": data.description,
+        "images": data.images or None,
+        "current_price": data.sale_price or data.list_price,
+        "financing_options": {"installments": data.installments} if data.installments else None,
+        "discovered_from": discovered_from or data.source_url or page_url,
+        "rating_avg": data.rating,
+        "review_count": data.review_count,
+        "badges": data.badges or None,
+        "is_active": True,
+    }
+
+
+async def _upsert_product_rows(session: AsyncSession, rows: list[dict], *, by_sku: bool) -> list:
+    stmt = pg_insert(Product).values(rows)
+    merge = {col: func.coalesce(stmt.excluded[col], Product.__table__.c[col]) for col in _PRODUCT_MERGE_COLUMNS}
+    # The first origin of a product is kept (the new value always falls back to the page URL)
+    merge["discovered_from"] = func.coalesce(Product.__table__.c.discovered_from, stmt.excluded.discovered_from)
+    merge["is_active"] = true()
+    merge["updated_at"] = func.now()
+
+    if by_sku:
+        stmt = stmt.on_conflict_do_update(index_elements=["competitor_id", "sku"], set_=merge)
+    else:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["competitor_id", "url"],
+            index_where=Product.sku.is_(None),
+            set_=merge,
+        )
+    stmt = stmt.returning(Product.id, Product.sku, Product.url, Product.directus_image_id)
+    result = await session.execute(stmt)
+    return list(result.all())
+
+
+async def save_products(
+    session: AsyncSession,
+    competitor_id: int,
+    products: Sequence[ProductData],
+    *,
+    page_url: str,
+    snapshot_id: int | None = None,
+    discovered_from: str | None = None,
+    record_prices: bool = True,
+) -> list[SavedProduct]:
+    """
+    Upsert products, their variants and the price changes of each product.
+
+    Duplicate keys inside the same batch are collapsed (last one wins):
+    Postgres refuses to update the same row twice in one ON CONFLICT statement.
+    Rows are written in conflict-key order, so concurrent writers of the same
+    competitor lock them in the same order (no deadlocks), and in chunks of
+    ``UPSERT_CHUNK`` rows.
+    """
+    with_sku: dict[str, tuple[ProductData, dict]] = {}
+    without_sku: dict[str, tuple[ProductData, dict]] = {}
+    for data in products:
+        row = _product_row(competitor_id, data, page_url, discovered_from)
+        if data.sku:
+            with_sku[data.sku] = (data, row)
+        else:
+            without_sku[row["url"]] = (data, row)
+
+    saved: list[SavedProduct] = []
+    for chunk in _chunks([row for _, (_, row) in sorted(with_sku.items())]):
+        for pid, sku, _url, image_id in await _upsert_product_rows(session, chunk, by_sku=True):
+            saved.append(SavedProduct(id=pid, data=with_sku[sku][0], directus_image_id=image_id))
+    for chunk in _chunks([row for _, (_, row) in sorted(without_sku.items())]):
+        for pid, _sku, url, image_id in await _upsert_product_rows(session, chunk, by_sku=False):
+            saved.append(SavedProduct(id=pid, data=without_sku[url][0], directus_image_id=image_id))
+
+    if not saved:
+        return saved
+
+    # Variants: one statement per chunk of the whole batch
+    variant_rows: dict[tuple[int, str | None], dict] = {}
+    for product in saved:
+        for v in product.data.variants:
+            variant_rows[(product.id, v.sku)] = {
+                "product_id": product.id,
+                "sku": v.sku,
+                "title": v.title,
+                "is_in_stock": v.is_in_stock,
+                "list_price": v.list_price,
+                "sale_price": v.sale_price,
+                "raw_metadata": v.raw_metadata or None,
+            }
+    ordered_variants = [row for _, row in sorted(variant_rows.items(), key=lambda item: (item[0][0], item[0][1] or ""))]
+    for chunk in _chunks(ordered_variants):
+        stmt = pg_insert(ProductVariant).values(chunk)
+        table = ProductVariant.__table__.c
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["product_id", "sku"],
+            set_={
+                "title": func.coalesce(stmt.excluded.title, table.title),
+                "is_in_stock": stmt.excluded.is_in_stock,
+                "list_price": func.coalesce(stmt.excluded.list_price, table.list_price),
+                "sale_price": func.coalesce(stmt.excluded.sale_price, table.sale_price),
+                "raw_metadata": func.coalesce(stmt.excluded.raw_metadata, table.raw_metadata),
+            },
+        )
+        await session.execute(stmt)
+
+    if record_prices:
+        price_rows = [
+            {
+                "product_id": product.id,
+                "snapshot_id": snapshot_id,
+                "list_price": product.data.list_price,
+                "sale_price": product.data.sale_price,
+                "currency": product.data.currency or "ARS",
+                "is_in_stock": product.data.is_in_stock,
+            }
+            for product in sorted(saved, key=lambda product: product.id)
+        ]
+        for chunk in _chunks(price_rows):
+            await record_price_changes(session, chunk)
+
+    logger.debug(
+        "Catalog batch: %d products, %d variants upserted", len(saved), len(variant_rows)
+    )
+    return saved
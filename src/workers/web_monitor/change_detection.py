@@ -0,0 +1,65 @@
+"""
+Change detection helpers for monitored pages.
+
+Most monitored pages are identical between consecutive runs. Two cheap
+checks let the orchestrator skip parsing/extraction entirely:
+
+1. HTTP validators (ETag / Last-Modified) → conditional GET, 304 = unchanged.
+2. A hash of the *normalized* body, for servers that ignore validators.
+   Normalization strips per-request noise (nonces, CSRF tokens, cache
+   busters, server timestamps, whitespace) so that only real content
+   changes produce a different hash.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+
+# Per-request noise that changes on every response without any real content change
+_VOLATILE_PATTERNS: list[tuple[re.Pattern[str], str]] = [
+    # CSP nonces on <script>/<style>
+    (re.compile(r'\snonce="[^"]*"', re.IGNORECASE), ""),
+    # CSRF / form keys (Magento form_key, Rails/Laravel tokens)
+    (
+        re.compile(
+            r'((?:name|id)="(?:form_key|csrf[_-]?token|_token|authenticity_token)"[^>]*?value=")[^"]*"',
+            re.IGNORECASE,
+        ),
+        r'\1"',
+    ),
+    (re.compile(r'(<meta\s+name="csrf-token"\s+content=")[^"]*"', re.IGNORECASE), r'\1"'),
+    # Cache busters in asset URLs: app.js?v=1708790000
+    (re.compile(r"([?&](?:v|ver|t|ts|cb|_)=)[\w.\-]{6,}"), r"\1"),
+    # Server-rendered timestamps / request ids in inline JSON
+    (
+        re.compile(
+            r'"(?:serverTime|server_time|requestId|request_id|renderedAt|timestamp|now)"\s*:\s*"?[\w:.+\-]+"?',
+        ),
+        "",
+    ),
+    # Whitespace / indentation differences
+    (re.compile(r"\s+"), " "),
+]
+
+
+def normalize_html(html: str) -> str:
+    """Remove volatile, non-content noise from an HTML document."""
+    for pattern, replacement in _VOLATILE_PATTERNS:
+        html = pattern.sub(replacement, html)
+    return html.strip()
+
+
+def content_hash(html: str) -> str:
+    """SHA-256 of the normalized document (hex, 64 chars)."""
+    return hashlib.sha256(normalize_html(html).encode("utf-8", "replace")).hexdigest()
+
+
+def conditional_headers(etag: str | None, last_modified: str | None) -> dict[str, str]:
+    """Build If-None-Match / If-Modified-Since headers from stored validators."""
+    headers: dict[str, str] = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
@@ -0,0 +1,247 @@
+"""
+Concurrency limits for the crawl pipeline.
+
+A crawl run fans out over many competitors at once, but each single
+site must still receive polite traffic. ``HostLimiter`` combines a
+global cap (how many pages are in flight overall) with a per-host cap
+(how many pages of the same domain are in flight).
+
+``HostRateLimiter`` paces the requests themselves: one adaptive token
+bucket per host (AIMD — the rate grows slowly while the host answers and
+halves on 429/503, timeouts or slow responses, honouring ``Retry-After``)
+plus a circuit breaker that stops requesting a host for the rest of the
+run after repeated failures.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+from curl_cffi.requests import RequestsError
+from curl_cffi.requests.exceptions import Timeout
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Statuses that mean "slow down" (the host is overloaded or rate limiting us)
+THROTTLE_STATUSES = frozenset({429, 503})
+# Backoff without Retry-After: 2s, 4s, 8s ... capped at max_backoff
+BACKOFF_BASE_SECONDS = 2.0
+
+
+def host_key(url: str) -> str:
+    """Normalize a URL to the domain used for per-host limits (www-insensitive)."""
+    netloc = urlparse(url).netloc.lower()
+    return netloc.removeprefix("www.")
+
+
+class HostLimiter:
+    """
+    Global + per-host concurrency limiter.
+
+    Usage:
+        limiter = HostLimiter(global_limit=8, per_host_limit=2)
+        async with limiter.slot(page.url):
+            await process(page)
+    """
+
+    def __init__(self, global_limit: int, per_host_limit: int) -> None:
+        self._global = asyncio.Semaphore(max(1, global_limit))
+        self._per_host_limit = max(1, per_host_limit)
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """Hold one global slot and one slot for the URL's host."""
+        host_sem = self._hosts.get(host_key(url))
+        if host_sem is None:
+            host_sem = asyncio.Semaphore(self._per_host_limit)
+            self._hosts[host_key(url)] = host_sem
+
+        # Host first: tasks queued behind a busy domain must not hold
+        # global slots that other competitors could be using.
+        async with host_sem:
+            async with self._global:
+                yield
+
+
+class HostCircuitOpen(RequestsError):
+    """The host failed too often in this run: it is not requested again."""
+
+
+def parse_retry_after(value: str | None, now: datetime | None = None) -> float | None:
+    """``Retry-After`` (delta-seconds or HTTP-date) → seconds to wait."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - (now or datetime.now(timezone.utc))).total_seconds())
+
+
+@dataclass(slots=True)
+class _HostState:
+    """Token bucket + breaker state of one host."""
+
+    rate: float                      # tokens (requests) per second
+    tokens: float = 1.0
+    refilled_at: float = field(default_factory=time.monotonic)
+    cooldown_until: float = 0.0
+    consecutive_failures: int = 0
+    circuit_open: bool = False
+    throttled: int = 0               # responses that made us slow down
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def refill(self, now: float) -> None:
+        # Burst capacity: one second worth of requests (at least one)
+        capacity = max(1.0, self.rate)
+        self.tokens = min(capacity, self.tokens + (now - self.refilled_at) * self.rate)
+        self.refilled_at = now
+
+
+class HostRateLimiter:
+    """
+    Adaptive per-host request pacing with a circuit breaker (one per crawl run).
+
+    - success: rate += ``increase`` (up to ``max_rate``), failures reset
+    - 429 / 503: rate halved, wait ``Retry-After`` (or exponential backoff)
+    - timeout / network error / 5xx: rate halved, exponential backoff
+    - response slower than ``slow_seconds``: rate halved
+    - other 4xx: the host answered — neutral
+    - ``breaker_failures`` consecutive failures, or a ``Retry-After`` longer
+      than ``max_backoff``: circuit opens, ``acquire`` raises ``HostCircuitOpen``
+
+    Usage:
+        rate_limiter = HostRateLimiter()
+        await rate_limiter.acquire(page.url)
+        with rate_limiter.track(page.url):
+            response = await client.get(page.url)
+            response.raise_for_status()
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_rate: float | None = None,
+        min_rate: float | None = None,
+        max_rate: float | None = None,
+        increase: float = 0.1,
+        slow_seconds: float | None = None,
+        breaker_failures: int | None = None,
+        max_backoff: float | None = None,
+    ) -> None:
+        self.initial_rate = initial_rate or settings.crawl_host_rate_per_second
+        self.min_rate = min_rate or settings.crawl_host_min_rate_per_second
+        self.max_rate = max_rate or settings.crawl_host_max_rate_per_second
+        self.increase = increase
+        self.slow_seconds = slow_seconds or settings.crawl_host_slow_seconds
+        self.breaker_failures = breaker_failures or settings.crawl_host_breaker_failures
+        self.max_backoff = max_backoff or settings.crawl_host_max_backoff_seconds
+        self._hosts: dict[str, _HostState] = {}
+
+    def _state(self, url: str) -> tuple[str, _HostState]:
+        host = host_key(url)
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(rate=self.initial_rate)
+        return host, state
+
+    def is_open(self, url: str) -> bool:
+        return self._state(url)[1].circuit_open
+
+    async def acquire(self, url: str) -> None:
+        """Wait for the host's next request slot. Raises ``HostCircuitOpen``."""
+        host, state = self._state(url)
+        # Waiters of one host queue on its lock (FIFO), not on the clock
+        async with state.lock:
+            while True:
+                if state.circuit_open:
+                    raise HostCircuitOpen(f"Circuit open for {host}: skipped for the rest of the run")
+                now = time.monotonic()
+                if now < state.cooldown_until:
+                    await asyncio.sleep(state.cooldown_until - now)
+                    continue
+                state.refill(now)
+                if state.tokens >= 1.0:
+                    state.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - state.tokens) / state.rate)
+
+    @contextmanager
+    def track(self, url: str) -> Iterator[None]:
+        """Feed the outcome (and latency) of the enclosed request back into the host's rate."""
+        started = time.monotonic()
+        try:
+            yield
+        except RequestsError as exc:
+            response = getattr(exc, "response", None)
+            status = getattr(response, "status_code", None)
+            if status is None or isinstance(exc, Timeout):
+                self._failure(url, reason=type(exc).__name__)
+            elif status in THROTTLE_STATUSES:
+                headers = getattr(response, "headers", None) or {}
+                self._failure(url, reason=str(status), retry_after=parse_retry_after(headers.get("Retry-After")))
+            elif status >= 500:
+                self._failure(url, reason=str(status))
+            else:
+                self._success(url, time.monotonic() - started)
+            raise
+        else:
+            self._success(url, time.monotonic() - started)
+
+    def _success(self, url: str, latency: float) -> None:
+        host, state = self._state(url)
+        state.consecutive_failures = 0
+        if latency > self.slow_seconds:
+            state.rate = max(self.min_rate, state.rate / 2)
+            state.throttled += 1
+            logger.info("Rate limiter: %s slow (%.1fs) → %.2f req/s", host, latency, state.rate)
+        else:
+            state.rate = min(self.max_rate, state.rate + self.increase)
+
+    def _failure(self, url: str, *, reason: str, retry_after: float | None = None) -> None:
+        host, state = self._state(url)
+        state.consecutive_failures += 1
+        state.throttled += 1
+        state.rate = max(self.min_rate, state.rate / 2)
+        state.tokens = min(state.tokens, 0.0)
+
+        backoff = retry_after
+        if backoff is None:
+            backoff = BACKOFF_BASE_SECONDS * 2 ** (state.consecutive_failures - 1)
+        if state.consecutive_failures >= self.breaker_failures or (
+            retry_after is not None and retry_after > self.max_backoff
+        ):
+            state.circuit_open = True
+            logger.warning(
+                "Rate limiter: circuit opened for %s after %d failure(s) (last: %s)",
+                host, state.consecutive_failures, reason,
+            )
+            return
+        backoff = min(backoff, self.max_backoff)
+        state.cooldown_until = max(state.cooldown_until, time.monotonic() + backoff)
+        logger.info(
+            "Rate limiter: %s %s → %.2f req/s, backing off %.1fs", host, reason, state.rate, backoff
+        )
+
+    def stats(self) -> dict:
+        return {
+            "hosts": len(self._hosts),
+            "throttled_hosts": sum(1 for s in self._hosts.values() if s.throttled),
+            "open_circuits": sorted(h for h, s in self._hosts.items() if s.circuit_open),
+        }
@@ -15,8 +15,9 @@ import re
 from dataclasses import dataclass
 from urllib.parse import urljoin, urlparse
 
-from bs4 import BeautifulSoup, Tag
+from lxml.html import HtmlElement
 
+from workers.web_monitor.document import ParsedDocument, text
 from workers.web_monitor.models import EcommercePlatform
 
 logger = logging.getLogger(__name__)
@@ -91,17 +92,17 @@ def _classify_url(url: str, anchor_text: str) -> str:
     return "CATEGORY"
 
 
-def _get_zones(soup: BeautifulSoup, platform: EcommercePlatform) -> list[Tag]:
+def _get_zones(document: ParsedDocument, platform: EcommercePlatform) -> list[HtmlElement]:
     """
     Returns a list of HTML zones to scan (header + nav + footer only).
     Tries platform-specific selectors first, falls back to universal ones.
     """
-    zones: list[Tag] = []
+    zones: list[HtmlElement] = []
     seen_ids: set[int] = set()
 
     selectors = PLATFORM_SELECTORS.get(platform, []) + UNIVERSAL_SELECTORS
     for selector in selectors:
-        for tag in soup.select(selector):
+        for tag in document.css(selector):
             tag_id = id(tag)
             if tag_id not in seen_ids:
                 seen_ids.add(tag_id)
@@ -116,6 +117,7 @@ def discover_pages(
     platform: EcommercePlatform,
     *,
     max_pages: int = 30,
+    document: ParsedDocument | None = None,
 ) -> list[DiscoveredPage]:
     """
     Discover key pages linked from the header/footer navigation.
@@ -125,13 +127,14 @@ def discover_pages(
         base_url: Base URL to resolve relative links.
         platform: Detected eCommerce platform.
         max_pages: Max links to return.
+        document: Shared parse tree of ``html`` (avoids re-parsing).
 
     Returns:
         List of DiscoveredPage with classified page types.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    document = document or ParsedDocument(html, base_url)
     base_domain = urlparse(base_url).netloc
-    zones = _get_zones(soup, platform)
+    zones = _get_zones(document, platform)
 
     if not zones:
         logger.warning("No header/footer zones found for %s", base_url)
@@ -141,9 +144,9 @@ def discover_pages(
     seen_urls: set[str] = set()
 
     for zone in zones:
-        zone_name = zone.name or zone.get("class", ["unknown"])[0]
+        zone_name = zone.tag or (zone.get("class") or "unknown").split()[0]
 
-        for a_tag in zone.find_all("a", href=True):
+        for a_tag in zone.iterfind(".//a[@href]"):
             href = a_tag.get("href", "").strip()
             if not href or href.startswith(("#", "javascript:", "mailto:", "tel:")):
                 continue
@@ -162,7 +165,7 @@ def discover_pages(
                 continue
             seen_urls.add(clean_url)
 
-            anchor_text = a_tag.get_text(separator=" ", strip=True)
+            anchor_text = text(a_tag, " ")
             page_type = _classify_url(clean_url, anchor_text)
 
             discovered.append(
@@ -0,0 +1,185 @@
+"""
+ParsedDocument — one parse tree per fetched page.
+
+The same HTML used to be parsed by every stage (extractor BeautifulSoup +
+scrapling Selector, discovery, Wappalyzer). ``ParsedDocument`` is built
+once per page in ``process_monitored_page`` and handed to every stage.
+The tree is an ``lxml.html`` document (C parser, ~20x faster than
+``html.parser``) and CSS selectors are compiled once to XPath, instead of
+being matched in pure Python by soupsieve.
+
+Accessors (all lazy, cached):
+    tree         lxml.html root element
+    selector     scrapling Selector over the same tree
+    lower_html   lowercased raw HTML, for substring heuristics
+    title        <title> text
+    text_chunks  text blocks of promo-rich zones
+    scripts      inline <script> contents
+    json_ld      parsed application/ld+json payloads
+    meta         <meta> property/name → content
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from functools import cached_property, lru_cache
+
+import lxml.html
+from cssselect import SelectorError
+from lxml import etree
+from lxml.cssselect import CSSSelector
+from scrapling import Selector
+
+logger = logging.getLogger(__name__)
+
+# Promo-rich zones scanned for text chunks
+_PROMO_ZONES = (
+    "main, section, article, .banner, .promo, .offer, .hero, "
+    "[class*='offer'], [class*='promo'], [class*='banner'], [class*='slider']"
+)
+_CHUNK_TAGS = frozenset({"h1", "h2", "h3", "h4", "p", "span", "div", "a", "li"})
+_MAX_CHUNKS = 200
+
+# Visible text nodes (BeautifulSoup.get_text skips script/style contents too)
+_TEXT_NODES = etree.XPath(".//text()[not(ancestor::script) and not(ancestor::style)]")
+
+
+@lru_cache(maxsize=512)
+def _compile(css: str) -> CSSSelector | None:
+    try:
+        return CSSSelector(css, translator="html")
+    except SelectorError as exc:
+        logger.warning("Unsupported CSS selector %r: %s", css, exc)
+        return None
+
+
+def text(element: lxml.html.HtmlElement, separator: str = "") -> str:
+    """Stripped visible text of an element (like ``Tag.get_text(separator, strip=True)``)."""
+    return separator.join(s for s in (node.strip() for node in _TEXT_NODES(element)) if s)
+
+
+def own_text(element: lxml.html.HtmlElement) -> str:
+    """Text placed directly in the element before its first child."""
+    return element.text or ""
+
+
+def _parse(html: str) -> lxml.html.HtmlElement:
+    if not html.strip():
+        return lxml.html.document_fromstring("<html><head></head></html>")
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        # Unicode strings with an XML encoding declaration are rejected by lxml
+        parser = lxml.html.HTMLParser(encoding="utf-8")
+        return lxml.html.document_fromstring(html.encode("utf-8", "replace"), parser=parser)
+
+
+class ParsedDocument:
+    """Lazily parsed HTML document shared by all pipeline stages."""
+
+    def __init__(self, html: str, url: str | None = None) -> None:
+        self.html = html
+        self.url = url
+
+    # ── Trees ──────────────────────────────────────────────────────────
+
+    @cached_property
+    def tree(self) -> lxml.html.HtmlElement:
+        return _parse(self.html)
+
+    @cached_property
+    def selector(self) -> Selector:
+        return Selector(root=self.tree, url=self.url or "")
+
+    @property
+    def body(self) -> lxml.html.HtmlElement | None:
+        return self.tree.find("body")
+
+    # ── Queries ────────────────────────────────────────────────────────
+
+    def css(self, css: str, root: lxml.html.HtmlElement | None = None) -> list[lxml.html.HtmlElement]:
+        """All elements matching ``css`` under ``root`` (whole document by default), in document order."""
+        compiled = _compile(css)
+        if compiled is None:
+            return []
+        if root is None:
+            return compiled(self.tree)
+        # Like BeautifulSoup's Tag.select: descendants only, never the root itself
+        return [el for el in compiled(root) if el is not root]
+
+    def css_first(self, css: str, root: lxml.html.HtmlElement | None = None) -> lxml.html.HtmlElement | None:
+        matches = self.css(css, root)
+        return matches[0] if matches else None
+
+    def first_text(self, css: str) -> str | None:
+        """Own text of the first element matching ``css``; None if nothing matches."""
+        element = self.css_first(css)
+        return own_text(element) if element is not None else None
+
+    # ── Derived views ──────────────────────────────────────────────────
+
+    @cached_property
+    def lower_html(self) -> str:
+        return self.html.lower()
+
+    @cached_property
+    def title(self) -> str | None:
+        element = self.tree.find(".//title")
+        return element.text if element is not None else None
+
+    @cached_property
+    def text_chunks(self) -> list[str]:
+        """Meaningful text blocks from the page body, skipping scripts/styles."""
+        promo_zones = self.css(_PROMO_ZONES)
+        if not promo_zones:
+            body = self.body
+            promo_zones = [body if body is not None else self.tree]
+
+        chunks = []
+        for zone in promo_zones:
+            for element in zone:
+                if element.tag not in _CHUNK_TAGS:
+                    continue
+                chunk = text(element, " ")
+                if 5 < len(chunk) < 500:
+                    chunks.append(chunk)
+
+        return chunks[:_MAX_CHUNKS]  # Cap to avoid processing huge pages
+
+    @cached_property
+    def scripts(self) -> list[str]:
+        """Contents of inline <script> tags (external scripts are skipped)."""
+        return [script.text for script in self.tree.iter("script") if script.text]
+
+    @cached_property
+    def json_ld(self) -> list[dict | list]:
+        """Parsed JSON-LD payloads; invalid blocks are skipped."""
+        payloads = []
+        for script in self.tree.iter("script"):
+            if (script.get("type") or "").lower() != "application/ld+json":
+                continue
+            try:
+                payloads.append(json.loads(script.text or ""))
+            except json.JSONDecodeError:
+                continue
+        return payloads
+
+    @cached_property
+    def meta(self) -> dict[str, str]:
+        """First ``content`` per meta ``property`` / ``name`` (e.g. og:title, description)."""
+        tags: dict[str, str] = {}
+        for tag in self.tree.iter("meta"):
+            content = tag.get("content")
+            if content is None:
+                continue
+            for attr in ("property", "name"):
+                key = tag.get(attr)
+                if key and key not in tags:
+                    tags[key] = content
+        return tags
+
+    def release(self) -> None:
+        """Drop the parse tree and derived views early (large pages hold tens of MB)."""
+        for name in ("tree", "selector", "title", "text_chunks", "scripts", "json_ld", "meta", "lower_html"):
+            self.__dict__.pop(name, None)
@@ -0,0 +1,194 @@
+"""
+Extraction executor — runs platform detection + extraction off the event loop.
+
+Extractors are CPU-bound (HTML parsing, regex loops, VTEX ``__STATE__``
+decoding) even though their interface is ``async``. Run inline, one heavy
+page stalls every concurrent fetch, heartbeat and DB call of the worker.
+
+``ExtractionExecutor`` has two modes (``settings.extraction_mode``):
+
+    inline   run on the event loop, sharing the caller's ParsedDocument
+    process  ship the raw HTML bytes to a ProcessPoolExecutor; the worker
+             process parses, detects and extracts, and returns a picklable
+             ``ExtractionOutcome``. The event loop only does I/O.
+
+The pool is created lazily with the ``spawn`` start method (forking a
+process that runs asyncio, curl and Chromium threads is unsafe) and its
+workers are recycled every ``extraction_max_tasks_per_child`` pages to
+cap parser memory growth. One executor lives in ``ctx["extraction_executor"]``
+per ARQ worker.
+
+Usage:
+    async with ExtractionExecutor() as executor:
+        outcome = await executor.extract(html, headers, url)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from types import TracebackType
+from typing import Literal
+
+from core.config import settings
+from workers.web_monitor.document import ParsedDocument
+from workers.web_monitor.extractor_factory import ExtractorFactory
+from workers.web_monitor.models import ExtractionResult, PlatformDetection
+from workers.web_monitor.platform_detector import PlatformDetector
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class ExtractionOutcome:
+    """Platform detection + extraction result of one page (picklable)."""
+
+    detection: PlatformDetection
+    result: ExtractionResult
+    cpu_seconds: float = 0.0
+    detection_seconds: float = 0.0     # wall time, measured where it ran
+    extraction_seconds: float = 0.0
+
+
+async def _extract(
+    html: str,
+    headers: dict[str, str],
+    url: str,
+    document: ParsedDocument | None = None,
+) -> ExtractionOutcome:
+    started = time.process_time()
+    wall_started = time.perf_counter()
+    document = document or ParsedDocument(html, url)
+    detection = PlatformDetector.analyze(html, headers, html_lower=document.lower_html)
+    detected_at = time.perf_counter()
+    extractor = ExtractorFactory.create(detection.platform, html, headers, url, document=document)
+    result = await extractor.extract_all()
+    return ExtractionOutcome(
+        detection=detection,
+        result=result,
+        cpu_seconds=time.process_time() - started,
+        detection_seconds=detected_at - wall_started,
+        extraction_seconds=time.perf_counter() - detected_at,
+    )
+
+
+def _extract_in_worker(html: bytes, headers: dict[str, str], url: str) -> ExtractionOutcome:
+    """Pool entry point: decode, parse, detect and extract in the worker process."""
+    return asyncio.run(_extract(html.decode("utf-8", "replace"), headers, url))
+
+
+class ExtractionExecutor:
+    """Runs page extraction inline or in a process pool."""
+
+    def __init__(
+        self,
+        *,
+        mode: Literal["inline", "process"] | None = None,
+        max_workers: int | None = None,
+        max_tasks_per_child: int | None = None,
+    ) -> None:
+        self.mode = mode or settings.extraction_mode
+        self.max_workers = max_workers or settings.extraction_workers
+        self.max_tasks_per_child = max_tasks_per_child or settings.extraction_max_tasks_per_child
+        self._pool: ProcessPoolExecutor | None = None
+        self._pages = 0
+        self._failures = 0
+        self._cpu_seconds = 0.0
+        self._pool_restarts = 0
+
+    # ── Lifecycle ──────────────────────────────────────────────────────
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=self.max_tasks_per_child,
+            )
+            logger.info(
+                "ExtractionExecutor: process pool started (%d workers, recycled every %d pages)",
+                self.max_workers, self.max_tasks_per_child,
+            )
+        return self._pool
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+
+    async def __aenter__(self) -> ExtractionExecutor:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    # ── Extraction ─────────────────────────────────────────────────────
+
+    async def extract(
+        self,
+        html: str,
+        headers: dict[str, str],
+        url: str,
+        *,
+        document: ParsedDocument | None = None,
+    ) -> ExtractionOutcome:
+        """
+        Detect the platform and run its extractor on ``html``.
+
+        ``document`` is only used inline; a worker process builds its own.
+        A crashed worker (OOM, parser segfault) breaks the whole pool: it is
+        discarded so the next page gets a fresh one, and the error propagates
+        to fail this page only.
+        """
+        pool = None
+        try:
+            if self.mode == "inline":
+                outcome = await _extract(html, dict(headers), url, document)
+            else:
+                loop = asyncio.get_running_loop()
+                pool = self._get_pool()
+                outcome = await loop.run_in_executor(
+                    pool,
+                    _extract_in_worker,
+                    html.encode("utf-8", "replace"),
+                    dict(headers),
+                    url,
+                )
+        except BrokenProcessPool:
+            self._failures += 1
+            # Pages fail concurrently: only the pool this page ran on is discarded,
+            # never a fresh one another page already created
+            if pool is not None and self._pool is pool:
+                self._pool = None
+                self._pool_restarts += 1
+                logger.error("Extraction worker died on %s — restarting the process pool", url)
+                pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        except Exception:
+            self._failures += 1
+            raise
+
+        self._pages += 1
+        self._cpu_seconds += outcome.cpu_seconds
+        return outcome
+
+    # ── Metrics ────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "pages": self._pages,
+            "failures": self._failures,
+            "pool_restarts": self._pool_restarts,
+            "cpu_seconds": round(self._cpu_seconds, 3),
+        }
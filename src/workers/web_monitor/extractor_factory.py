@@ -18,6 +18,7 @@ from __future__ import annotations
 
 import logging
 
+from workers.web_monitor.document import ParsedDocument
 from workers.web_monitor.extractors.base import BaseExtractor
 from workers.web_monitor.extractors.generic_html import GenericHtmlExtractor
 from workers.web_monitor.extractors.magento import MagentoExtractor
@@ -59,12 +60,15 @@ class ExtractorFactory:
         html: str,
         headers: dict[str, str],
         url: str | None = None,
+        *,
+        document: ParsedDocument | None = None,
     ) -> BaseExtractor:
         """
         Instantiate the extractor for the given platform.
 
         Falls back to GenericHtmlExtractor if the platform is UNKNOWN,
-        CUSTOM, or not yet specifically implemented.
+        CUSTOM, or not yet specifically implemented. Pass the page's
+        ``document`` to share its parse tree with other pipeline stages.
         """
         extractor_cls = _EXTRACTOR_REGISTRY.get(platform)
 
@@ -73,7 +77,7 @@ class ExtractorFactory:
                 "No specific extractor for platform=%s, falling back to GenericHtmlExtractor.",
                 platform,
             )
-            return GenericHtmlExtractor(html, headers, url)
+            return GenericHtmlExtractor(html, headers, url, document=document)
 
         logger.info("Using %s for platform=%s.", extractor_cls.__name__, platform)
-        return extractor_cls(html, headers, url)
+        return extractor_cls(html, headers, url, document=document)
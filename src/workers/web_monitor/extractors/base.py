@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 
+from workers.web_monitor.document import ParsedDocument
 from workers.web_monitor.models import ExtractionResult, ProductData
 
 
@@ -11,8 +12,10 @@ class BaseExtractor(ABC):
     """
     Contract for all commercial signal extractors.
 
-    HTML and headers are injected via __init__. Subclasses parse
-    their target platform and return typed signals — never raw dicts.
+    HTML and headers are injected via __init__, optionally with the page's
+    shared ParsedDocument (so the HTML is parsed only once per page).
+    Subclasses parse their target platform and return typed signals —
+    never raw dicts.
 
     Principles:
     - Return empty lists / None on extraction failure (never raise).
@@ -20,10 +23,18 @@ class BaseExtractor(ABC):
     - All methods are async for Playwright compatibility.
     """
 
-    def __init__(self, html: str, headers: dict[str, str], url: str | None = None) -> None:
+    def __init__(
+        self,
+        html: str,
+        headers: dict[str, str],
+        url: str | None = None,
+        *,
+        document: ParsedDocument | None = None,
+    ) -> None:
         self.html = html
         self.headers = headers
         self.url = url
+        self.document = document or ParsedDocument(html, url)
 
     @abstractmethod
     async def extract_all(self) -> ExtractionResult:
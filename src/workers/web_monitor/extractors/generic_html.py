@@ -2,7 +2,8 @@
 Generic HTML Extractor — Regex-based signal extraction
 =======================================================
 Fallback extractor for any eCommerce platform.
-Uses regex patterns calibrated for Spanish-language Argentine eCommerce.
+Uses the shared signal rules (``workers.signal_engine.rules``), calibrated for
+Spanish-language Argentine eCommerce.
 
 Extracts:
   - PromoSignal: discount %, 2x1, combos
@@ -17,9 +18,14 @@ from __future__ import annotations
 
 import logging
 import re
-from bs4 import BeautifulSoup
+from functools import cached_property
+from itertools import islice
+
+from lxml.html import HtmlElement
 from scrapling import Selector
 
+from workers.signal_engine.rules import signal_engine
+from workers.web_monitor.document import ParsedDocument, own_text, text
 from workers.web_monitor.extractors.base import BaseExtractor
 from workers.web_monitor.models import (
     CallToAction,
@@ -29,107 +35,47 @@ from workers.web_monitor.models import (
     PromoSignal,
     EcommercePlatform,
     ProductData,
+    SignalType,
 )
 
 logger = logging.getLogger(__name__)
 
-# ── Regex Patterns ─────────────────────────────────────────────────────
-
-# Promo: "30% OFF", "30% de descuento", "2x1", "2 x 1", "combo"
-_PROMO_PERCENTAGE = re.compile(
-    r"(\d{1,3})\s*%\s*(?:de\s+)?(?:off|descuento|ahorro|dscto\.?)",
-    re.IGNORECASE,
-)
-_PROMO_2X1 = re.compile(
-    r"\b(2\s*[xX×]\s*1|dos\s+por\s+uno|2do\s+(?:al\s+)?(?:\d+|gratis))\b",
-    re.IGNORECASE,
-)
-_PROMO_COMBO = re.compile(
-    r"\b(combo|pack|kit|bundle|llev[aá]\s*\d+)\b",
-    re.IGNORECASE,
-)
-_PROMO_FIXED_AR = re.compile(
-    r"\$\s*(\d[\d.,]+)\s*(?:de\s+)?(?:descuento|ahorro|off)\b",
-    re.IGNORECASE,
-)
-
-# Financing: "12 cuotas sin interés", "6 cuotas con Visa"
-_FIN_INSTALLMENTS = re.compile(
-    r"(\d{1,2})\s*(?:cuotas?|pagos?|meses?)\s*"
-    r"(?:(sin|con)\s+inter[eé]s)?"
-    r"(?:\s+(?:con|en)\s+([A-ZÁÉÍÓÚ][a-záéíóú]+(?:\s+[A-ZÁÉÍÓÚ][a-záéíóú]+)?))?",
-    re.IGNORECASE,
-)
-
-# Common Argentine banks
-_BANKS = re.compile(
-    r"\b(Visa|Mastercard|AMEX|American\s+Express|Naranja|Cabal|Galicia|"
-    r"Santander|BBVA|HSBC|Itaú|Banco\s+Naci[oó]n|BNA|Macro|Patagonia|"
-    r"Mercado\s*Pago|MercadoPago|MP\b|Uala|Ual[aá])\b",
-    re.IGNORECASE,
-)
-
-# CTA buttons: "Comprar", "Ver oferta", "Aprovechá", etc.
-_CTA_PATTERNS = re.compile(
-    r"\b(comprar?|ver\s+oferta|ver\s+m[aá]s|aprovech[aá]|quiero|lo\s+quiero|"
-    r"agregar|a[ñn]adir|saber\s+m[aá]s|pedir|solicitar|descubr[íi]|"
-    r"explorar|ir\s+a\s+tienda|shop\s+now|buy\s+now|order\s+now)\b",
-    re.IGNORECASE,
-)
-
-# Shipping
-_SHIPPING = re.compile(
-    r"\b(env[íi]o\s+gratis|env[íi]o\s+(?:sin\s+cargo|incluido|express|"
-    r"r[aá]pido|same.?day)|despacho\s+gratis|retiro\s+gratis)\b",
-    re.IGNORECASE,
-)
-
-
-def _extract_text_chunks(soup: BeautifulSoup) -> list[str]:
-    """Extract meaningful text blocks from the page body, skipping scripts/styles."""
-    # Focus on promo-rich zones
-    promo_zones = soup.select(
-        "main, section, article, .banner, .promo, .offer, .hero, "
-        "[class*='offer'], [class*='promo'], [class*='banner'], [class*='slider']"
-    )
-    if not promo_zones:
-        promo_zones = [soup.body] if soup.body else [soup]
-
-    chunks = []
-    for zone in promo_zones:
-        for element in zone.find_all(
-            ["h1", "h2", "h3", "h4", "p", "span", "div", "a", "li"],
-            recursive=False,
-        ):
-            text = element.get_text(separator=" ", strip=True)
-            if 5 < len(text) < 500:
-                chunks.append(text)
-
-    return chunks[:200]  # Cap to avoid processing huge pages
-
-
 class GenericHtmlExtractor(BaseExtractor):
     """
     Regex-based signal extractor for generic / unknown eCommerce platforms.
     Production-ready with Argentine eCommerce patterns.
     """
 
-    def __init__(self, html: str, headers: dict[str, str], url: str | None = None) -> None:
-        super().__init__(html, headers, url)
-        self.soup = BeautifulSoup(html, "html.parser")
-        self.selector = Selector(html)
+    def __init__(
+        self,
+        html: str,
+        headers: dict[str, str],
+        url: str | None = None,
+        *,
+        document: ParsedDocument | None = None,
+    ) -> None:
+        super().__init__(html, headers, url, document=document)
         self._platform = EcommercePlatform.UNKNOWN
 
+    # Parse trees come from the shared document (built once, lazily)
+    @property
+    def tree(self) -> HtmlElement:
+        return self.document.tree
+
+    @property
+    def selector(self) -> Selector:
+        return self.document.selector
+
     # ── Public interface (required by BaseExtractor) ───────────────────
 
     async def extract_all(self) -> ExtractionResult:
         result = ExtractionResult(platform_detected=self._platform)
 
-        if not self.soup.body:
+        if self.document.body is None:
             logger.warning("GenericExtractor: no <body> found, returning empty result")
             return result
 
-        chunks = _extract_text_chunks(self.soup)
+        chunks = self.document.text_chunks
         full_text = " ".join(chunks)
 
         result.promos = self._extract_promos(chunks, full_text)
@@ -198,11 +144,8 @@ class GenericHtmlExtractor(BaseExtractor):
         products = []
         new_products = []
         # 1. Try JSON-LD (Schema.org)
-        for script in self.soup.find_all("script", type="application/ld+json"):
+        for data in self.document.json_ld:
             try:
-                import json
-                data = json.loads(script.string or "")
-                
                 # Handle both object and list of objects
                 if isinstance(data, list):
                     items = data
@@ -249,44 +192,31 @@ class GenericHtmlExtractor(BaseExtractor):
         seen: set[str] = set()
 
         for chunk in chunks:
-            # Percentage discount
-            for match in _PROMO_PERCENTAGE.finditer(chunk):
-                raw = chunk[:200]
-                if raw in seen:
-                    continue
-                seen.add(raw)
-                promos.append(PromoSignal(
-                    raw_text=raw,
-                    discount_type="PERCENTAGE",
-                    discount_value=float(match.group(1)),
-                    confidence=0.90,
-                ))
-
-            # Fixed amount discount
-            for match in _PROMO_FIXED_AR.finditer(chunk):
-                raw = chunk[:200]
-                if raw in seen:
-                    continue
-                seen.add(raw)
-                promos.append(PromoSignal(
-                    raw_text=raw,
-                    discount_type="FIXED",
-                    discount_value=float(match.group(1).replace(".", "").replace(",", ".")),
-                    confidence=0.85,
-                ))
-
-            # 2x1 / combo
-            if _PROMO_2X1.search(chunk):
-                raw = chunk[:200]
-                if raw not in seen:
-                    seen.add(raw)
-                    promos.append(PromoSignal(raw_text=raw, discount_type="2X1", confidence=0.88))
-
-            if _PROMO_COMBO.search(chunk) and not _PROMO_PERCENTAGE.search(chunk):
-                raw = chunk[:200]
-                if raw not in seen:
-                    seen.add(raw)
-                    promos.append(PromoSignal(raw_text=raw, discount_type="COMBO", confidence=0.70))
+            raw = chunk[:200]
+            if raw in seen:
+                continue
+
+            # One signal per chunk, strongest rule first: % > $ > 2x1 > combo
+            hits = {}
+            for hit in signal_engine.scan(chunk, SignalType.PROMO):
+                hits.setdefault(hit.rule.name, hit)
+
+            if hit := hits.get("percentage_off"):
+                value = float(hit.groups[0])
+            elif hit := hits.get("fixed_amount_off"):
+                value = float(hit.groups[0].replace(".", "").replace(",", "."))
+            elif hit := hits.get("multi_buy") or hits.get("bundle"):
+                value = None
+            else:
+                continue
+
+            seen.add(raw)
+            promos.append(PromoSignal(
+                raw_text=raw,
+                discount_type=hit.rule.discount_type,
+                discount_value=value,
+                confidence=hit.rule.confidence,
+            ))
 
         return promos[:20]  # Cap
 
@@ -295,27 +225,30 @@ class GenericHtmlExtractor(BaseExtractor):
         seen: set[str] = set()
 
         for chunk in chunks:
-            for match in _FIN_INSTALLMENTS.finditer(chunk):
-                raw = chunk[:200]
-                if raw in seen:
-                    continue
-                seen.add(raw)
-
-                installments_str = match.group(1)
-                interest_str = match.group(2)  # 'sin' or 'con'
-                bank_str = match.group(3)
-
-                # Check for bank mentions in the same chunk
-                bank_match = _BANKS.search(chunk)
-                bank_name = bank_match.group(0) if bank_match else bank_str
-
-                financing.append(FinancingSignal(
-                    raw_text=raw,
-                    installments=int(installments_str) if installments_str else None,
-                    bank=bank_name,
-                    interest_free=(interest_str or "").lower() == "sin",
-                    confidence=0.85,
-                ))
+            raw = chunk[:200]
+            if raw in seen:
+                continue
+
+            hits = {}
+            for hit in signal_engine.scan(chunk, SignalType.FINANCING):
+                hits.setdefault(hit.rule.name, hit)
+            installments = hits.get("installments")
+            if installments is None:
+                continue
+            seen.add(raw)
+
+            installments_str, interest_str, bank_str = installments.groups  # 'sin' or 'con'
+            # Check for bank mentions in the same chunk
+            bank = hits.get("bank")
+            bank_name = bank.text if bank else bank_str
+
+            financing.append(FinancingSignal(
+                raw_text=raw,
+                installments=int(installments_str) if installments_str else None,
+                bank=bank_name,
+                interest_free=(interest_str or "").lower() == "sin",
+                confidence=installments.rule.confidence,
+            ))
 
         return financing[:10]
 
@@ -323,20 +256,20 @@ class GenericHtmlExtractor(BaseExtractor):
         ctas: list[CallToAction] = []
         seen_texts: set[str] = set()
 
-        for element in self.soup.find_all(["a", "button"], limit=100):
-            text = element.get_text(separator=" ", strip=True)
-            if not text or len(text) > 100:
+        for element in islice(self.tree.iter("a", "button"), 100):
+            label = text(element, " ")
+            if not label or len(label) > 100:
                 continue
-            if not _CTA_PATTERNS.search(text):
+            if not signal_engine.first(label, SignalType.CTA):
                 continue
 
-            normalized = text.lower().strip()
+            normalized = label.lower().strip()
             if normalized in seen_texts:
                 continue
             seen_texts.add(normalized)
 
-            url = element.get("href") if element.name == "a" else None
-            ctas.append(CallToAction(text=text, url=url))
+            url = element.get("href") if element.tag == "a" else None
+            ctas.append(CallToAction(text=label, url=url))
 
         return ctas[:10]
 
@@ -349,28 +282,28 @@ class GenericHtmlExtractor(BaseExtractor):
         ]
         hero_zone = None
         for sel in hero_selectors:
-            hero_zone = self.soup.select_one(sel)
-            if hero_zone:
+            hero_zone = self.document.css_first(sel)
+            if hero_zone is not None:
                 break
 
-        if not hero_zone:
+        if hero_zone is None:
             return None
 
         # Find first image
-        img = hero_zone.find("img")
+        img = hero_zone.find(".//img")
         image_url = None
         alt_text = None
-        if img:
+        if img is not None:
             image_url = img.get("src") or img.get("data-src") or img.get("data-lazy-src")
             alt_text = img.get("alt", "")
 
         # Find first heading as headline
-        headline_tag = hero_zone.find(["h1", "h2", "h3"])
-        headline = headline_tag.get_text(strip=True) if headline_tag else None
+        headline_tag = self.document.css_first("h1, h2, h3", hero_zone)
+        headline = text(headline_tag) if headline_tag is not None else None
 
         # Find first link
-        link_tag = hero_zone.find("a", href=True)
-        link_url = link_tag.get("href") if link_tag else None
+        link_tag = hero_zone.find(".//a[@href]")
+        link_url = link_tag.get("href") if link_tag is not None else None
 
         if not any([image_url, headline]):
             return None
@@ -417,11 +350,9 @@ class GenericHtmlExtractor(BaseExtractor):
         )
 
     def _extract_og_product(self) -> ProductData | None:
-        def get_meta(prop):
-            tag = self.soup.find("meta", property=prop) or self.soup.find("meta", attrs={"name": prop})
-            return tag.get("content") if tag else None
+        get_meta = self.document.meta.get
 
-        title = get_meta("og:title") or self.soup.title.string if self.soup.title else None
+        title = get_meta("og:title") or self.document.title
         if not title:
             return None
 
@@ -458,10 +389,10 @@ class GenericHtmlExtractor(BaseExtractor):
         ]
         
         for sel in price_selectors:
-            elements = self.selector.css(sel)
+            elements = self.document.css(sel)
             for el in elements:
                 # Get the innermost text
-                txt = el.text
+                txt = own_text(el)
                 if not txt: continue
                 # Validate it looks like a price ($12.000, 12000, etc)
                 if '$' in txt or any(c.isdigit() for c in txt):
@@ -475,13 +406,13 @@ class GenericHtmlExtractor(BaseExtractor):
         # Common breadcrumb selectors
         bc_selectors = [".breadcrumb", ".breadcrumbs", "[class*='breadcrumb']", "nav[aria-label='Breadcrumb']"]
         for sel in bc_selectors:
-            bc_container = self.soup.select_one(sel)
-            if bc_container:
+            bc_container = self.document.css_first(sel)
+            if bc_container is not None:
                 # Find all links or spans in order
-                items = bc_container.select("a, span, li")
+                items = self.document.css("a, span, li", bc_container)
                 tree = []
                 for item in items:
-                    txt = item.get_text(strip=True)
+                    txt = text(item)
                     # Filter out noise like "Home", "Inicio", "Resultados"
                     if txt and len(txt) > 2 and txt.lower() not in ["home", "inicio", "inicio /"]:
                         if txt not in tree:
@@ -490,16 +421,20 @@ class GenericHtmlExtractor(BaseExtractor):
         return []
 
     def _extract_generic_badges(self) -> list[str]:
-        """Look for common e-commerce labels/badges in HTML."""
+        """Look for common e-commerce labels/badges in HTML (page-level, scanned once)."""
+        return list(self._generic_badges)
+
+    @cached_property
+    def _generic_badges(self) -> list[str]:
         badges = []
         badge_selectors = [
             ".badge", ".tag", ".label-product", ".product-label",
             "[class*='badge']", "[class*='label']"
         ]
         for sel in badge_selectors:
-            els = self.soup.select(sel)
+            els = self.document.css(sel)
             for el in els:
-                txt = el.get_text(strip=True)
+                txt = text(el)
                 if txt and 2 < len(txt) < 20:
                     if txt not in badges:
                         badges.append(txt)
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import logging
 
+from workers.web_monitor.document import ParsedDocument
 from workers.web_monitor.extractors.generic_html import GenericHtmlExtractor
 from workers.web_monitor.models import ExtractionResult, EcommercePlatform
 
@@ -13,8 +14,15 @@ logger = logging.getLogger(__name__)
 class PrestashopExtractor(GenericHtmlExtractor):
     """PrestaShop extractor. Uses .product-prices and js-product-miniature."""
 
-    def __init__(self, html: str, headers: dict[str, str], url: str | None = None) -> None:
-        super().__init__(html, headers, url)
+    def __init__(
+        self,
+        html: str,
+        headers: dict[str, str],
+        url: str | None = None,
+        *,
+        document: ParsedDocument | None = None,
+    ) -> None:
+        super().__init__(html, headers, url, document=document)
         self._platform = EcommercePlatform.PRESTASHOP
 
     async def extract_all(self) -> ExtractionResult:
@@ -22,12 +30,12 @@ class PrestashopExtractor(GenericHtmlExtractor):
         result.platform_detected = EcommercePlatform.PRESTASHOP
         
         # PrestaShop selectors
-        current_price = self.selector.css(".current-price, .product-price")
-        regular_price = self.selector.css(".regular-price")
+        current_price = self.document.first_text(".current-price, .product-price")
+        regular_price = self.document.first_text(".regular-price")
         
-        if current_price:
-            result.raw_metadata["price_current"] = current_price[0].text
-        if regular_price:
-            result.raw_metadata["price_regular"] = regular_price[0].text
+        if current_price is not None:
+            result.raw_metadata["price_current"] = current_price
+        if regular_price is not None:
+            result.raw_metadata["price_regular"] = regular_price
 
         return result
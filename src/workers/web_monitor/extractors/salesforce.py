@@ -10,6 +10,7 @@ import logging
 import re
 from typing import Any
 
+from workers.web_monitor.document import ParsedDocument, text
 from workers.web_monitor.extractors.generic_html import GenericHtmlExtractor
 from workers.web_monitor.models import ExtractionResult, EcommercePlatform, ProductData, VariantData
 
@@ -20,8 +21,15 @@ class SalesforceExtractor(GenericHtmlExtractor):
     Salesforce Commerce Cloud (Demandware) specific extractor.
     """
 
-    def __init__(self, html: str, headers: dict[str, str], url: str | None = None) -> None:
-        super().__init__(html, headers, url)
+    def __init__(
+        self,
+        html: str,
+        headers: dict[str, str],
+        url: str | None = None,
+        *,
+        document: ParsedDocument | None = None,
+    ) -> None:
+        super().__init__(html, headers, url, document=document)
         self._platform = EcommercePlatform.SALESFORCE
 
     async def extract_all(self) -> ExtractionResult:
@@ -41,44 +49,44 @@ class SalesforceExtractor(GenericHtmlExtractor):
         products = []
         
         # 1. Look for Grid / List items
-        tiles = self.soup.select(".product-tile, .product-grid-item, .card-product")
+        tiles = self.document.css(".product-tile, .product-grid-item, .card-product")
         if tiles:
             for tile in tiles:
                 sku = tile.get("data-itemid") or tile.get("data-pid")
-                title = tile.select_one(".product-name-link, .link-tile")
-                price = tile.select_one(".price .value, .sales .value")
+                title = self.document.css_first(".product-name-link, .link-tile", tile)
+                price = self.document.css_first(".price .value, .sales .value", tile)
                 
                 if sku:
                     products.append(ProductData(
                         sku=str(sku),
-                        title=title.get_text(strip=True) if title else None,
-                        list_price=self._clean_price(price.get_text(strip=True)) if price else None,
+                        title=text(title) if title is not None else None,
+                        list_price=self._clean_price(text(price)) if price is not None else None,
                         is_in_stock=True
                     ))
             if products:
                 return products
 
         # 2. Look for single PDP
-        main_prod_container = self.soup.select_one(".product-detail, .product-wrapper, [data-pid]")
-        if main_prod_container:
+        main_prod_container = self.document.css_first(".product-detail, .product-wrapper, [data-pid]")
+        if main_prod_container is not None:
             sku = main_prod_container.get("data-pid")
-            title = self.soup.select_one(".product-name, .pdp-title, .product-detail .name")
-            price = self.soup.select_one(".product-detail .price .value, .sales .value, .product-detail .price .sales, meta[property='product:price:amount']")
+            title = self.document.css_first(".product-name, .pdp-title, .product-detail .name")
+            price = self.document.css_first(".product-detail .price .value, .sales .value, .product-detail .price .sales, meta[property='product:price:amount']")
             
             p_val = None
-            if price:
-                if price.name == "meta":
+            if price is not None:
+                if price.tag == "meta":
                     p_val = self._clean_price(price.get("content", ""))
                 else:
-                    p_val = self._clean_price(price.get_text(strip=True))
+                    p_val = self._clean_price(text(price))
 
-            brand_tag = self.soup.select_one("meta[property='product:brand'], meta[name='brand']")
+            brand_tag = self.document.css_first("meta[property='product:brand'], meta[name='brand']")
             
             # Premium Data Extraction
-            description_tag = self.soup.select_one("#collapsible-description-1, .product-detail .description, .product-detail .details")
+            description_tag = self.document.css_first("#collapsible-description-1, .product-detail .description, .product-detail .details")
             all_images = []
             from urllib.parse import urljoin
-            img_els = self.soup.select(".image-grid-container img, .product-image-container-grid img, .product-carousel img, .primary-image img")
+            img_els = self.document.css(".image-grid-container img, .product-image-container-grid img, .product-carousel img, .primary-image img")
             for img in img_els:
                 src = img.get("src") or img.get("data-src") or img.get("srcset")
                 if src:
@@ -90,35 +98,34 @@ class SalesforceExtractor(GenericHtmlExtractor):
 
             # Social Proof & Badges (CRO)
             badges = []
-            badge_els = self.soup.select(".product-badge, .badge-label, .promo-tag, .label-new")
+            badge_els = self.document.css(".product-badge, .badge-label, .promo-tag, .label-new")
             for b in badge_els:
-                bt = b.get_text(strip=True)
+                bt = text(b)
                 if bt and bt not in badges: badges.append(bt)
             
-            rating_tag = self.soup.select_one(".rating-stars, .pdp-rating, [class*='rating']")
+            rating_tag = self.document.css_first(".rating-stars, .pdp-rating, [class*='rating']")
             rating_val = None
-            if rating_tag:
-                # Handle class as list or string
-                cls_str = " ".join(rating_tag.get("class", [])) if isinstance(rating_tag.get("class"), list) else rating_tag.get("class", "")
+            if rating_tag is not None:
+                cls_str = rating_tag.get("class", "")
                 match = re.search(r"(\d(?:[\.,]\d)?)", rating_tag.get("aria-label", "") or cls_str)
                 if match: rating_val = float(match.group(1).replace(",", "."))
 
             # Variants extraction
             variants = []
-            size_list = self.soup.select(".size-attribute .select-size, .attribute-values .swatch-anchor, .size-swatches .swatch-anchor")
+            size_list = self.document.css(".size-attribute .select-size, .attribute-values .swatch-anchor, .size-swatches .swatch-anchor")
             for size in size_list:
                 variants.append(VariantData(
-                    sku=f"{sku}-{size.get('data-attr-value') or size.get_text(strip=True)}",
-                    title=size.get_text(strip=True),
-                    is_in_stock=not "disabled" in (size.get("class") or [])
+                    sku=f"{sku}-{size.get('data-attr-value') or text(size)}",
+                    title=text(size),
+                    is_in_stock=not "disabled" in (size.get("class") or "").split()
                 ))
 
             if sku:
                 products.append(ProductData(
                     sku=str(sku),
-                    title=title.get_text(strip=True) if title else None,
-                    brand=brand_tag.get("content") if brand_tag else None,
-                    description=description_tag.get_text(strip=True) if description_tag else None,
+                    title=text(title) if title is not None else None,
+                    brand=brand_tag.get("content") if brand_tag is not None else None,
+                    description=text(description_tag) if description_tag is not None else None,
                     image_url=all_images[0] if all_images else None,
                     images=all_images,
                     category_tree=self._extract_breadcrumb_categories(),
@@ -6,6 +6,7 @@ import json
 import logging
 import re
 
+from workers.web_monitor.document import ParsedDocument
 from workers.web_monitor.extractors.generic_html import GenericHtmlExtractor
 from workers.web_monitor.models import ExtractionResult, EcommercePlatform, ProductData
 
@@ -17,8 +18,15 @@ _PRODUCT_JSON = re.compile(r"(?:var|window)\.meta\s*=\s*(\{.*?\})\s*(?:;|</scrip
 class ShopifyExtractor(GenericHtmlExtractor):
     """Shopify-specific extractor with JSON-LD and meta product data."""
 
-    def __init__(self, html: str, headers: dict[str, str], url: str | None = None) -> None:
-        super().__init__(html, headers, url)
+    def __init__(
+        self,
+        html: str,
+        headers: dict[str, str],
+        url: str | None = None,
+        *,
+        document: ParsedDocument | None = None,
+    ) -> None:
+        super().__init__(html, headers, url, document=document)
         self._platform = EcommercePlatform.SHOPIFY
 
     async def extract_all(self) -> ExtractionResult:
@@ -30,14 +38,10 @@ class ShopifyExtractor(GenericHtmlExtractor):
         if meta:
             logger.debug("Shopify meta found")
 
-        # Use scrapling for structured data extraction
-        for script in self.selector.css("script[type='application/ld+json']"):
-            try:
-                data = script.json
-                if isinstance(data, dict) and data.get("@type") == "Product":
-                    logger.debug("Shopify Product JSON-LD found")
-            except Exception:
-                pass
+        # Structured data (JSON-LD parsed once by the shared document)
+        for data in self.document.json_ld:
+            if isinstance(data, dict) and data.get("@type") == "Product":
+                logger.debug("Shopify Product JSON-LD found")
 
         return result
 
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import logging
 
+from workers.web_monitor.document import ParsedDocument
 from workers.web_monitor.extractors.generic_html import GenericHtmlExtractor
 from workers.web_monitor.models import ExtractionResult, EcommercePlatform
 
@@ -13,8 +14,15 @@ logger = logging.getLogger(__name__)
 class TiendanubeExtractor(GenericHtmlExtractor):
     """TiendaNube / Nuvemshop extractor. Reads window.LS boot object."""
 
-    def __init__(self, html: str, headers: dict[str, str], url: str | None = None) -> None:
-        super().__init__(html, headers, url)
+    def __init__(
+        self,
+        html: str,
+        headers: dict[str, str],
+        url: str | None = None,
+        *,
+        document: ParsedDocument | None = None,
+    ) -> None:
+        super().__init__(html, headers, url, document=document)
         self._platform = EcommercePlatform.TIENDANUBE
 
     async def extract_all(self) -> ExtractionResult:
@@ -22,12 +30,12 @@ class TiendanubeExtractor(GenericHtmlExtractor):
         result.platform_detected = EcommercePlatform.TIENDANUBE
         
         # Tiendanube / Nuvemshop specific
-        prices = self.selector.css(".js-price-display, #price_display")
-        if prices:
-            result.raw_metadata["price_ui"] = prices[0].text
+        price_ui = self.document.first_text(".js-price-display, #price_display")
+        if price_ui is not None:
+            result.raw_metadata["price_ui"] = price_ui
             
-        installments = self.selector.css(".js-installments-credit-card, .js-max-installments-container")
-        if installments:
-             result.raw_metadata["installments_ui"] = installments[0].text
+        installments_ui = self.document.first_text(".js-installments-credit-card, .js-max-installments-container")
+        if installments_ui is not None:
+            result.raw_metadata["installments_ui"] = installments_ui
 
         return result
@@ -6,37 +6,138 @@ Fallback: Generic HTML regex extraction (inherited from GenericHtmlExtractor).
 
 from __future__ import annotations
 
-import json
 import logging
 import re
+from functools import cached_property
 
+import orjson
+
+from workers.web_monitor.document import ParsedDocument
 from workers.web_monitor.extractors.generic_html import GenericHtmlExtractor
 from workers.web_monitor.models import ExtractionResult, EcommercePlatform, PromoSignal, ProductData, VariantData
 
-from scrapling import Selector
-
 logger = logging.getLogger(__name__)
 
-# VTEX stores page state in a window.__STATE__ JSON object
-_STATE_PATTERN = re.compile(r"window\.__STATE__\s*=\s*(\{.*?\})\s*(?:;|</script>)", re.DOTALL)
-_DATA_PATTERN = re.compile(r"vtex-data\s*=\s*(\{.*?\})\s*(?:;|</script>)", re.DOTALL)
+# VTEX stores page state in a window.__STATE__ JSON object (or a vtex-data one)
+_STATE_MARKERS = ("__STATE__", "vtex-data")
+# Max chars between a marker and the opening brace ('" ><script>' in VTEX IO)
+_MAX_MARKER_GAP = 64
+_EMPTY_OFFER = {"sale_price": None, "list_price": None, "available": False}
+
+
+class VtexStateIndex:
+    """
+    Apollo-normalized VTEX state, indexed for O(1) lookups.
+
+    The state maps keys ("Product:sp-123", "$Product:sp-123.items.0.sellers.0")
+    to objects; references are ``{"id": key, "type": "id", ...}`` pointers.
+    The index groups objects by ``__typename``, maps SKU item ids to their
+    state keys, and memoizes the resolved offer of each SKU.
+    """
+
+    def __init__(self, state: dict) -> None:
+        self.state = state
+        self._by_type: dict[str, dict[str, dict]] = {}
+        self._sku_keys: dict[str, str] = {}
+        self._sku_offers: dict[int, dict] = {}
+
+        for key, val in state.items():
+            if not isinstance(val, dict):
+                continue
+            tname = val.get("__typename")
+            if tname:
+                self._by_type.setdefault(tname, {})[key] = val
+                if tname == "SKU":
+                    item_id = val.get("itemId") or val.get("id")
+                    if item_id is not None:
+                        self._sku_keys.setdefault(str(item_id), key)
+
+    def of_type(self, typename: str) -> dict[str, dict]:
+        return self._by_type.get(typename, {})
+
+    def sku_key(self, item_id: str | None) -> str | None:
+        return self._sku_keys.get(str(item_id)) if item_id is not None else None
+
+    def resolve(self, ref: str | dict | None) -> dict:
+        """Link Apollo pointers safely."""
+        if not ref: return {}
+        p_id = ref.get("id") if isinstance(ref, dict) else ref
+        if p_id: return self.state.get(p_id, ref if isinstance(ref, dict) else {})
+        return ref if isinstance(ref, dict) else {}
+
+    def _offers(self, sku_obj: dict):
+        # SKUs usually have sellers, and each seller has a commertialOffer
+        for s_ref in sku_obj.get("sellers", []):
+            offer_obj = self.resolve(self.resolve(s_ref).get("commertialOffer"))
+            # Use typename for safety or just check keys
+            if offer_obj.get("__typename") == "CommertialOffer" or "Price" in offer_obj:
+                yield offer_obj
+
+    def sku_offer(self, sku_obj: dict) -> dict:
+        """First seller offer with a price (memoized per SKU object)."""
+        cached = self._sku_offers.get(id(sku_obj))
+        if cached is not None:
+            return cached
+
+        best_offer = _EMPTY_OFFER
+        for offer_obj in self._offers(sku_obj):
+            best_offer = {
+                "sale_price": offer_obj.get("Price") or offer_obj.get("price") or offer_obj.get("spotPrice"),
+                "list_price": offer_obj.get("ListPrice") or offer_obj.get("listPrice"),
+                "available": (offer_obj.get("AvailableQuantity") or 0) > 0,
+            }
+            if best_offer["sale_price"]:
+                break
+        self._sku_offers[id(sku_obj)] = best_offer
+        return best_offer
+
+    def sku_installments(self, sku_obj: dict) -> str | None:
+        """Longest installment plan offered by the SKU's sellers ("12 cuotas de $999")."""
+        best_inst = None
+        for offer_obj in self._offers(sku_obj):
+            for plan in (self.resolve(ref) for ref in offer_obj.get("Installments") or []):
+                count = plan.get("NumberOfInstallments") or 0
+                if count and (best_inst is None or count > best_inst["NumberOfInstallments"]):
+                    best_inst = plan
+        if best_inst is None:
+            return None
+        return f"{best_inst['NumberOfInstallments']} cuotas de ${best_inst.get('Value')}"
+
+
+def variants_price_range(variants: list[VariantData]) -> dict | None:
+    """Product prices from its SKUs: lowest sale price, highest list price (None if unpriced)."""
+    valid_sales = [v.sale_price for v in variants if v.sale_price is not None]
+    valid_lists = [v.list_price for v in variants if v.list_price is not None]
+    if not valid_sales:
+        return None
+    return {
+        "sale_price": min(valid_sales),
+        "list_price": max(valid_lists) if valid_lists else min(valid_sales)
+    }
 
 
 class VtexExtractor(GenericHtmlExtractor):
     """VTEX-specific extractor. Reads window.__STATE__ for pre-rendered data."""
 
-    def __init__(self, html: str, headers: dict[str, str], url: str | None = None) -> None:
-        super().__init__(html, headers, url)
+    def __init__(
+        self,
+        html: str,
+        headers: dict[str, str],
+        url: str | None = None,
+        *,
+        document: ParsedDocument | None = None,
+    ) -> None:
+        super().__init__(html, headers, url, document=document)
         self._platform = EcommercePlatform.VTEX
 
     async def extract_all(self) -> ExtractionResult:
         result = await super().extract_all()
         result.platform_detected = EcommercePlatform.VTEX
 
-        # Try to enhance with __STATE__ data
-        state = self._parse_state()
-        if state:
-            logger.debug("VTEX __STATE__ found (%d keys)", len(state))
+        # Try to enhance with __STATE__ data (already indexed by extract_products)
+        index = self._state_index
+        if index:
+            logger.debug("VTEX __STATE__ found (%d keys)", len(index.state))
             # Enhance signals if needed...
         else:
             logger.debug("VTEX __STATE__ not found, using generic extraction only")
@@ -55,54 +156,16 @@ class VtexExtractor(GenericHtmlExtractor):
         Extract ALL products and their variants from VTEX STATE using a relational map.
         This follows the Apollo/GQL normalized state structure.
         """
-        state = self._parse_state()
-        if not state:
+        index = self._state_index
+        if index is None:
             return await self._extract_products_internal()
 
-        # 1. Build a local relational map
-        objects_by_type = {} # typename -> {id -> data}
-        for key, val in state.items():
-            if not isinstance(val, dict): continue
-            tname = val.get("__typename")
-            if tname:
-                if tname not in objects_by_type: objects_by_type[tname] = {}
-                objects_by_type[tname][key] = val
-
-        # 2. Extract Offers (Pricing)
-        offers = {} # key -> price_info
-        for key, val in objects_by_type.get("CommertialOffer", {}).items():
-            offers[key] = {
-                "sale_price": val.get("Price") or val.get("price") or val.get("spotPrice"),
-                "list_price": val.get("ListPrice") or val.get("listPrice"),
-                "available": val.get("AvailableQuantity", 0) > 0
-            }
-
-        # 3. Extract SKUs (Variants)
-        skus = {} # key -> VariantData
-        for key, val in objects_by_type.get("SKU", {}).items():
-            sku_id = val.get("itemId") or val.get("id")
-            
-            # Follow pointers to find associated offer
-            best_offer = {"sale_price": None, "list_price": None, "available": False}
-            
-            # SKUs usually have sellers, and each seller has a commertialOffer
-            sellers = val.get("sellers", [])
-            for s_ref in sellers:
-                seller_obj = self._resolve_vtex_pointer(s_ref, state)
-                offer_ref = seller_obj.get("commertialOffer")
-                if offer_ref:
-                    offer_obj = self._resolve_vtex_pointer(offer_ref, state)
-                    # Use typename for safety or just check keys
-                    if offer_obj.get("__typename") == "CommertialOffer" or "Price" in offer_obj:
-                         best_offer = {
-                            "sale_price": offer_obj.get("Price") or offer_obj.get("price") or offer_obj.get("spotPrice"),
-                            "list_price": offer_obj.get("ListPrice") or offer_obj.get("listPrice"),
-                            "available": offer_obj.get("AvailableQuantity", 0) > 0
-                         }
-                         if best_offer["sale_price"]: break
-
+        # 1. SKUs (Variants), priced through their sellers' commertialOffer
+        skus = {}  # state key -> VariantData
+        for key, val in index.of_type("SKU").items():
+            best_offer = index.sku_offer(val)
             skus[key] = VariantData(
-                sku=sku_id,
+                sku=val.get("itemId") or val.get("id"),
                 title=val.get("name") or val.get("nameComplete"),
                 is_in_stock=best_offer["available"],
                 list_price=best_offer["list_price"],
@@ -110,9 +173,9 @@ class VtexExtractor(GenericHtmlExtractor):
                 raw_metadata={"vtex_key": key}
             )
 
-        # 4. Extract Products
+        # 2. Products
         extracted_products = []
-        for key, val in objects_by_type.get("Product", {}).items():
+        for key, val in index.of_type("Product").items():
             prod_id = val.get("productId")
             product_variants = []
             
@@ -123,26 +186,25 @@ class VtexExtractor(GenericHtmlExtractor):
             # Follow item pointers
             items = val.get("items", [])
             for item_ref in items:
-                item_obj = self._resolve_vtex_pointer(item_ref, state)
+                item_obj = index.resolve(item_ref)
                 i_key = item_ref.get("id") if isinstance(item_ref, dict) else item_ref
                 
                 # Extract images from item/SKU
                 sku_images = item_obj.get("images", [])
                 for img_ref in sku_images:
-                    img_obj = self._resolve_vtex_pointer(img_ref, state)
+                    img_obj = index.resolve(img_ref)
                     img_url = img_obj.get("imageUrl")
                     if img_url and img_url not in all_images:
                         all_images.append(img_url)
 
-                if i_key in skus:
-                    product_variants.append(skus[i_key])
-                else:
-                    item_id_in_map = item_obj.get("id") or item_obj.get("itemId")
-                    if item_id_in_map in skus:
-                        product_variants.append(skus[item_id_in_map])
+                variant = skus.get(i_key)
+                if variant is None:
+                    variant = skus.get(index.sku_key(item_obj.get("itemId") or item_obj.get("id")))
+                if variant is not None:
+                    product_variants.append(variant)
 
             # Building ProductData with resolved priceRange
-            price_info = self._get_vtex_price_range(val, product_variants, state)
+            price_info = self._get_vtex_price_range(val, product_variants, index)
             
             # Extract category path and tree safely
             cats = val.get("categories")
@@ -154,31 +216,15 @@ class VtexExtractor(GenericHtmlExtractor):
             elif isinstance(cats, dict):
                 cat_path = cats.get("0") or cats.get("id")
 
-            # Extract installments (cuotas) from state if available
-            installments = None
-            if items:
-                # Try to find financing info in the first SKU's teasers or sellers
-                item_obj = self._resolve_vtex_pointer(items[0], state)
-                sellers = item_obj.get("sellers", [])
-                for seller_ref in sellers:
-                    seller_obj = self._resolve_vtex_pointer(seller_ref, state)
-                    comm_offers = seller_obj.get("commertialOffer", {})
-                    # CommertialOffer can have Installments list
-                    inst_refs = comm_offers.get("Installments", [])
-                    if inst_refs:
-                        # Find the one with highest count or 'sin interés'
-                        best_inst = sorted(inst_refs, key=lambda x: x.get("NumberOfInstallments", 0), reverse=True)[0]
-                        count = best_inst.get("NumberOfInstallments")
-                        value = best_inst.get("Value")
-                        if count:
-                            installments = f"{count} cuotas de ${value}"
+            # Extract installments (cuotas) from the first SKU's sellers
+            installments = index.sku_installments(index.resolve(items[0])) if items else None
 
             # Social Proof & Badges (CRO)
             badges = []
             # VTEX clusters often contain marketing labels
             clusters = val.get("clusterHighlights", [])
             for c_ref in clusters:
-                c_obj = self._resolve_vtex_pointer(c_ref, state)
+                c_obj = index.resolve(c_ref)
                 if c_obj and c_obj.get("name"):
                     badges.append(c_obj["name"])
             
@@ -191,7 +237,7 @@ class VtexExtractor(GenericHtmlExtractor):
             rating_val = None
             review_count = 0
             if rating_refs:
-                r_obj = self._resolve_vtex_pointer(rating_refs, state) if isinstance(rating_refs, (dict, str)) else None
+                r_obj = index.resolve(rating_refs) if isinstance(rating_refs, (dict, str)) else None
                 if r_obj:
                     rating_val = r_obj.get("ratingValue")
                     review_count = r_obj.get("reviewCount") or 0
@@ -218,68 +264,40 @@ class VtexExtractor(GenericHtmlExtractor):
             )
             extracted_products.append(pdata)
 
-        # 5. Final fallback for PDP if no products extracted via typename
+        # 3. Final fallback for PDP if no products extracted via typename
         if not extracted_products:
             extracted_products = await self._extract_products_internal()
 
         return extracted_products
 
-    def _resolve_vtex_pointer(self, ref: str | dict, state: dict) -> dict:
-        """Link Apollo pointers safely."""
-        if not ref: return {}
-        p_id = ref.get("id") if isinstance(ref, dict) else ref
-        if p_id: return state.get(p_id, ref if isinstance(ref, dict) else {})
-        return ref if isinstance(ref, dict) else {}
-
-    def _get_vtex_price_range(self, product_val: dict, variants: list[VariantData], state: dict) -> dict:
+    def _get_vtex_price_range(self, product_val: dict, variants: list[VariantData], index: VtexStateIndex) -> dict:
         """Calculate best prices for the product based on its variants or metadata."""
-        if variants:
-            valid_sales = [v.sale_price for v in variants if v.sale_price is not None]
-            valid_lists = [v.list_price for v in variants if v.list_price is not None]
-            if valid_sales:
-                return {
-                    "sale_price": min(valid_sales),
-                    "list_price": max(valid_lists) if valid_lists else min(valid_sales)
-                }
-        
+        price_range = variants_price_range(variants)
+        if price_range is not None:
+            return price_range
+
         # Fallback to priceRange (often a pointer in Listings)
-        pr_ref = product_val.get("priceRange")
-        pr = self._resolve_vtex_pointer(pr_ref, state) if pr_ref else {}
-        
-        selling = self._resolve_vtex_pointer(pr.get("sellingPrice"), state) if pr.get("sellingPrice") else {}
-        list_p = self._resolve_vtex_pointer(pr.get("listPrice"), state) if pr.get("listPrice") else {}
+        pr = index.resolve(product_val.get("priceRange"))
+        selling = index.resolve(pr.get("sellingPrice"))
+        list_p = index.resolve(pr.get("listPrice"))
         
         return {
             "sale_price": selling.get("lowPrice") or selling.get("Price"),
             "list_price": list_p.get("highPrice") or list_p.get("ListPrice")
         }
 
-    def _find_sku_pricing(self, sku_id: str, state: dict) -> dict:
-        """Deep dive into state to find the commertialOffer for a SKU."""
-        res = {"available": True, "list_price": None, "sale_price": None}
-        
-        # Search for any key that contains SKU:{id} and commertialOffer
-        # VTEX IO keys can be: SKU:123... or $Product:XYZ.items.0.sellers.0.commertialOffer
-        target_token = f"SKU:{sku_id}"
-        
-        for key, val in state.items():
-            # Match if it has SKU:ID or if it's a pointer to an offer related to this SKU
-            # We also look for specific fields in the value
-            if (target_token in key or sku_id in key) and "commertialOffer" in key:
-                res["list_price"] = val.get("ListPrice") or val.get("listPrice")
-                res["sale_price"] = val.get("Price") or val.get("price")
-                res["available"] = val.get("AvailableQuantity", 0) > 0
-                if res["sale_price"] is not None:
-                    return res
-        
-        return res
+    def _find_sku_pricing(self, sku_id: str) -> dict:
+        """Pricing of a SKU by its VTEX item id (indexed lookup, no state scan)."""
+        index = self._state_index
+        sku_obj = index.state.get(index.sku_key(sku_id)) if index else None
+        if sku_obj is None:
+            return {"available": True, "list_price": None, "sale_price": None}
+        return index.sku_offer(sku_obj)
 
     async def _extract_aggressive_prices(self) -> dict:
         """Fallback: Aggressively search HTML for anything that looks like price JSON."""
         # Find all script tags
-        for script in self.soup.find_all("script"):
-            content = script.string
-            if not content: continue
+        for content in self.document.scripts:
             if '"Price":' in content or '"Price":' in content:
                 # Try to extract the closest number
                 # This is a last resort to fulfill "TODO TODO"
@@ -292,41 +310,37 @@ class VtexExtractor(GenericHtmlExtractor):
                     }
         return {}
 
+    @cached_property
+    def _state_index(self) -> VtexStateIndex | None:
+        """The page's __STATE__, decoded and indexed once per document."""
+        state = self._parse_state()
+        return VtexStateIndex(state) if state else None
+
     def _parse_state(self) -> dict | None:
-        """Robustly extract VTEX state from HTML."""
-        # 1. Look for script tags containing __STATE__ or vtex-data
-        for script in self.soup.find_all("script"):
-            content = script.string
-            if not content: continue
-            
-            # Find the JSON start
-            start_index = -1
-            if "__STATE__ =" in content:
-                start_index = content.find("__STATE__ =") + 11
-            elif "vtex-data =" in content:
-                start_index = content.find("vtex-data =") + 11
-            
-            if start_index != -1:
-                # Find matching brace for valid JSON
-                # We search for the first '{' then match until the script ends or semicolon
-                json_start = content.find("{", start_index)
+        """
+        Locate the VTEX state by offset search on the raw HTML and decode it.
+
+        Handles ``window.__STATE__ = {...}``, ``vtex-data = {...}`` and the
+        VTEX IO ``<template data-varname="__STATE__"><script>{...}</script>``
+        form: the JSON starts at the first ``{`` right after the marker and
+        ends at the last ``}`` before the closing ``</script>``.
+        """
+        html = self.html
+        for marker in _STATE_MARKERS:
+            pos = html.find(marker)
+            while pos != -1:
+                after = pos + len(marker)
+                json_start = html.find("{", after, after + _MAX_MARKER_GAP)
                 if json_start != -1:
-                    # Often the JSON ends at the last '}' before the end of the script
-                    json_end = content.rfind("}")
-                    if json_end != -1 and json_end > json_start:
+                    script_end = html.find("</script>", json_start)
+                    json_end = html.rfind("}", json_start, script_end if script_end != -1 else len(html))
+                    if json_end != -1:
                         try:
-                            json_str = content[json_start:json_end+1]
-                            return json.loads(json_str)
-                        except json.JSONDecodeError:
-                            continue
-        
-        # 2. Try regex as fallback for inline or complex patterns
-        for pattern in [_STATE_PATTERN, _DATA_PATTERN]:
-            match = pattern.search(self.html)
-            if match:
-                try:
-                    return json.loads(match.group(1))
-                except json.JSONDecodeError:
-                    pass
+                            state = orjson.loads(html[json_start:json_end + 1])
+                        except orjson.JSONDecodeError:
+                            state = None
+                        if isinstance(state, dict):
+                            return state
+                pos = html.find(marker, after)
 
         return None
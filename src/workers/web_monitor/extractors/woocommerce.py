@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import logging
 
+from workers.web_monitor.document import ParsedDocument
 from workers.web_monitor.extractors.generic_html import GenericHtmlExtractor
 from workers.web_monitor.models import ExtractionResult, EcommercePlatform
 
@@ -13,8 +14,15 @@ logger = logging.getLogger(__name__)
 class WooCommerceExtractor(GenericHtmlExtractor):
     """WooCommerce extractor. Uses .woocommerce-Price-amount and REST API hints."""
 
-    def __init__(self, html: str, headers: dict[str, str], url: str | None = None) -> None:
-        super().__init__(html, headers, url)
+    def __init__(
+        self,
+        html: str,
+        headers: dict[str, str],
+        url: str | None = None,
+        *,
+        document: ParsedDocument | None = None,
+    ) -> None:
+        super().__init__(html, headers, url, document=document)
         self._platform = EcommercePlatform.WOOCOMMERCE
 
     async def extract_all(self) -> ExtractionResult:
@@ -22,12 +30,12 @@ class WooCommerceExtractor(GenericHtmlExtractor):
         result.platform_detected = EcommercePlatform.WOOCOMMERCE
         
         # WooCommerce specific selectors
-        prices = self.selector.css(".woocommerce-Price-amount, .price ins .amount")
-        if prices:
-            result.raw_metadata["price_ui"] = prices[0].text
+        price_ui = self.document.first_text(".woocommerce-Price-amount, .price ins .amount")
+        if price_ui is not None:
+            result.raw_metadata["price_ui"] = price_ui
             
-        promos = self.selector.css(".onsale, .woo-variation-price")
-        if promos:
-            result.raw_metadata["promo_ui"] = promos[0].text
+        promo_ui = self.document.first_text(".onsale, .woo-variation-price")
+        if promo_ui is not None:
+            result.raw_metadata["promo_ui"] = promo_ui
 
         return result
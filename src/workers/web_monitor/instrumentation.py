@@ -0,0 +1,223 @@
+"""
+Per-stage timing instrumentation for the crawl pipeline.
+
+Each page processed by ``process_monitored_page`` gets a ``PageTimer``
+that records how long every stage took (and how many bytes it moved).
+When the page is done the timer is folded into the run's
+``CrawlInstrumentation``, which keeps one ``StageHistogram`` per stage for
+three scopes: the whole run, each competitor and each platform. At the end
+of the run the histograms are persisted as ``CrawlRunStageStat`` rows, so
+regressions can be tracked over time from the API. When a run is crawled by
+several shard jobs, each shard merges its histograms into the rows already
+written by the others (``to_rows(run_id, existing)``).
+
+Stages:
+    throttle     wait for the host's rate limiter (adaptive per-host pacing)
+    fetch        HTTP GET (conditional)
+    reuse        copy the previous snapshot's signals (unchanged page)
+    store_raw    compress + write the raw HTML
+    screenshot   homepage screenshot + Directus upload
+    detection    platform detection (measured inside the extraction worker)
+    extraction   extractor.extract_all (idem)
+    extraction_wait  pool queueing + IPC around detection / extraction
+    signals      DetectedSignal rows
+    catalog      batched product upsert
+    fingerprint  tech fingerprinting (homepage)
+    diff         Diff Engine (per page, or once per run in run mode)
+
+Histograms use fixed latency buckets so they are cheap to update and can
+be merged across pages, competitors and runs.
+
+Usage:
+    instrumentation = CrawlInstrumentation()
+    timer = PageTimer()
+    with timer.stage("fetch"):
+        fetched = await fetch_page_conditional(page, client)
+    timer.add_bytes("fetch", fetched.body_bytes)
+    instrumentation.record_page(timer, competitor_id=page.competitor_id, platform=timer.platform)
+    session.add_all(instrumentation.to_rows(run_id, existing_rows))
+"""
+
+from __future__ import annotations
+
+import bisect
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from core.models import CrawlRunStageStat
+
+# Bucket upper bounds in seconds (last bucket: everything above 60s)
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+SCOPE_RUN = "run"
+SCOPE_COMPETITOR = "competitor"
+SCOPE_PLATFORM = "platform"
+
+
+@dataclass(slots=True)
+class StageHistogram:
+    """Latency histogram + totals of one stage."""
+
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    bytes_total: int = 0
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    @classmethod
+    def from_row(cls, row: CrawlRunStageStat) -> StageHistogram:
+        """Rebuild the histogram persisted in a stage stat row."""
+        counts = list((row.histogram or {}).get("counts") or [])
+        return cls(
+            count=row.count or 0,
+            total_seconds=float(row.total_seconds or 0),
+            max_seconds=float(row.max_seconds or 0),
+            bytes_total=row.bytes_total or 0,
+            buckets=counts if len(counts) == len(LATENCY_BUCKETS) + 1 else [0] * (len(LATENCY_BUCKETS) + 1),
+        )
+
+    def merge(self, other: StageHistogram) -> None:
+        self.count += other.count
+        self.total_seconds += other.total_seconds
+        self.max_seconds = max(self.max_seconds, other.max_seconds)
+        self.bytes_total += other.bytes_total
+        for i, n in enumerate(other.buckets):
+            self.buckets[i] += n
+
+    def quantile(self, q: float) -> float:
+        """Quantile ``q``, interpolated linearly inside its bucket (capped at the observed max)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            if n and seen + n >= rank:
+                lower = LATENCY_BUCKETS[i - 1] if i else 0.0
+                upper = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.max_seconds
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max_seconds)
+            seen += n
+        return self.max_seconds
+
+
+class PageTimer:
+    """Stage timings of one page (not shared between concurrent pages)."""
+
+    def __init__(self) -> None:
+        self.stages: dict[str, StageHistogram] = {}
+        self.platform: str | None = None  # set once the platform is detected
+
+    def _stage(self, name: str) -> StageHistogram:
+        hist = self.stages.get(name)
+        if hist is None:
+            hist = self.stages[name] = StageHistogram()
+        return hist
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as ``name`` (recorded even if it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._stage(name).observe(time.perf_counter() - started)
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record a duration measured elsewhere (e.g. inside the extraction worker)."""
+        self._stage(name).observe(seconds)
+
+    def add_bytes(self, name: str, nbytes: int) -> None:
+        self._stage(name).bytes_total += nbytes
+
+
+class CrawlInstrumentation:
+    """Per-run aggregation of page timers by run / competitor / platform."""
+
+    def __init__(self) -> None:
+        # (scope, scope_key, stage) → histogram
+        self._histograms: dict[tuple[str, str, str], StageHistogram] = {}
+
+    def _merge(self, scope: str, key: str, stage: str, hist: StageHistogram) -> None:
+        target = self._histograms.get((scope, key, stage))
+        if target is None:
+            target = self._histograms[(scope, key, stage)] = StageHistogram()
+        target.merge(hist)
+
+    def record_page(
+        self,
+        timer: PageTimer,
+        *,
+        competitor_id: int | None = None,
+        platform: str | None = None,
+    ) -> None:
+        """Fold a finished page in. ``platform`` is None when it was never detected (unchanged / failed page)."""
+        for stage, hist in timer.stages.items():
+            self._merge(SCOPE_RUN, "", stage, hist)
+            if competitor_id is not None:
+                self._merge(SCOPE_COMPETITOR, str(competitor_id), stage, hist)
+            if platform is not None:
+                self._merge(SCOPE_PLATFORM, str(platform), stage, hist)
+
+    def observe_run(self, stage: str, seconds: float) -> None:
+        """Run-level stage that is not tied to one page (e.g. run-mode diff)."""
+        hist = StageHistogram()
+        hist.observe(seconds)
+        self._merge(SCOPE_RUN, "", stage, hist)
+
+    def summary(self, scope: str = SCOPE_RUN) -> dict[str, dict]:
+        """Stage → {count, total, p50, p95, max, bytes} for one scope (all keys merged)."""
+        merged: dict[str, StageHistogram] = {}
+        for (hist_scope, _key, stage), hist in self._histograms.items():
+            if hist_scope == scope:
+                merged.setdefault(stage, StageHistogram()).merge(hist)
+        return {
+            stage: {
+                "count": hist.count,
+                "total_seconds": round(hist.total_seconds, 3),
+                "p50_seconds": round(hist.quantile(0.5), 3),
+                "p95_seconds": round(hist.quantile(0.95), 3),
+                "max_seconds": round(hist.max_seconds, 3),
+                "bytes_total": hist.bytes_total,
+            }
+            for stage, hist in sorted(merged.items(), key=lambda kv: -kv[1].total_seconds)
+        }
+
+    def to_rows(
+        self,
+        run_id: int,
+        existing: list[CrawlRunStageStat] = (),
+    ) -> list[CrawlRunStageStat]:
+        """
+        Stage stat rows of the run. ``existing`` rows (written by other shards
+        of the same run) are updated in place with the merged histograms; only
+        the rows that do not exist yet are returned, to be added to the session.
+        """
+        by_key = {(row.scope, row.scope_key, row.stage): row for row in existing}
+        new_rows = []
+        for (scope, key, stage), hist in self._histograms.items():
+            row = by_key.get((scope, key, stage))
+            if row is None:
+                row = CrawlRunStageStat(run_id=run_id, scope=scope, scope_key=key, stage=stage)
+                new_rows.append(row)
+            else:
+                merged = StageHistogram.from_row(row)
+                merged.merge(hist)
+                hist = merged
+            row.count = hist.count
+            row.total_seconds = round(hist.total_seconds, 3)
+            row.p50_seconds = round(hist.quantile(0.5), 3)
+            row.p95_seconds = round(hist.quantile(0.95), 3)
+            row.max_seconds = round(hist.max_seconds, 3)
+            row.bytes_total = hist.bytes_total
+            row.histogram = {"bounds": list(LATENCY_BUCKETS), "counts": list(hist.buckets)}
+        return new_rows
@@ -113,6 +113,16 @@ class ProductData:
     raw_metadata: dict[str, str] = field(default_factory=dict)
 
 
+@dataclass(frozen=True, slots=True)
+class PlatformDetection:
+    """Outcome of platform detection, with the evidence behind it."""
+
+    platform: EcommercePlatform
+    confidence: float = 0.0                                  # 0.0 – 1.0
+    scores: dict[EcommercePlatform, float] = field(default_factory=dict)
+    evidence: dict[EcommercePlatform, list[str]] = field(default_factory=dict)
+
+
 @dataclass(slots=True)
 class ExtractionResult:
     """Consolidated result from a single extraction run."""
@@ -2,148 +2,315 @@
 Web Monitor Orchestrator — ARQ Job
 ====================================
 Main ARQ job that:
-1. Reads active monitored_pages from DB
+1. Claims the monitored_pages that are due (tier-based due queue, see scheduler)
 2. Checks client's feature flags
-3. Downloads HTML (HTTPX, Playwright fallback)
-4. Routes to correct extractor via ExtractorFactory
+3. Downloads HTML (conditional GET; unchanged pages reuse the previous snapshot)
+4. Routes to correct extractor via ExtractorFactory (in the extraction process pool)
 5. Saves PageSnapshot + DetectedSignal to DB
 
+Pages are processed concurrently (global + per-domain limits), each one
+in its own DB session. Under ARQ the run is fanned out: the tick job
+(coordinator) creates the CrawlRun and enqueues one ``run_crawl_shard`` job
+per group of competitors, and the last shard enqueues ``finalize_crawl_run``
+(run-mode diff + run status), so throughput scales with worker processes.
+
 This is the heart of the daily monitoring cron.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
+import time
+from contextlib import AsyncExitStack, nullcontext
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from playwright.async_api import async_playwright
-import httpx
 
-from curl_cffi.requests import AsyncSession as CurlSession, RequestsError
-from sqlalchemy import select
+from curl_cffi.requests import RequestsError
+from sqlalchemy import desc, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.asset_uploader import asset_uploader
+from core.browser_pool import BrowserPool
 from core.config import settings
+from core.http_client import FetchClient
 from core.models import (
     CompetitorStatus,
     MonitoredPage,
     PageSnapshot,
     SnapshotStatus,
     CrawlRun,
+    CrawlRunStageStat,
     JobStatus,
     DetectedSignal,
     SignalSource,
     SignalType,
     PageType,
-    Product,
-    ProductVariant,
-    PriceHistory,
 )
-from workers.web_monitor.models import ProductData, VariantData
-from workers.web_monitor.platform_detector import PlatformDetector
-from workers.web_monitor.extractor_factory import ExtractorFactory
+from workers.web_monitor.change_detection import conditional_headers, content_hash
+from workers.web_monitor.concurrency import HostLimiter, HostRateLimiter
+from workers.web_monitor.document import ParsedDocument
+from workers.web_monitor.extraction_executor import ExtractionExecutor
+from workers.web_monitor.instrumentation import SCOPE_RUN, CrawlInstrumentation, PageTimer
+from workers.web_monitor.scheduler import claim_due_pages, refresh_schedule
+from workers.web_monitor.snapshot_store import snapshot_store
+from workers.web_monitor.catalog_writer import save_products
 from workers.tech_fingerprint.fingerprinter import TechFingerprinter
-from workers.diff_engine.analyzer import analyze_changes
+from workers.diff_engine.analyzer import analyze_changes, analyze_run_changes
 
 
 logger = logging.getLogger(__name__)
 
-# HTTP client config
-DEFAULT_HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/121.0.0.0 Safari/537.36"
-    ),
-    "Accept-Language": "es-AR,es;q=0.9,en;q=0.8",
-}
-REQUEST_TIMEOUT = 30.0
-
 
-async def fetch_page_html(url: str) -> tuple[str, dict[str, str]]:
+async def fetch_page_html(
+    url: str,
+    client: FetchClient | None = None,
+) -> tuple[str, dict[str, str]]:
     """
     Fetch a URL and return (html_content, response_headers).
+    Uses the shared worker FetchClient when given (connection reuse),
+    otherwise a short-lived one.
+    Raises RequestsError on failure.
+    """
+    if client is None:
+        async with FetchClient(max_connections=1) as own_client:
+            return await fetch_page_html(url, own_client)
+
+    response = await client.get(url)
+    response.raise_for_status()
+    return response.text, dict(response.headers)
+
+
+@dataclass(slots=True)
+class PageFetch:
+    """Result of a (possibly conditional) page fetch."""
+
+    status_code: int
+    html: str
+    headers: dict[str, str]
+    content_hash: str | None = None
+    body_bytes: int = 0
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status_code == 304
+
+
+async def fetch_page_conditional(
+    page: MonitoredPage,
+    client: FetchClient | None = None,
+    *,
+    conditional: bool = True,
+) -> PageFetch:
+    """
+    Fetch a monitored page sending If-None-Match / If-Modified-Since from
+    the validators stored on the page. A 304 comes back with an empty body.
     Raises RequestsError on failure.
     """
-    async with CurlSession(
-        headers=DEFAULT_HEADERS,
-        timeout=REQUEST_TIMEOUT,
-        impersonate="chrome120",
-    ) as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        return response.text, dict(response.headers)
-
-
-async def _capture_homepage_screenshot(url: str, snapshot_id: int) -> str | None:
-    """Capture a visual screenshot of a homepage using Playwright."""
+    if client is None:
+        async with FetchClient(max_connections=1) as own_client:
+            return await fetch_page_conditional(page, own_client, conditional=conditional)
+
+    headers = conditional_headers(page.etag, page.last_modified) if conditional else None
+    response = await client.get(page.url, headers=headers)
+    response.raise_for_status()
+
+    if response.status_code == 304:
+        return PageFetch(status_code=304, html="", headers=dict(response.headers))
+
+    html = response.text
+    return PageFetch(
+        status_code=response.status_code,
+        html=html,
+        headers=dict(response.headers),
+        content_hash=content_hash(html),
+        body_bytes=len(response.content),
+    )
+
+
+def _remember_validators(page: MonitoredPage, fetched: PageFetch) -> None:
+    """Store HTTP validators + body hash on the page for the next run."""
+    headers = {k.lower(): v for k, v in fetched.headers.items()}
+    if headers.get("etag"):
+        page.etag = headers["etag"][:512]
+    if headers.get("last-modified"):
+        page.last_modified = headers["last-modified"][:64]
+    if fetched.content_hash:
+        page.content_hash = fetched.content_hash
+    page.last_fetched_at = datetime.now(timezone.utc)
+
+
+async def _latest_extracted_snapshot(
+    session: AsyncSession,
+    page: MonitoredPage,
+) -> PageSnapshot | None:
+    result = await session.execute(
+        select(PageSnapshot)
+        .where(
+            PageSnapshot.monitored_page_id == page.id,
+            PageSnapshot.status == SnapshotStatus.EXTRACTED,
+        )
+        .order_by(desc(PageSnapshot.created_at))
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def _reuse_previous_snapshot(
+    session: AsyncSession,
+    page: MonitoredPage,
+    run_id: int,
+    previous: PageSnapshot,
+) -> PageSnapshot:
+    """
+    Unchanged page: record a new snapshot that points at the previous one's
+    signals instead of copying them, without parsing. Chains are flattened
+    (the pointer always names the snapshot that owns the rows), so readers
+    resolve it in a single step.
+    """
+    snapshot = PageSnapshot(
+        monitored_page_id=page.id,
+        run_id=run_id,
+        status=SnapshotStatus.EXTRACTED,
+        content_hash=previous.content_hash,
+        raw_storage_path=previous.raw_storage_path,
+        screenshot_url=previous.screenshot_url,
+        signals_snapshot_id=previous.signals_snapshot_id or previous.id,
+    )
+    session.add(snapshot)
+    await session.flush()
+    return snapshot
+
+
+async def _capture_homepage_screenshot(
+    url: str,
+    snapshot_id: int,
+    browser_pool: BrowserPool | None = None,
+) -> str | None:
+    """Capture a visual screenshot of a homepage using the shared browser pool."""
     try:
         os.makedirs("public/snapshots", exist_ok=True)
         filepath = f"public/snapshots/snapshot_{snapshot_id}.jpg"
-        
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page(
-                user_agent=DEFAULT_HEADERS["User-Agent"]
-            )
-            await page.set_viewport_size({"width": 1280, "height": 800})
-            
-            # Fast navigation, wait for domcontentloaded to handle 403 pages smoothly
-            try:
-                await page.goto(url, wait_until="domcontentloaded", timeout=15000)
-                await page.wait_for_timeout(3000)
-            except Exception as nav_e:
-                logger.debug("Playwright navigation incomplete, but taking screenshot anyway: %s", nav_e)
-            
-            await page.screenshot(path=filepath, type="jpeg", quality=60, full_page=False)
-            await browser.close()
-            
-            # Subir a Directus
-            url_upload = f"{settings.directus_url}/files"
-            headers = {"Authorization": f"Bearer {settings.directus_key}"} if settings.directus_key else {}
-            
-            try:
-                with open(filepath, "rb") as fp:
-                    files = {"file": (f"snapshot_{snapshot_id}.jpg", fp, "image/jpeg")}
-                    data = {"title": f"Snapshot {snapshot_id} - {url}"}
-                    
-                    async with httpx.AsyncClient() as client:
-                        resp = await client.post(url_upload, headers=headers, files=files, data=data)
-                        if resp.status_code == 200:
-                            file_id = resp.json().get("data", {}).get("id")
-                            logger.info("Screenshot subido a Directus exitosamente: UUID %s", file_id)
-                            return file_id
-                        else:
-                            logger.error("Error subiendo screenshot a Directus: %s", resp.text)
-                            return f"/public/snapshots/snapshot_{snapshot_id}.jpg"
-            except Exception as up_e:
-                logger.error("Fallo la subida a Directus: %s", up_e)
-                return f"/public/snapshots/snapshot_{snapshot_id}.jpg"
-                
+
+        if browser_pool is None:
+            async with BrowserPool(max_contexts=1) as pool:
+                await pool.screenshot(url, filepath)
+        else:
+            await browser_pool.screenshot(url, filepath)
+
+        # Subir a Directus (deduplicado: una home sin cambios reutiliza el mismo archivo)
+        file_id = await asset_uploader.upload_file(
+            filepath, title=f"Snapshot {snapshot_id} - {url}", content_type="image/jpeg"
+        )
+        if file_id is None:
+            logger.error("Fallo la subida a Directus del snapshot %d", snapshot_id)
+            return f"/public/snapshots/snapshot_{snapshot_id}.jpg"
+        logger.info("Screenshot subido a Directus exitosamente: UUID %s", file_id)
+        return file_id
+
     except Exception as e:
         logger.warning("Failed to capture screenshot for %s: %s", url, e)
         return None
 
 
+async def _store_raw_html(html: str) -> str | None:
+    """Persist raw HTML in the snapshot store; never fails the page."""
+    try:
+        return await asyncio.to_thread(snapshot_store.put, html)
+    except OSError as exc:
+        logger.warning("Could not store raw HTML snapshot: %s", exc)
+        return None
+
+
+async def _fetch_paced(
+    page: MonitoredPage,
+    fetch_client: FetchClient | None,
+    timer: PageTimer,
+    rate_limiter: HostRateLimiter | None,
+    *,
+    conditional: bool = True,
+) -> PageFetch:
+    """Conditional fetch behind the host's rate limiter (waiting time timed as ``throttle``)."""
+    if rate_limiter is not None:
+        with timer.stage("throttle"):
+            await rate_limiter.acquire(page.url)
+    with timer.stage("fetch"), (rate_limiter.track(page.url) if rate_limiter else nullcontext()):
+        fetched = await fetch_page_conditional(page, fetch_client, conditional=conditional)
+    timer.add_bytes("fetch", fetched.body_bytes)
+    return fetched
+
+
 async def process_monitored_page(
     session: AsyncSession,
     page: MonitoredPage,
     run_id: int,
+    fetch_client: FetchClient | None = None,
+    browser_pool: BrowserPool | None = None,
+    extraction_executor: ExtractionExecutor | None = None,
+    instrumentation: CrawlInstrumentation | None = None,
+    rate_limiter: HostRateLimiter | None = None,
 ) -> bool:
     """
     Process a single monitored page:
-    1. Fetch HTML
-    2. Detect platform
-    3. Extract signals
-    4. Save snapshot + signals
+    1. Fetch HTML (conditional GET)
+    2. Short-circuit if unchanged (304 or same normalized hash)
+    3. Detect platform
+    4. Extract signals
+    5. Save snapshot + signals
+
+    Every stage is timed; the page's timings are folded into
+    ``instrumentation`` (per run / competitor / platform) when given.
+    Requests are paced by ``rate_limiter`` (adaptive per-host rate + circuit
+    breaker) when given.
 
     Returns True on success, False on failure.
     """
+    timer = PageTimer()
+    try:
+        return await _process_page_stages(
+            session, page, run_id, timer, fetch_client, browser_pool, extraction_executor, rate_limiter
+        )
+    finally:
+        if instrumentation is not None:
+            instrumentation.record_page(timer, competitor_id=page.competitor_id, platform=timer.platform)
+
+
+async def _process_page_stages(
+    session: AsyncSession,
+    page: MonitoredPage,
+    run_id: int,
+    timer: PageTimer,
+    fetch_client: FetchClient | None,
+    browser_pool: BrowserPool | None,
+    extraction_executor: ExtractionExecutor | None,
+    rate_limiter: HostRateLimiter | None = None,
+) -> bool:
     logger.info("Processing page: %s", page.url)
 
     # 1. Fetch HTML
     try:
-        html, headers = await fetch_page_html(page.url)
+        fetched = await _fetch_paced(page, fetch_client, timer, rate_limiter)
+
+        # 2. Unchanged since last run → reuse previous snapshot's signals
+        if fetched.not_modified or (
+            fetched.content_hash and fetched.content_hash == page.content_hash
+        ):
+            with timer.stage("reuse"):
+                previous = await _latest_extracted_snapshot(session, page)
+                if previous is not None:
+                    snapshot = await _reuse_previous_snapshot(session, page, run_id, previous)
+            if previous is not None:
+                _remember_validators(page, fetched)
+                logger.info(
+                    "  Unchanged (%s) — reused signals of snapshot #%d in #%d",
+                    "304" if fetched.not_modified else "same hash",
+                    previous.id, snapshot.id,
+                )
+                return True
+            if fetched.not_modified:
+                # Nothing to reuse: validators are stale, fetch the full body
+                fetched = await _fetch_paced(page, fetch_client, timer, rate_limiter, conditional=False)
     except RequestsError as exc:
         logger.warning("Failed to fetch %s: %s", page.url, exc)
         # Save error snapshot
@@ -155,31 +322,54 @@ async def process_monitored_page(
         session.add(snapshot)
         return False
 
-    # 2. Save raw snapshot
+    html, headers = fetched.html, fetched.headers
+    _remember_validators(page, fetched)
+
+    # Save raw snapshot (compressed, deduplicated by content hash)
+    with timer.stage("store_raw"):
+        raw_storage_path = await _store_raw_html(html)
     snapshot = PageSnapshot(
         monitored_page_id=page.id,
         run_id=run_id,
         status=SnapshotStatus.PENDING_EXTRACTION,
+        content_hash=fetched.content_hash,
+        raw_storage_path=raw_storage_path,
     )
     session.add(snapshot)
     await session.flush()  # get snapshot.id
 
     if page.page_type == PageType.HOMEPAGE:
         logger.info("  📸 Capturing visual screenshot for homepage...")
-        screenshot_path = await _capture_homepage_screenshot(page.url, snapshot.id)
+        with timer.stage("screenshot"):
+            screenshot_path = await _capture_homepage_screenshot(page.url, snapshot.id, browser_pool)
         if screenshot_path:
             # We save the absolute filesystem path so python/directus can eventually map it
             # For this MVP, we save it as a local URL reference
             snapshot.screenshot_url = f"file://{os.path.abspath(screenshot_path)}"
 
-    # 3. Detect platform
-    detector = PlatformDetector()
-    platform = detector.detect(html, headers)
-    logger.info("  Platform detected: %s", platform)
-
-    # 4. Get extractor and extract signals
-    extractor = ExtractorFactory.create(platform, html, headers, page.url)
-    result = await extractor.extract_all()
+    # One parse tree for the whole pipeline (extractor, fingerprinter).
+    # Parsed lazily: in process mode the extraction worker builds its own.
+    document = ParsedDocument(html, page.url)
+
+    # 3-4. Detect platform + extract signals (off the event loop in process mode)
+    if extraction_executor is None:
+        extraction_executor = ExtractionExecutor(mode="inline")
+    extract_started = time.perf_counter()
+    outcome = await extraction_executor.extract(html, headers, page.url, document=document)
+    detection, result = outcome.detection, outcome.result
+    platform = detection.platform
+    timer.platform = platform
+    timer.observe("detection", outcome.detection_seconds)
+    timer.observe("extraction", outcome.extraction_seconds)
+    timer.add_bytes("extraction", fetched.body_bytes)
+    timer.observe(
+        "extraction_wait",
+        max(0.0, time.perf_counter() - extract_started - outcome.detection_seconds - outcome.extraction_seconds),
+    )
+    logger.info(
+        "  Platform detected: %s (confidence %.2f, evidence %s)",
+        platform, detection.confidence, detection.evidence.get(platform, []),
+    )
     logger.info(
         "  Extracted: %d promos, %d financing, %d CTAs",
         len(result.promos),
@@ -187,43 +377,51 @@ async def process_monitored_page(
         len(result.ctas),
     )
 
-    # 5. Save detected signals
-    signals_saved = 0
-    for promo in result.promos:
-        signal = DetectedSignal(
-            source_type=SignalSource.WEB,
-            snapshot_id=snapshot.id,
-            raw_text_found=promo.raw_text,
-            confidence_score=promo.confidence,
-        )
-        session.add(signal)
-        signals_saved += 1
-
-    for fin in result.financing:
-        signal = DetectedSignal(
-            source_type=SignalSource.WEB,
-            snapshot_id=snapshot.id,
-            raw_text_found=fin.raw_text,
-            confidence_score=fin.confidence,
-        )
-        session.add(signal)
-        signals_saved += 1
-
-    for cta in result.ctas:
-        signal = DetectedSignal(
-            source_type=SignalSource.WEB,
-            snapshot_id=snapshot.id,
-            raw_text_found=cta.text,
-            confidence_score=0.9,
-        )
-        session.add(signal)
-        signals_saved += 1
+    # 5. Save detected signals (flushed here so the stage includes the INSERT)
+    with timer.stage("signals"):
+        signals_saved = 0
+        for promo in result.promos:
+            signal = DetectedSignal(
+                source_type=SignalSource.WEB,
+                snapshot_id=snapshot.id,
+                raw_text_found=promo.raw_text,
+                confidence_score=promo.confidence,
+            )
+            session.add(signal)
+            signals_saved += 1
+
+        for fin in result.financing:
+            signal = DetectedSignal(
+                source_type=SignalSource.WEB,
+                snapshot_id=snapshot.id,
+                raw_text_found=fin.raw_text,
+                confidence_score=fin.confidence,
+            )
+            session.add(signal)
+            signals_saved += 1
+
+        for cta in result.ctas:
+            signal = DetectedSignal(
+                source_type=SignalSource.WEB,
+                snapshot_id=snapshot.id,
+                raw_text_found=cta.text,
+                confidence_score=0.9,
+            )
+            session.add(signal)
+            signals_saved += 1
+        await session.flush()
 
-    # 6. Save Catalog Data (if extracted)
+    # 6. Save Catalog Data (if extracted) — one batched upsert for all products
     if result.products:
-        for product_data in result.products:
-            await _save_product_data(session, page, snapshot.id, product_data)
-        logger.info("  Catalog data saved for %d products", len(result.products))
+        with timer.stage("catalog"):
+            saved = await save_products(
+                session,
+                page.competitor_id,
+                result.products,
+                page_url=page.url,
+                snapshot_id=snapshot.id,
+            )
+        logger.info("  Catalog data saved for %d products", len(saved))
 
     # 7. Mark snapshot as extracted
     snapshot.status = SnapshotStatus.EXTRACTED
@@ -231,158 +429,474 @@ async def process_monitored_page(
 
     # 7. Run Tech Fingerprinting (if homepage)
     if page.page_type == PageType.HOMEPAGE:
-        fingerprinter = TechFingerprinter()
-        await fingerprinter.fingerprint_competitor(session, page.competitor_id, page.url, html=html)
+        with timer.stage("fingerprint"):
+            fingerprinter = TechFingerprinter(fetch_client=fetch_client)
+            await fingerprinter.fingerprint_competitor(
+                session, page.competitor_id, page.url, document=document
+            )
         logger.info("  Fingerprinted tech stack for competitor %d", page.competitor_id)
 
-    # 8. Run Diff Engine to detect changes
-    events = await analyze_changes(session, page)
-    if events:
-        logger.info("  Diff Engine detected %d changes", len(events))
+    # Parse tree no longer needed: free it before the diff / next page
+    document.release()
+
+    # 8. Run Diff Engine to detect changes (run mode: once per CrawlRun, after the crawl)
+    if settings.diff_mode == "page":
+        with timer.stage("diff"):
+            events = await analyze_changes(session, page)
+        if events:
+            logger.info("  Diff Engine detected %d changes", len(events))
 
     return True
 
 
-async def _save_product_data(
-    session: AsyncSession,
-    page: MonitoredPage,
-    snapshot_id: int,
-    data: ProductData,
-) -> None:
-    """Save/Update product, its variants, and add price history entry."""
-    # 1. Ensure Product exists
-    # If we have a SKU, use SKU + competitor_id. Otherwise fallback to URL.
-    if data.sku:
-        stmt = select(Product).where(
-            Product.competitor_id == page.competitor_id,
-            Product.sku == data.sku
-        )
-    else:
-        stmt = select(Product).where(
-            Product.competitor_id == page.competitor_id,
-            Product.url == page.url
+async def _process_page_isolated(
+    page_id: int,
+    run_id: int,
+    fetch_client: FetchClient | None,
+    browser_pool: BrowserPool | None = None,
+    extraction_executor: ExtractionExecutor | None = None,
+    instrumentation: CrawlInstrumentation | None = None,
+    rate_limiter: HostRateLimiter | None = None,
+) -> bool:
+    """
+    Process one page inside its own DB session.
+
+    Concurrent pages cannot share an AsyncSession, and a crash on one page
+    must not roll back the work already committed for the others.
+    """
+    from core.database import async_session_factory
+
+    async with async_session_factory() as session:
+        page = await session.get(MonitoredPage, page_id)
+        if page is None:
+            logger.warning("MonitoredPage #%d vanished before processing", page_id)
+            return False
+        try:
+            success = await process_monitored_page(
+                session, page, run_id, fetch_client, browser_pool, extraction_executor,
+                instrumentation, rate_limiter,
+            )
+            await session.commit()
+            return success
+        except Exception:
+            logger.exception("Unhandled error processing %s", page.url)
+            await session.rollback()
+            return False
+
+
+async def crawl_pages(
+    pages: list[MonitoredPage],
+    run_id: int,
+    fetch_client: FetchClient,
+    browser_pool: BrowserPool | None = None,
+    extraction_executor: ExtractionExecutor | None = None,
+    instrumentation: CrawlInstrumentation | None = None,
+    *,
+    concurrency: int | None = None,
+    per_host_concurrency: int | None = None,
+    outcomes: list[bool] | None = None,
+) -> tuple[int, int]:
+    """
+    Process pages concurrently, bounded by a global and a per-host limit,
+    with requests paced per host (adaptive rate, circuit breaker) so
+    throughput goes to the hosts that respond.
+
+    Each page's result is appended to ``outcomes`` as soon as it is known,
+    so a caller that is cancelled midway still knows what got done.
+
+    Returns (successes, failures).
+    """
+    limiter = HostLimiter(
+        global_limit=concurrency or settings.crawl_concurrency,
+        per_host_limit=per_host_concurrency or settings.crawl_per_host_concurrency,
+    )
+    rate_limiter = HostRateLimiter()
+
+    async def _worker(page: MonitoredPage) -> bool:
+        async with limiter.slot(page.url):
+            ok = await _process_page_isolated(
+                page.id, run_id, fetch_client, browser_pool, extraction_executor,
+                instrumentation, rate_limiter,
+            )
+        if outcomes is not None:
+            outcomes.append(ok)
+        return ok
+
+    results = await asyncio.gather(*(_worker(page) for page in pages))
+    successes = sum(1 for ok in results if ok)
+
+    rate_stats = rate_limiter.stats()
+    if rate_stats["throttled_hosts"]:
+        logger.info(
+            "  Rate limiter: %d/%d hosts throttled, circuit open for %s",
+            rate_stats["throttled_hosts"], rate_stats["hosts"],
+            ", ".join(rate_stats["open_circuits"]) or "none",
         )
-    
-    res = await session.execute(stmt)
-    product = res.scalar_one_or_none()
-    
-    if not product:
-        product = Product(
-            competitor_id=page.competitor_id,
-            sku=data.sku,
-            url=page.url if not data.url else data.url,
-            brand=data.brand,
-            title=data.title,
-            category_path=data.category_path,
-            category_tree=data.category_tree,
-            description=data.description,
-            images=data.images,
-            current_price=data.sale_price or data.list_price,
-            financing_options={"installments": data.installments} if data.installments else None,
-            discovered_from=data.source_url or page.url,
-            rating_avg=data.rating,
-            review_count=data.review_count,
-            badges=data.badges,
+    return successes, len(results) - successes
+
+
+# ── Run coordination (fan-out / shards / finalizer) ──────────────────
+
+def plan_shards(pages: list[MonitoredPage], max_pages: int) -> list[list[int]]:
+    """
+    Group page ids into shards of about ``max_pages`` pages.
+
+    A competitor is never split: its pages stay in one shard, so the
+    per-host limit of the worker that crawls it still holds.
+    """
+    by_competitor: dict[int, list[int]] = {}
+    for page in pages:
+        by_competitor.setdefault(page.competitor_id, []).append(page.id)
+
+    shards: list[list[int]] = []
+    current: list[int] = []
+    for page_ids in by_competitor.values():
+        if current and len(current) + len(page_ids) > max_pages:
+            shards.append(current)
+            current = []
+        current.extend(page_ids)
+    if current:
+        shards.append(current)
+    return shards
+
+
+async def _select_pages(session: AsyncSession) -> list[MonitoredPage]:
+    """Pages this tick crawls: the claimed due pages, or every active page."""
+    query = (
+        select(MonitoredPage)
+        .join(MonitoredPage.competitor)
+        .where(
+            MonitoredPage.is_active == True,
         )
-        session.add(product)
-        await session.flush()
-    else:
-        # Update metadata if changed
-        product.title = data.title or product.title
-        product.brand = data.brand or product.brand
-        product.category_path = data.category_path or product.category_path
-        product.category_tree = data.category_tree or product.category_tree
-        product.description = data.description or product.description
-        product.images = data.images or product.images
-        product.current_price = data.sale_price or data.list_price or product.current_price
-        product.financing_options = {"installments": data.installments} if data.installments else product.financing_options
-        product.discovered_from = data.source_url or product.discovered_from or page.url
-        product.rating_avg = data.rating or product.rating_avg
-        product.review_count = data.review_count or product.review_count
-        product.badges = data.badges or product.badges
-        product.is_active = True
-
-    # 2. Save Variants (if any)
-    if data.variants:
-        for v_data in data.variants:
-            v_stmt = select(ProductVariant).where(
-                ProductVariant.product_id == product.id,
-                ProductVariant.sku == v_data.sku
-            )
-            v_res = await session.execute(v_stmt)
-            variant = v_res.scalar_one_or_none()
-            
-            if not variant:
-                variant = ProductVariant(
-                    product_id=product.id,
-                    sku=v_data.sku,
-                    title=v_data.title,
-                    is_in_stock=v_data.is_in_stock,
-                    list_price=v_data.list_price,
-                    sale_price=v_data.sale_price,
-                    raw_metadata=v_data.raw_metadata
-                )
-                session.add(variant)
-            else:
-                variant.title = v_data.title or variant.title
-                variant.is_in_stock = v_data.is_in_stock
-                variant.list_price = v_data.list_price or variant.list_price
-                variant.sale_price = v_data.sale_price or variant.sale_price
-
-    # 3. Add Price History (Main Product)
-    history = PriceHistory(
-        product_id=product.id,
-        snapshot_id=snapshot_id,
-        list_price=data.list_price,
-        sale_price=data.sale_price,
-        currency=data.currency or "ARS",
-        is_in_stock=data.is_in_stock,
+        .order_by(MonitoredPage.competitor_id, MonitoredPage.id)
     )
-    session.add(history)
+    if settings.crawl_schedule == "due":
+        await refresh_schedule(session)
+        page_ids = await claim_due_pages(session, limit=settings.scheduler_max_pages_per_tick)
+        # Claims are committed first: the row locks are released right away
+        await session.commit()
+        if not page_ids:
+            return []
+        query = query.where(MonitoredPage.id.in_(page_ids))
+
+    result = await session.execute(query)
+    return list(result.scalars().all())
 
 
 async def run_web_monitor(ctx: dict) -> dict:
     """
-    ARQ job entry point.
-    Fetches and processes all active monitored pages.
+    ARQ job entry point (one scheduler tick) — the run coordinator.
+
+    With ``crawl_schedule='due'`` it refreshes the tier-based schedule and
+    claims only the pages that are due; with ``'all'`` it takes every
+    active page. No CrawlRun is created when nothing is due.
+
+    Under ARQ (``ctx['redis']``) with ``crawl_fanout`` on, the pages are split
+    into shards that are enqueued as ``run_crawl_shard`` jobs, so any worker
+    process or machine can pick them up; the last shard to finish enqueues
+    ``finalize_crawl_run``. Otherwise the pages are crawled here, as one shard.
     """
     from core.database import async_session_factory
-    
+
     async with async_session_factory() as session:
+        pages = await _select_pages(session)
+        if not pages:
+            logger.info("🕷️  No monitored pages due")
+            return {"successes": 0, "failures": 0, "run_id": None, "pages_due": 0}
+
+        redis = ctx.get("redis")
+        fanout = redis is not None and settings.crawl_fanout
+        if fanout:
+            shards = plan_shards(pages, settings.crawl_shard_max_pages)
+        else:
+            shards = [[page.id for page in pages]]
+
         # Create a CrawlRun to group this execution
-        run = CrawlRun(started_at=datetime.now(timezone.utc))
+        run = CrawlRun(
+            started_at=datetime.now(timezone.utc),
+            pages_total=len(pages),
+            shards_total=len(shards),
+        )
         session.add(run)
-        await session.flush()
-        logger.info("🕷️  CrawlRun #%d started", run.id)
+        await session.commit()
+        run_id = run.id
+        logger.info(
+            "🕷️  CrawlRun #%d started — %d pages to monitor in %d shard(s)",
+            run_id, len(pages), len(shards),
+        )
 
-        # Fetch all active monitored pages for ACTIVE competitors
-        result = await session.execute(
-            select(MonitoredPage)
-            .join(MonitoredPage.competitor)
-            .where(
-                MonitoredPage.is_active == True,
+    if fanout:
+        for index, page_ids in enumerate(shards):
+            await redis.enqueue_job(
+                "run_crawl_shard", run_id, index, page_ids,
+                _job_id=f"crawl_shard:{run_id}:{index}",
+            )
+        return {"run_id": run_id, "pages_due": len(pages), "shards": len(shards)}
+
+    shard_result = await _crawl_shard(ctx, run_id, 0, shards[0], finalize=False)
+    run_result = await finalize_crawl_run(ctx, run_id)
+    return {**shard_result, **run_result}
+
+
+async def run_crawl_shard(ctx: dict, run_id: int, shard_index: int, page_ids: list[int]) -> dict:
+    """
+    ARQ job: crawl one shard of a CrawlRun.
+
+    The shard that completes the run enqueues its finalizer (at most once,
+    thanks to the job id), whether it succeeded or not.
+    """
+    return await _crawl_shard(ctx, run_id, shard_index, page_ids)
+
+
+async def _crawl_shard(
+    ctx: dict,
+    run_id: int,
+    shard_index: int,
+    page_ids: list[int],
+    *,
+    finalize: bool = True,
+) -> dict:
+    """
+    Crawl the pages of one shard and fold its counters and stage timings
+    into the CrawlRun (under the run's row lock, so shards finishing at the
+    same time do not lose each other's updates).
+
+    The shard is counted even when the crawl raises or the job is cancelled
+    (ARQ timeout): pages it did not get to count as failures, so the run
+    still completes. With ``finalize``, the shard that completes the run
+    schedules ``finalize_crawl_run``.
+    """
+    from core.database import async_session_factory
+
+    started = time.perf_counter()
+    instrumentation = CrawlInstrumentation()
+    outcomes: list[bool] = []
+    run_complete = False
+
+    try:
+        async with async_session_factory() as session:
+            result = await session.execute(
+                select(MonitoredPage)
+                .where(MonitoredPage.id.in_(page_ids))
+                .order_by(MonitoredPage.competitor_id, MonitoredPage.id)
             )
-            .order_by(MonitoredPage.competitor_id, MonitoredPage.id)
+            pages = list(result.scalars().all())
+
+        # Reuse the worker-scoped client (warm connections), browser and extraction
+        # pool when running under ARQ
+        fetch_client = ctx.get("fetch_client")
+        browser_pool = ctx.get("browser_pool")
+        extraction_executor = ctx.get("extraction_executor")
+        async with AsyncExitStack() as stack:
+            if fetch_client is None:
+                fetch_client = await stack.enter_async_context(FetchClient())
+            if browser_pool is None:
+                browser_pool = await stack.enter_async_context(BrowserPool())
+            if extraction_executor is None:
+                extraction_executor = await stack.enter_async_context(ExtractionExecutor())
+            fetch_before = fetch_client.stats()
+            extraction_before = extraction_executor.stats()
+            await crawl_pages(
+                pages, run_id, fetch_client, browser_pool, extraction_executor, instrumentation,
+                outcomes=outcomes,
+            )
+            fetch_stats = fetch_client.stats()
+            screenshot_stats = browser_pool.stats()
+            extraction_stats = extraction_executor.stats()
+    finally:
+        # Pages not crawled (vanished between claim and crawl, or cut off) are failures
+        successes = sum(1 for ok in outcomes if ok)
+        failures = len(page_ids) - successes
+        run_complete = await _record_shard(run_id, shard_index, successes, failures, instrumentation)
+        if run_complete and finalize:
+            await _schedule_finalizer(ctx, run_id)
+
+    wall_time = time.perf_counter() - started
+    logger.info(
+        "  CrawlRun #%d shard %d — %d success, %d failures in %.1fs",
+        run_id, shard_index, successes, failures, wall_time,
+    )
+    # Client / executor counters are worker-lifetime: report this shard's share
+    requests = fetch_stats["requests"] - fetch_before["requests"]
+    reused = fetch_stats["reused_connections"] - fetch_before["reused_connections"]
+    logger.info(
+        "  HTTP: %d requests, %d reused / %d new connections",
+        requests, reused, fetch_stats["new_connections"] - fetch_before["new_connections"],
+    )
+    if screenshot_stats["captures"]:
+        logger.info(
+            "  Screenshots: %d captured, %d failed (p50 %.2fs, max %.2fs)",
+            screenshot_stats["captures"],
+            screenshot_stats["failures"],
+            screenshot_stats["latency_p50_seconds"],
+            screenshot_stats["latency_max_seconds"],
+        )
+    extraction_cpu = extraction_stats["cpu_seconds"] - extraction_before["cpu_seconds"]
+    logger.info(
+        "  Extraction (%s): %d pages, %.1fs CPU",
+        extraction_stats["mode"],
+        extraction_stats["pages"] - extraction_before["pages"],
+        extraction_cpu,
+    )
+    stage_summary = instrumentation.summary()
+    return {
+        "successes": successes,
+        "failures": failures,
+        "run_id": run_id,
+        "shard": shard_index,
+        "run_complete": run_complete,
+        "shard_wall_time_seconds": round(wall_time, 3),
+        "connection_reuse_ratio": round(reused / requests, 3) if requests else 0.0,
+        "screenshot_latency_p50_seconds": screenshot_stats["latency_p50_seconds"],
+        "extraction_cpu_seconds": round(extraction_cpu, 3),
+        "stage_seconds": {stage: stats["total_seconds"] for stage, stats in stage_summary.items()},
+    }
+
+
+async def _record_shard(
+    run_id: int,
+    shard_index: int,
+    successes: int,
+    failures: int,
+    instrumentation: CrawlInstrumentation,
+) -> bool:
+    """Fold one shard into its CrawlRun. Returns whether it was the last one."""
+    from core.database import async_session_factory
+
+    async with async_session_factory() as session:
+        run = await session.get(CrawlRun, run_id, with_for_update=True)
+        if run.ended_at is not None:
+            # Already finalized by the sweeper, which counted this shard's pages as failed
+            logger.warning("CrawlRun #%d shard %d finished after the run was closed", run_id, shard_index)
+            return False
+        run.pages_succeeded = (run.pages_succeeded or 0) + successes
+        run.pages_failed = (run.pages_failed or 0) + failures
+        run.shards_done = (run.shards_done or 0) + 1
+        existing = await session.execute(
+            select(CrawlRunStageStat).where(CrawlRunStageStat.run_id == run_id)
+        )
+        session.add_all(instrumentation.to_rows(run_id, list(existing.scalars().all())))
+        run_complete = run.shards_done >= run.shards_total
+        await session.commit()
+    return run_complete
+
+
+async def _schedule_finalizer(ctx: dict, run_id: int) -> None:
+    redis = ctx.get("redis")
+    if redis is not None:
+        await redis.enqueue_job(
+            "finalize_crawl_run", run_id, _job_id=f"crawl_run_finalize:{run_id}"
+        )
+    else:
+        await finalize_crawl_run(ctx, run_id)
+
+
+async def sweep_stalled_runs(ctx: dict) -> dict:
+    """
+    ARQ cron: finalize CrawlRuns whose shards are overdue.
+
+    A shard lost with its worker process never counts itself, and its run
+    would stay RUNNING forever. A run still open after ``shards_total + 1``
+    shard timeouts (every shard back to back, plus queueing) is closed:
+    its pages without a result count as failures.
+    """
+    from core.database import async_session_factory
+
+    now = datetime.now(timezone.utc)
+    timeout = settings.crawl_shard_timeout_seconds
+    async with async_session_factory() as session:
+        result = await session.execute(
+            select(CrawlRun.id, CrawlRun.started_at, CrawlRun.shards_total)
+            .where(CrawlRun.status == JobStatus.RUNNING, CrawlRun.ended_at.is_(None))
         )
-        pages = result.scalars().all()
-        logger.info("  Found %d active pages to monitor", len(pages))
-
-        successes = 0
-        failures = 0
-        for page in pages:
-            success = await process_monitored_page(session, page, run.id)
-            if success:
-                successes += 1
-            else:
-                failures += 1
-
-        # Finalize run
+        stalled = [
+            run_id for run_id, started_at, shards_total in result.all()
+            if (now - started_at).total_seconds() > timeout * ((shards_total or 0) + 1)
+        ]
+
+    for run_id in stalled:
+        async with async_session_factory() as session:
+            run = await session.get(CrawlRun, run_id, with_for_update=True)
+            if run.ended_at is not None:
+                continue
+            missing = (run.pages_total or 0) - (run.pages_succeeded or 0) - (run.pages_failed or 0)
+            logger.warning(
+                "CrawlRun #%d stalled — %d/%d shard(s) done, %d page(s) without a result",
+                run_id, run.shards_done or 0, run.shards_total or 0, max(missing, 0),
+            )
+            run.pages_failed = (run.pages_failed or 0) + max(missing, 0)
+            run.shards_done = run.shards_total
+            await session.commit()
+        await finalize_crawl_run(ctx, run_id)
+    return {"stalled_runs": stalled}
+
+
+async def finalize_crawl_run(ctx: dict, run_id: int) -> dict:
+    """
+    ARQ job: close a CrawlRun once all its shards are done.
+
+    Runs the run-mode Diff Engine over every page of the run, then stamps
+    status and throughput (wall time measured from ``started_at``, so it
+    includes queueing between shards). A run that is already closed (by
+    the sweeper) is left as it is.
+    """
+    from core.database import async_session_factory
+
+    async with async_session_factory() as session:
+        run = await session.get(CrawlRun, run_id)
+        if run is None or run.ended_at is not None:
+            logger.info("CrawlRun #%d already finalized", run_id)
+            return {"run_id": run_id, "already_finalized": True}
+
+    instrumentation = CrawlInstrumentation()
+
+    # Diff every page of the run in one SQL pass
+    if settings.diff_mode == "run":
+        diff_started = time.perf_counter()
+        async with async_session_factory() as session:
+            await analyze_run_changes(session, run_id)
+            await session.commit()
+        instrumentation.observe_run("diff", time.perf_counter() - diff_started)
+
+    async with async_session_factory() as session:
+        run = await session.get(CrawlRun, run_id, with_for_update=True)
         run.ended_at = datetime.now(timezone.utc)
-        run.status = JobStatus.SUCCESS if failures == 0 else JobStatus.FAILED_PARTIAL
+        wall_time = (run.ended_at - run.started_at).total_seconds()
+        pages_done = (run.pages_succeeded or 0) + (run.pages_failed or 0)
+        pages_per_second = pages_done / wall_time if wall_time > 0 else 0.0
+        run.status = JobStatus.SUCCESS if not run.pages_failed else JobStatus.FAILED_PARTIAL
+        run.wall_time_seconds = round(wall_time, 3)
+        run.pages_per_second = round(pages_per_second, 3)
+        existing = await session.execute(
+            select(CrawlRunStageStat).where(CrawlRunStageStat.run_id == run_id)
+        )
+        stage_rows = list(existing.scalars().all())
+        new_rows = instrumentation.to_rows(run_id, stage_rows)
+        session.add_all(new_rows)
+        successes, failures, shards = run.pages_succeeded, run.pages_failed, run.shards_total
+        run_stages = sorted(
+            (row for row in stage_rows + new_rows if row.scope == SCOPE_RUN),
+            key=lambda row: -float(row.total_seconds or 0),
+        )
         await session.commit()
 
+    logger.info(
+        "🏁 CrawlRun #%d finished — %d success, %d failures, %d shard(s) in %.1fs (%.2f pages/s)",
+        run_id, successes, failures, shards, wall_time, pages_per_second,
+    )
+    for row in run_stages:
         logger.info(
-            "🏁 CrawlRun #%d finished — %d success, %d failures",
-            run.id, successes, failures,
+            "  Stage %-16s %5d × p50 %.3fs p95 %.3fs max %.3fs (total %.1fs, %.1f MB)",
+            row.stage, row.count, row.p50_seconds, row.p95_seconds,
+            row.max_seconds, row.total_seconds, row.bytes_total / 1e6,
         )
-        return {"successes": successes, "failures": failures, "run_id": run.id}
+    return {
+        "successes": successes,
+        "failures": failures,
+        "run_id": run_id,
+        "pages_due": successes + failures,
+        "shards": shards,
+        "wall_time_seconds": round(wall_time, 3),
+        "pages_per_second": round(pages_per_second, 3),
+        "stage_seconds": {row.stage: float(row.total_seconds) for row in run_stages},
+    }
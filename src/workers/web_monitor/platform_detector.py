@@ -5,65 +5,108 @@ Este módulo analiza el HTML y los headers HTTP de una página para
 determinar la plataforma subyacente SIN depender de servicios externos.
 Corre en milisegundos y se usa para enrutar al extractor correcto.
 
+Todas las firmas son literales: se buscan sobre el HTML pasado a minúsculas
+una sola vez (búsqueda de substrings en C, ~1 ms por firma en 2 MB), en
+vez de un re.search con IGNORECASE por firma (~30 ms cada uno). Cada firma
+tiene un peso; la plataforma con mayor puntaje gana y la evidencia queda
+disponible para auditar ruteos incorrectos.
+
 La "Capa 2" (wappalyzer-next) corre en background para un perfil
 tecnológico completo (analytics, payments, CDN, etc.).
 """
 
 from __future__ import annotations
 
-import re
+import logging
+
+from workers.web_monitor.models import EcommercePlatform, PlatformDetection
 
-from workers.web_monitor.models import EcommercePlatform
+logger = logging.getLogger(__name__)
 
 
 # ──────────────────────────────────────────────────────────────────────
 # Firmas conocidas por plataforma
-# Cada entrada es una tupla (fuente, patrón regex)
+# Cada entrada es una tupla (fuente, literal en minúsculas, peso)
 # fuente: "html" | "header_key" | "header_value"
+# peso: 1.0 = marcador inequívoco, < 0.5 = indicio débil (palabra suelta)
 # ──────────────────────────────────────────────────────────────────────
 
-_PLATFORM_SIGNATURES: dict[EcommercePlatform, list[tuple[str, str]]] = {
+_PLATFORM_SIGNATURES: dict[EcommercePlatform, list[tuple[str, str, float]]] = {
     EcommercePlatform.VTEX: [
-        ("html", r"__STATE__"),
-        ("html", r"vtex\.render-server"),
-        ("html", r"vteximg\.com\.br"),
-        ("header_key", r"x-vtex-"),
+        ("html", "__state__", 0.6),
+        ("html", "vtex.render-server", 1.0),
+        ("html", "vteximg.com.br", 0.9),
+        ("header_key", "x-vtex-", 1.0),
     ],
     EcommercePlatform.SHOPIFY: [
-        ("html", r"window\.Shopify"),
-        ("html", r"cdn\.shopify\.com"),
-        ("header_key", r"x-shopify"),
-        ("html", r"Shopify\.theme"),
+        ("html", "window.shopify", 1.0),
+        ("html", "cdn.shopify.com", 0.8),
+        ("header_key", "x-shopify", 1.0),
+        ("html", "shopify.theme", 1.0),
     ],
     EcommercePlatform.MAGENTO: [
-        ("html", r"Magento/"),
-        ("html", r"mage-cache-storage"),
-        ("html", r"requirejs/require"),
-        ("html", r"catalog/product/view"),
+        ("html", "magento/", 0.6),
+        ("html", "mage-cache-storage", 1.0),
+        ("html", "requirejs/require", 0.3),
+        ("html", "catalog/product/view", 0.6),
     ],
     EcommercePlatform.TIENDANUBE: [
-        ("html", r"tiendanube\.com/scripts"),
-        ("html", r"window\.LS\.store"),
-        ("html", r"nuvemshop"),
+        ("html", "tiendanube.com/scripts", 1.0),
+        ("html", "window.ls.store", 1.0),
+        ("html", "nuvemshop", 0.8),
     ],
     EcommercePlatform.WOOCOMMERCE: [
-        ("html", r"wp-content/plugins/woocommerce"),
-        ("html", r"woocommerce"),
-        ("html", r"wc-block-"),
+        ("html", "wp-content/plugins/woocommerce", 1.0),
+        ("html", "woocommerce", 0.4),
+        ("html", "wc-block-", 0.5),
     ],
     EcommercePlatform.PRESTASHOP: [
-        ("html", r"var prestashop"),
-        ("html", r"PrestaShop"),
-        ("html", r"prestashop/js"),
+        ("html", "var prestashop", 1.0),
+        ("html", "prestashop", 0.5),
+        ("html", "prestashop/js", 0.8),
     ],
     EcommercePlatform.SALESFORCE: [
-        ("html", r"demandware\.store"),
-        ("html", r"dw\.ac"),
-        ("html", r"sfcc:true"),
-        ("html", r"demandware\.edgesuite"),
+        ("html", "demandware.store", 1.0),
+        ("html", "dw.ac", 0.3),
+        ("html", "sfcc:true", 1.0),
+        ("html", "demandware.edgesuite", 1.0),
     ],
 }
 
+# Puntaje mínimo para rutear a un extractor específico (debajo → UNKNOWN)
+MIN_SCORE = 0.5
+
+# Scanner precompilado: (literal, plataforma, peso) por fuente
+_Scanner = tuple[tuple[str, EcommercePlatform, float], ...]
+
+
+def _compile_scanner(source: str) -> _Scanner:
+    return tuple(
+        (literal, platform, weight)
+        for platform, signatures in _PLATFORM_SIGNATURES.items()
+        for sig_source, literal, weight in signatures
+        if sig_source == source
+    )
+
+
+_HTML_SCANNER = _compile_scanner("html")
+_HEADER_KEY_SCANNER = _compile_scanner("header_key")
+_HEADER_VALUE_SCANNER = _compile_scanner("header_value")
+
+
+def _scan(
+    text: str,
+    scanner: _Scanner,
+    source: str,
+    scores: dict[EcommercePlatform, float],
+    evidence: dict[EcommercePlatform, list[str]],
+) -> None:
+    """Suma el peso de cada firma presente en ``text`` (ya en minúsculas)."""
+    for literal, platform, weight in scanner:
+        if literal in text:
+            scores[platform] = round(scores.get(platform, 0.0) + weight, 2)
+            evidence.setdefault(platform, []).append(f"{source}:{literal}")
+
 
 class PlatformDetector:
     """
@@ -71,48 +114,68 @@ class PlatformDetector:
 
     Usage:
         platform = PlatformDetector.detect(html=page_html, headers=response_headers)
+        detection = PlatformDetector.analyze(html=page_html, headers=response_headers)
     """
 
     @staticmethod
-    def detect(
+    def analyze(
         html: str,
         headers: dict[str, str] | None = None,
-    ) -> EcommercePlatform:
+        *,
+        html_lower: str | None = None,
+    ) -> PlatformDetection:
         """
-        Capa 1: Heurísticas rápidas de detección.
+        Capa 1: Heurísticas rápidas de detección, con puntajes por plataforma.
 
-        Busca firmas conocidas en el HTML y en los headers HTTP.
-        Retorna la primera plataforma que matchea con al menos 1 firma.
-        Si ninguna matchea, retorna EcommercePlatform.UNKNOWN.
+        Evalúa TODAS las firmas (no corta en la primera) y suma el peso de
+        cada una encontrada. Gana la plataforma con mayor puntaje si llega a
+        ``MIN_SCORE``; si no, UNKNOWN. Así una palabra suelta ("woocommerce"
+        en un texto) no le gana a un marcador fuerte de otra plataforma.
 
         Args:
             html: Contenido HTML crudo de la página.
-            headers: Headers HTTP de la respuesta (keys en lowercase).
+            headers: Headers HTTP de la respuesta.
+            html_lower: ``html.lower()`` ya calculado (ParsedDocument.lower_html).
 
         Returns:
-            EcommercePlatform detectada o UNKNOWN.
+            PlatformDetection con la plataforma, confianza, puntajes y evidencia.
         """
         if headers is None:
             headers = {}
 
-        # Normalizar header keys a lowercase
-        normalized_headers = {k.lower(): v for k, v in headers.items()}
-
-        for platform, signatures in _PLATFORM_SIGNATURES.items():
-            for source, pattern in signatures:
-                if source == "html" and re.search(pattern, html, re.IGNORECASE):
-                    return platform
-                elif source == "header_key":
-                    if any(
-                        re.search(pattern, key, re.IGNORECASE)
-                        for key in normalized_headers
-                    ):
-                        return platform
-                elif source == "header_value":
-                    if any(
-                        re.search(pattern, val, re.IGNORECASE)
-                        for val in normalized_headers.values()
-                    ):
-                        return platform
-
-        return EcommercePlatform.UNKNOWN
+        scores: dict[EcommercePlatform, float] = {}
+        evidence: dict[EcommercePlatform, list[str]] = {}
+
+        _scan(html_lower if html_lower is not None else html.lower(), _HTML_SCANNER, "html", scores, evidence)
+        if headers:
+            # Headers normalizados a lowercase, un string por fuente
+            keys = "\n".join(headers).lower()
+            values = "\n".join(headers.values()).lower()
+            _scan(keys, _HEADER_KEY_SCANNER, "header_key", scores, evidence)
+            _scan(values, _HEADER_VALUE_SCANNER, "header_value", scores, evidence)
+
+        # max() se queda con el primero en empate → orden de _PLATFORM_SIGNATURES
+        best = max(scores, key=scores.__getitem__, default=None)
+        if best is None or scores[best] < MIN_SCORE:
+            return PlatformDetection(
+                platform=EcommercePlatform.UNKNOWN, scores=scores, evidence=evidence
+            )
+
+        if len(scores) > 1:
+            logger.debug("Platform signatures for several platforms: %s", scores)
+        return PlatformDetection(
+            platform=best,
+            confidence=min(scores[best], 1.0),
+            scores=scores,
+            evidence=evidence,
+        )
+
+    @staticmethod
+    def detect(
+        html: str,
+        headers: dict[str, str] | None = None,
+        *,
+        html_lower: str | None = None,
+    ) -> EcommercePlatform:
+        """Plataforma detectada (ver ``analyze`` para puntajes y evidencia)."""
+        return PlatformDetector.analyze(html, headers, html_lower=html_lower).platform
@@ -0,0 +1,222 @@
+"""
+Change-only price history.
+
+``price_history`` keeps one row per price / stock state of a product,
+valid over ``[valid_from, valid_to)`` (``valid_to`` NULL = current state),
+instead of one row per product per crawl:
+
+- ``record_price_changes``  per crawl batch, two set-based statements:
+  close the open interval of products whose state changed, then open a
+  new one for them (and for products seen for the first time). An
+  unchanged product writes nothing.
+- ``price_at`` / ``price_series`` rebuild the price at a point in time or
+  over a window (index ``product_id, valid_from``).
+- ``compact_price_history`` one-off merge of the per-crawl rows written
+  before intervals existed (``scripts/compact_price_history.py``).
+
+Usage:
+    await record_price_changes(session, rows)        # rows: product_id, prices, currency, stock
+    prices = await price_at(session, [product.id], at=datetime(2026, 9, 1, tzinfo=timezone.utc))
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Sequence
+from datetime import datetime, timezone
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Numeric,
+    String,
+    cast,
+    column,
+    func,
+    literal,
+    or_,
+    select,
+    text,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.models import PriceHistory
+
+logger = logging.getLogger(__name__)
+
+# Columns whose change opens a new interval
+_STATE_COLUMNS = ("list_price", "sale_price", "currency", "is_in_stock")
+# Products per compaction transaction
+COMPACT_BATCH = 5000
+
+
+async def record_price_changes(
+    session: AsyncSession,
+    rows: Sequence[dict],
+    *,
+    observed_at: datetime | None = None,
+) -> None:
+    """
+    Apply one crawl's observations (does not commit).
+
+    Each row: ``product_id``, ``list_price``, ``sale_price``, ``currency``,
+    ``is_in_stock`` and optionally ``snapshot_id`` (kept on the interval it opens).
+    """
+    if not rows:
+        return
+    observed_at = observed_at or datetime.now(timezone.utc)
+    incoming = values(
+        column("product_id", BigInteger),
+        column("snapshot_id", BigInteger),
+        column("list_price", Numeric(12, 2)),
+        column("sale_price", Numeric(12, 2)),
+        column("currency", String(10)),
+        column("is_in_stock", Boolean),
+        name="incoming",
+    ).data(
+        [
+            (
+                row["product_id"],
+                row.get("snapshot_id"),
+                row.get("list_price"),
+                row.get("sale_price"),
+                row.get("currency") or "ARS",
+                bool(row.get("is_in_stock", True)),
+            )
+            for row in rows
+        ]
+    )
+
+    def _typed(name: str):
+        # Literal NULLs in VALUES are untyped (text): cast back to the table's types
+        return cast(incoming.c[name], PriceHistory.__table__.c[name].type)
+
+    # 1. Close the current interval of products whose state changed
+    await session.execute(
+        update(PriceHistory)
+        .where(
+            PriceHistory.product_id == incoming.c.product_id,
+            PriceHistory.valid_to.is_(None),
+            or_(*(getattr(PriceHistory, col).is_distinct_from(_typed(col)) for col in _STATE_COLUMNS)),
+        )
+        .values(valid_to=observed_at)
+        .execution_options(synchronize_session=False)
+    )
+
+    # 2. Open an interval for every product left without one (changed or new)
+    has_open = (
+        select(PriceHistory.id)
+        .where(PriceHistory.product_id == incoming.c.product_id, PriceHistory.valid_to.is_(None))
+        .exists()
+    )
+    stmt = pg_insert(PriceHistory).from_select(
+        ["product_id", "snapshot_id", *_STATE_COLUMNS, "valid_from"],
+        select(
+            incoming.c.product_id,
+            _typed("snapshot_id"),
+            *(_typed(col) for col in _STATE_COLUMNS),
+            literal(observed_at, PriceHistory.valid_from.type),
+        ).where(~has_open),
+    )
+    # A concurrent writer may have opened it meanwhile: keep theirs
+    stmt = stmt.on_conflict_do_nothing(index_elements=["product_id"], index_where=PriceHistory.valid_to.is_(None))
+    await session.execute(stmt)
+
+
+async def price_at(
+    session: AsyncSession,
+    product_ids: Sequence[int],
+    at: datetime,
+) -> dict[int, PriceHistory]:
+    """State of each product at ``at`` (products not yet tracked then are absent)."""
+    if not product_ids:
+        return {}
+    result = await session.scalars(
+        select(PriceHistory).where(
+            PriceHistory.product_id.in_(product_ids),
+            PriceHistory.valid_from <= at,
+            or_(PriceHistory.valid_to.is_(None), PriceHistory.valid_to > at),
+        )
+    )
+    return {row.product_id: row for row in result}
+
+
+async def price_series(
+    session: AsyncSession,
+    product_id: int,
+    since: datetime,
+    until: datetime | None = None,
+) -> list[PriceHistory]:
+    """Intervals of a product overlapping ``[since, until)``, oldest first."""
+    query = select(PriceHistory).where(
+        PriceHistory.product_id == product_id,
+        or_(PriceHistory.valid_to.is_(None), PriceHistory.valid_to > since),
+    )
+    if until is not None:
+        query = query.where(PriceHistory.valid_from < until)
+    result = await session.scalars(query.order_by(PriceHistory.valid_from, PriceHistory.id))
+    return list(result)
+
+
+# Rows repeating the previous state of their product (by valid_from)
+_DELETE_REPEATS = text(
+    """
+    DELETE FROM price_history h
+    USING (
+        SELECT id,
+               (list_price, sale_price, currency, is_in_stock) IS NOT DISTINCT FROM
+               lag((list_price, sale_price, currency, is_in_stock))
+                   OVER (PARTITION BY product_id ORDER BY valid_from, id) AS repeats
+        FROM price_history
+        WHERE product_id >= :low AND product_id < :high
+    ) r
+    WHERE h.id = r.id AND r.repeats
+    """
+)
+# Each remaining row lasts until the next one of its product; the last stays open
+_CHAIN_INTERVALS = text(
+    """
+    UPDATE price_history h
+    SET valid_to = n.next_from
+    FROM (
+        SELECT id, lead(valid_from) OVER (PARTITION BY product_id ORDER BY valid_from, id) AS next_from
+        FROM price_history
+        WHERE product_id >= :low AND product_id < :high
+    ) n
+    WHERE h.id = n.id AND h.valid_to IS DISTINCT FROM n.next_from
+    """
+)
+
+
+async def compact_price_history(batch_products: int = COMPACT_BATCH) -> dict:
+    """
+    Merge consecutive identical rows into intervals, ``batch_products`` product ids per transaction.
+
+    Rows written per crawl before the switch to intervals become one row per
+    actual change. Idempotent; run ``VACUUM`` afterwards to return the space.
+    """
+    from core.database import async_session_factory
+
+    async with async_session_factory() as session:
+        low, high = (await session.execute(select(func.min(PriceHistory.product_id), func.max(PriceHistory.product_id)))).one()
+    stats = {"deleted": 0, "rechained": 0, "batches": 0}
+    if low is None:
+        return stats
+
+    for start in range(low, high + 1, batch_products):
+        bounds = {"low": start, "high": start + batch_products}
+        async with async_session_factory() as session:
+            deleted = await session.execute(_DELETE_REPEATS, bounds)
+            rechained = await session.execute(_CHAIN_INTERVALS, bounds)
+            await session.commit()
+        stats["deleted"] += deleted.rowcount
+        stats["rechained"] += rechained.rowcount
+        stats["batches"] += 1
+        logger.info(
+            "Price history compaction: products %d-%d, %d rows merged (%d so far)",
+            start, start + batch_products - 1, deleted.rowcount, stats["deleted"],
+        )
+    return stats
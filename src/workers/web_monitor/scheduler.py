@@ -0,0 +1,186 @@
+"""
+Due-queue scheduler for monitored pages.
+
+Instead of crawling every active page on a fixed cron, each
+``MonitoredPage`` carries a ``next_due_at`` and a ``crawl_interval_seconds``
+derived from the subscription tiers of the clients that track its
+competitor:
+
+    interval   the highest ``monitoring_frequency`` among the active
+               (TRIAL / ACTIVE billing) clients tracking the competitor
+               LOW = 1x/day, MEDIUM = 3x/day, HIGH = 6x/day. Untracked
+               competitors keep the LOW cadence.
+    page cap   the largest ``max_monitored_pages`` among those tiers; pages
+               over the cap (homepage first, then oldest) are unscheduled
+               (``next_due_at`` NULL) until a tier allows them.
+
+A frequent ARQ tick (``scheduler_tick_minutes``) refreshes the schedule
+and claims the pages that are due with ``FOR UPDATE SKIP LOCKED``, so
+concurrent ticks or workers never crawl the same page twice. Claiming
+advances ``next_due_at`` to the next slot of the page's grid. New pages
+get a phase offset spread over their interval (by id), so the load is
+spread evenly across the day instead of in a few spikes.
+
+Usage:
+    await refresh_schedule(session)
+    page_ids = await claim_due_pages(session, limit=200)
+    await session.commit()
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.models import (
+    BillingStatus,
+    Client,
+    ClientCompetitor,
+    MonitoredPage,
+    MonitoringFrequency,
+    PageType,
+    SubscriptionTier,
+)
+
+logger = logging.getLogger(__name__)
+
+FREQUENCY_INTERVALS: dict[MonitoringFrequency, timedelta] = {
+    MonitoringFrequency.LOW: timedelta(hours=24),
+    MonitoringFrequency.MEDIUM: timedelta(hours=8),
+    MonitoringFrequency.HIGH: timedelta(hours=4),
+}
+DEFAULT_FREQUENCY = MonitoringFrequency.LOW
+
+# Clients whose tier counts for scheduling
+_SCHEDULING_BILLING = (BillingStatus.TRIAL, BillingStatus.ACTIVE)
+
+# Golden-ratio sequence: consecutive page ids land far apart in the interval
+_PHASE_STEP = 0.6180339887498949
+
+
+def _phase_offset(page_id: int, interval_seconds: int) -> timedelta:
+    """Deterministic offset in [0, interval) that spreads pages evenly."""
+    return timedelta(seconds=((page_id * _PHASE_STEP) % 1.0) * interval_seconds)
+
+
+async def _competitor_plans(session: AsyncSession) -> dict[int, tuple[int, int | None]]:
+    """competitor_id → (interval seconds, page cap) from the best tier tracking it."""
+    result = await session.execute(
+        select(
+            ClientCompetitor.competitor_id,
+            SubscriptionTier.monitoring_frequency,
+            SubscriptionTier.max_monitored_pages,
+        )
+        .join(Client, Client.id == ClientCompetitor.client_id)
+        .join(SubscriptionTier, SubscriptionTier.id == Client.tier_id)
+        .where(
+            Client.is_active.is_(True),
+            Client.billing_status.in_(_SCHEDULING_BILLING),
+        )
+    )
+    plans: dict[int, tuple[int, int | None]] = {}
+    for competitor_id, frequency, max_pages in result.all():
+        interval = int(FREQUENCY_INTERVALS[frequency or DEFAULT_FREQUENCY].total_seconds())
+        best_interval, best_cap = plans.get(competitor_id, (interval, max_pages))
+        plans[competitor_id] = (min(best_interval, interval), max(best_cap, max_pages))
+    return plans
+
+
+async def refresh_schedule(session: AsyncSession, *, now: datetime | None = None) -> int:
+    """
+    Recompute interval / page cap of every active page and (re)schedule it.
+
+    - never scheduled: due now if never fetched, else at its phase offset
+    - interval shortened (tier upgrade): pulled forward to last fetch + new interval
+    - over the page cap: unscheduled
+
+    Returns the number of pages whose schedule changed. Does not commit.
+    """
+    now = now or datetime.now(timezone.utc)
+    plans = await _competitor_plans(session)
+    default_interval = int(FREQUENCY_INTERVALS[DEFAULT_FREQUENCY].total_seconds())
+
+    result = await session.execute(
+        select(
+            MonitoredPage.id,
+            MonitoredPage.competitor_id,
+            MonitoredPage.next_due_at,
+            MonitoredPage.crawl_interval_seconds,
+            MonitoredPage.last_fetched_at,
+        )
+        .where(MonitoredPage.is_active.is_(True))
+        # Homepage first, then oldest: the pages kept under a tier's cap
+        .order_by(
+            MonitoredPage.competitor_id,
+            (MonitoredPage.page_type != PageType.HOMEPAGE),
+            MonitoredPage.id,
+        )
+    )
+
+    changes: list[dict] = []
+    rank_in_competitor: dict[int, int] = {}
+    for page_id, competitor_id, next_due_at, current_interval, last_fetched_at in result.all():
+        interval, cap = plans.get(competitor_id, (default_interval, None))
+        rank = rank_in_competitor[competitor_id] = rank_in_competitor.get(competitor_id, 0) + 1
+
+        if cap is not None and rank > cap:
+            interval, due = None, None
+        elif next_due_at is None:
+            due = now if last_fetched_at is None else now + _phase_offset(page_id, interval)
+        elif current_interval is not None and interval < current_interval:
+            due = min(next_due_at, (last_fetched_at or now) + timedelta(seconds=interval))
+        else:
+            due = next_due_at
+
+        if interval != current_interval or due != next_due_at:
+            changes.append({"id": page_id, "crawl_interval_seconds": interval, "next_due_at": due})
+
+    if changes:
+        await session.execute(update(MonitoredPage), changes)
+        logger.info("Scheduler: %d pages rescheduled", len(changes))
+    return len(changes)
+
+
+async def claim_due_pages(
+    session: AsyncSession,
+    *,
+    limit: int,
+    now: datetime | None = None,
+) -> list[int]:
+    """
+    Claim up to ``limit`` due pages (earliest first) and advance their slot.
+
+    Rows locked by another claimer are skipped, not waited for. The new
+    ``next_due_at`` is the first slot of the page's grid after ``now``, so
+    a late tick does not shift the page's phase. Commit to release the locks.
+    """
+    now = now or datetime.now(timezone.utc)
+    due = (
+        select(MonitoredPage.id)
+        .where(
+            MonitoredPage.is_active.is_(True),
+            MonitoredPage.crawl_interval_seconds.is_not(None),
+            MonitoredPage.next_due_at <= now,
+        )
+        .order_by(MonitoredPage.next_due_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .cte("due_page")
+    )
+    elapsed_slots = func.floor(
+        func.extract("epoch", now - MonitoredPage.next_due_at) / MonitoredPage.crawl_interval_seconds
+    ) + 1
+    next_slot = MonitoredPage.next_due_at + func.make_interval(
+        0, 0, 0, 0, 0, 0, MonitoredPage.crawl_interval_seconds * elapsed_slots
+    )
+    result = await session.execute(
+        update(MonitoredPage)
+        .where(MonitoredPage.id == due.c.id)
+        .values(next_due_at=next_slot)
+        .returning(MonitoredPage.id)
+        .execution_options(synchronize_session=False)
+    )
+    return [page_id for (page_id,) in result.all()]
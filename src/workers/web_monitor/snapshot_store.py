@@ -0,0 +1,119 @@
+"""
+Raw HTML Snapshot Store — content-addressed, zstd-compressed.
+
+Every fetched document is stored once under the SHA-256 of its bytes:
+
+    <root>/ab/cd/abcd…ef.html.zst
+
+Identical pages across runs map to the same file, so months of history
+cost a fraction of the raw size. ``PageSnapshot.raw_storage_path`` holds
+the path relative to the store root, which makes it possible to replay
+extraction offline without re-fetching the site.
+
+Usage:
+    path = snapshot_store.put(html)
+    for chunk in snapshot_store.iter_chunks(path):
+        ...
+    html = snapshot_store.read_text(path)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import os
+import tempfile
+from collections.abc import Iterator
+from pathlib import Path
+
+import zstandard as zstd
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_SUFFIX = ".html.zst"
+_CHUNK_SIZE = 64 * 1024
+
+
+class SnapshotStore:
+    """Local content-addressed store for raw HTML documents."""
+
+    def __init__(self, root: str | Path | None = None, level: int | None = None) -> None:
+        self.root = Path(root or settings.snapshot_store_dir)
+        self.level = level if level is not None else settings.snapshot_zstd_level
+
+    # ── Addressing ─────────────────────────────────────────────────────
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def relative_path(digest: str) -> str:
+        """Fan out into 2 levels of directories to keep folders small."""
+        return f"{digest[:2]}/{digest[2:4]}/{digest}{_SUFFIX}"
+
+    def resolve(self, storage_path: str) -> Path:
+        return self.root / storage_path
+
+    # ── Writes ─────────────────────────────────────────────────────────
+
+    def put(self, html: str | bytes) -> str:
+        """
+        Store a document (deduplicated) and return its storage path.
+        Blocking (compression + disk I/O): call via asyncio.to_thread in async code.
+        """
+        data = html.encode("utf-8") if isinstance(html, str) else html
+        storage_path = self.relative_path(self.digest(data))
+        target = self.resolve(storage_path)
+
+        if target.exists():
+            return storage_path
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        compressed = zstd.ZstdCompressor(level=self.level).compress(data)
+
+        # Atomic write: concurrent writers of the same content never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(compressed)
+            os.replace(tmp_path, target)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+        logger.debug(
+            "Stored snapshot %s (%d → %d bytes)", storage_path, len(data), len(compressed)
+        )
+        return storage_path
+
+    # ── Reads ──────────────────────────────────────────────────────────
+
+    def exists(self, storage_path: str) -> bool:
+        return self.resolve(storage_path).exists()
+
+    def iter_chunks(self, storage_path: str, chunk_size: int = _CHUNK_SIZE) -> Iterator[bytes]:
+        """Stream the decompressed document without loading it fully in memory."""
+        with open(self.resolve(storage_path), "rb") as fh:
+            reader = zstd.ZstdDecompressor().stream_reader(fh)
+            while chunk := reader.read(chunk_size):
+                yield chunk
+
+    def open_text(self, storage_path: str, encoding: str = "utf-8") -> io.TextIOWrapper:
+        """Open the document as a streaming text file object (caller closes it)."""
+        fh = open(self.resolve(storage_path), "rb")
+        reader = zstd.ZstdDecompressor().stream_reader(fh, closefd=True)
+        return io.TextIOWrapper(reader, encoding=encoding, errors="replace")
+
+    def read_bytes(self, storage_path: str) -> bytes:
+        return b"".join(self.iter_chunks(storage_path))
+
+    def read_text(self, storage_path: str, encoding: str = "utf-8") -> str:
+        return self.read_bytes(storage_path).decode(encoding, errors="replace")
+
+
+# Singleton instance — import this everywhere
+snapshot_store = SnapshotStore()
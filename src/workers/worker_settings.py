@@ -7,7 +7,7 @@ Usage:
 
 from __future__ import annotations
 
-from arq import cron
+from arq import cron, func
 from arq.connections import RedisSettings
 
 import logging
@@ -17,11 +17,29 @@ logger = logging.getLogger(__name__)
 
 
 async def run_web_monitor(ctx: dict) -> None:
-    """ARQ job: Run the web monitor pipeline."""
+    """ARQ job: Run the web monitor pipeline over the pages that are due."""
     from workers.web_monitor.orchestrator import run_web_monitor as _run
     await _run(ctx)
 
 
+async def run_crawl_shard(ctx: dict, run_id: int, shard_index: int, page_ids: list[int]) -> None:
+    """ARQ job: Crawl one shard (group of competitors) of a web monitor run."""
+    from workers.web_monitor.orchestrator import run_crawl_shard as _run
+    await _run(ctx, run_id, shard_index, page_ids)
+
+
+async def finalize_crawl_run(ctx: dict, run_id: int) -> None:
+    """ARQ job: Close a web monitor run once all its shards are done."""
+    from workers.web_monitor.orchestrator import finalize_crawl_run as _run
+    await _run(ctx, run_id)
+
+
+async def sweep_stalled_runs(ctx: dict) -> None:
+    """ARQ cron: Close web monitor runs whose shards are overdue."""
+    from workers.web_monitor.orchestrator import sweep_stalled_runs as _run
+    await _run(ctx)
+
+
 async def run_newsletter_reader(ctx: dict) -> None:
     """ARQ job: Full Newsletter Monitor pipeline."""
     from core.database import async_session_factory
@@ -87,12 +105,63 @@ async def run_daily_brief(ctx: dict) -> None:
 
 async def startup(ctx: dict) -> None:
     """Called on worker startup."""
-    pass
+    from core.browser_pool import BrowserPool
+    from core.http_client import FetchClient
+    from workers.web_monitor.extraction_executor import ExtractionExecutor
+
+    # One pooled HTTP client per worker: keep-alive/TLS reuse across jobs
+    ctx["fetch_client"] = FetchClient()
+    await ctx["fetch_client"].start()
+    # One Chromium per worker, launched lazily on the first screenshot
+    ctx["browser_pool"] = BrowserPool()
+    # CPU-bound extraction off the event loop; processes spawned on first page
+    ctx["extraction_executor"] = ExtractionExecutor()
 
 
 async def shutdown(ctx: dict) -> None:
     """Called on worker shutdown."""
-    pass
+    fetch_client = ctx.pop("fetch_client", None)
+    if fetch_client is not None:
+        stats = fetch_client.stats()
+        logger.info(
+            "FetchClient closing: %d requests, reuse ratio %.0f%%",
+            stats["requests"], stats["reuse_ratio"] * 100,
+        )
+        await fetch_client.close()
+
+    browser_pool = ctx.pop("browser_pool", None)
+    if browser_pool is not None:
+        stats = browser_pool.stats()
+        logger.info(
+            "BrowserPool closing: %d screenshots, %d failures, p50 %.2fs",
+            stats["captures"], stats["failures"], stats["latency_p50_seconds"],
+        )
+        await browser_pool.close()
+
+    extraction_executor = ctx.pop("extraction_executor", None)
+    if extraction_executor is not None:
+        stats = extraction_executor.stats()
+        logger.info(
+            "ExtractionExecutor closing (%s): %d pages, %d failures, %.1fs CPU",
+            stats["mode"], stats["pages"], stats["failures"], stats["cpu_seconds"],
+        )
+        await extraction_executor.close()
+
+    from core.asset_uploader import asset_uploader
+
+    stats = asset_uploader.stats()
+    logger.info(
+        "Directus uploader closing: %d uploads, %d URL hits, %d hash hits, %d failures",
+        stats["uploads"], stats["url_hits"], stats["hash_hits"], stats["failures"],
+    )
+    await asset_uploader.close()
+
+
+def _web_monitor_cron():
+    """Due-queue ticks spread over the hour, or the legacy crawl-everything cron."""
+    if settings.crawl_schedule == "due":
+        return cron(run_web_monitor, minute=set(range(0, 60, settings.scheduler_tick_minutes)))
+    return cron(run_web_monitor, hour={0, 4, 8, 12, 16, 20})
 
 
 class WorkerSettings:
@@ -100,6 +169,11 @@ class WorkerSettings:
 
     functions = [
         run_web_monitor,
+        # Sized for a shard; not retried: a shard counts itself even when it is
+        # cut off, and the sweeper closes runs whose shards were lost
+        func(run_crawl_shard, timeout=settings.crawl_shard_timeout_seconds, max_tries=1),
+        finalize_crawl_run,
+        sweep_stalled_runs,
         run_newsletter_reader,
         run_daily_brief,
     ]
@@ -111,8 +185,10 @@ class WorkerSettings:
 
     # Cron schedule
     cron_jobs = [
-        # Web monitor: every 4 hours
-        cron(run_web_monitor, hour={0, 4, 8, 12, 16, 20}),
+        # Web monitor: scheduler tick (crawls only due pages) or every 4 hours
+        _web_monitor_cron(),
+        # Stalled crawl runs: every 15 minutes
+        cron(sweep_stalled_runs, minute={5, 20, 35, 50}),
         # Newsletter: every 6 hours
         cron(run_newsletter_reader, hour={6, 12, 18, 0}),
         # Daily brief: every day at 7 AM
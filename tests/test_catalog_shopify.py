@@ -0,0 +1,119 @@
+"""Shopify catalog harvester over recorded ``/products.json`` pages."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from workers.deep_crawl.catalog import shopify
+from workers.deep_crawl.catalog.shopify import ShopifyCatalogHarvester, parse_shopify_product
+from workers.web_monitor.extractors.shopify import ShopifyExtractor
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "shopify"
+# The recorded pages hold 2 products per page
+PAGE_SIZE = 2
+
+
+@pytest.fixture(autouse=True)
+def _small_pages(monkeypatch):
+    monkeypatch.setattr(shopify, "PAGE_SIZE", PAGE_SIZE)
+
+
+def _recorded(name: str) -> dict:
+    return json.loads((FIXTURES_DIR / name).read_text(encoding="utf-8"))
+
+
+async def _harvest(storefront, fetch_client, rate_limiter, **kwargs) -> list:
+    harvester = ShopifyCatalogHarvester(fetch_client, storefront.url, rate_limiter=rate_limiter, **kwargs)
+    return [product async for product in harvester.iter_products()]
+
+
+async def test_pages_until_a_short_page(storefront, fetch_client, rate_limiter):
+    storefront.add_fixture("/products.json?limit=2&page=1", "shopify/products_page1.json")
+    storefront.add_fixture("/products.json?limit=2&page=2", "shopify/products_page2.json")
+
+    products = await _harvest(storefront, fetch_client, rate_limiter)
+
+    assert [p.raw_metadata["handle"] for p in products] == [
+        "zapatilla-run-pro", "remera-dry-fit", "short-trail",
+    ]
+    # Page 2 has a single product: page 3 is never requested
+    assert storefront.requests == ["/products.json?limit=2&page=1", "/products.json?limit=2&page=2"]
+
+
+async def test_collections_yield_each_product_once(storefront, fetch_client, rate_limiter):
+    storefront.add_fixture("/collections/running/products.json?limit=2&page=1", "shopify/collection_running_page1.json")
+    storefront.add_fixture("/collections/running/products.json?limit=2&page=2", "shopify/collection_running_page2.json")
+    storefront.add_fixture("/collections/ofertas/products.json?limit=2&page=1", "shopify/collection_ofertas_page1.json")
+
+    products = await _harvest(storefront, fetch_client, rate_limiter, collections=["running", "ofertas"])
+
+    assert [p.raw_metadata["handle"] for p in products] == ["zapatilla-run-pro", "short-trail"]
+    assert products[0].source_url == f"{storefront.url}/collections/running/products.json"
+
+
+def test_compare_at_price_is_the_list_price():
+    raw = _recorded("products_page2.json")["products"][0]
+
+    product = parse_shopify_product(raw, "https://tienda.example.com")
+
+    assert (product.list_price, product.sale_price) == (49999.0, 34999.0)
+    assert (product.variants[0].list_price, product.variants[0].sale_price) == (49999.0, 34999.0)
+
+
+def test_no_compare_at_price_lists_the_charged_price():
+    raw = _recorded("products_page1.json")["products"][1]
+
+    product = parse_shopify_product(raw, "https://tienda.example.com")
+
+    assert (product.list_price, product.sale_price) == (19999.0, 19999.0)
+
+
+def test_headline_price_is_the_cheapest_variant_in_stock():
+    raw = _recorded("products_page1.json")["products"][0]
+
+    product = parse_shopify_product(raw, "https://tienda.example.com")
+
+    # Size 40 is cheaper but sold out
+    assert (product.list_price, product.sale_price) == (119999.0, 99999.0)
+    assert product.is_in_stock
+    assert [v.is_in_stock for v in product.variants] == [False, True, True]
+
+
+def test_headline_price_falls_back_to_the_cheapest_variant_when_sold_out():
+    raw = _recorded("products_page1.json")["products"][0]
+    for variant in raw["variants"]:
+        variant["available"] = False
+
+    product = parse_shopify_product(raw, "https://tienda.example.com")
+
+    assert product.sale_price == 89999.0
+    assert not product.is_in_stock
+
+
+@pytest.mark.parametrize(("page", "index"), [("products_page1.json", 0), ("products_page2.json", 0)])
+async def test_sku_matches_the_pdp_extractor(page, index):
+    raw = _recorded(page)["products"][index]
+    v0 = raw["variants"][0]
+    # The product's PDP: Shopify's JSON-LD carries the first variant's SKU
+    json_ld = {
+        "@context": "https://schema.org",
+        "@type": "Product",
+        "name": raw["title"],
+        "sku": v0["sku"],
+        "brand": {"@type": "Brand", "name": raw["vendor"]},
+        "offers": [{"@type": "Offer", "price": v0["price"], "priceCurrency": "ARS"}],
+    }
+    html = (
+        '<html><head><script type="application/ld+json">'
+        f"{json.dumps(json_ld)}</script></head><body><h1>{raw['title']}</h1></body></html>"
+    )
+    url = f"https://tienda.example.com/products/{raw['handle']}"
+
+    result = await ShopifyExtractor(html, {}, url).extract_all()
+    from_catalog = parse_shopify_product(raw, "https://tienda.example.com")
+
+    assert from_catalog.sku == result.products[0].sku == v0["sku"]
+    assert from_catalog.url == url
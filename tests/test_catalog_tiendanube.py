@@ -0,0 +1,80 @@
+"""Tiendanube catalog harvester over recorded storefront listing fragments."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from lxml import html as lxml_html
+
+from workers.deep_crawl.catalog.tiendanube import (
+    TiendanubeCatalogHarvester,
+    _installments,
+    parse_tiendanube_card,
+)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "tiendanube"
+BASE_URL = "https://www.tienda.example.com.ar"
+
+
+def _cards() -> list:
+    fragment = (FIXTURES_DIR / "listing_page1.html").read_text(encoding="utf-8")
+    return lxml_html.fromstring(f"<div>{fragment}</div>").xpath("//*[@data-variants]")
+
+
+async def test_pages_until_the_listing_ends(storefront, fetch_client, rate_limiter):
+    storefront.add_fixture("/productos/?results_only=true", "tiendanube/listing_page1.html", content_type="text/html")
+    # Page 2 comes wrapped in JSON, repeats a product and says it is the last one
+    storefront.add_fixture("/productos/page/2/?results_only=true", "tiendanube/listing_page2.json")
+    harvester = TiendanubeCatalogHarvester(fetch_client, storefront.url, rate_limiter=rate_limiter)
+
+    products = [product async for product in harvester.iter_products()]
+
+    assert [p.raw_metadata["tiendanube_product_id"] for p in products] == ["9001", "9002", "9003"]
+    assert storefront.requests == ["/productos/?results_only=true", "/productos/page/2/?results_only=true"]
+    assert harvester.stats()["pages"] == 2
+    # The Short Trail card has no name element: the image alt names it
+    assert products[2].title == "Short Trail"
+
+
+def test_card_variants_from_data_variants():
+    run, _remera = _cards()
+
+    product = parse_tiendanube_card(run, BASE_URL)
+
+    assert product.title == "Zapatilla Run Pro"
+    assert product.url == f"{BASE_URL}/productos/zapatilla-run-pro/"
+    assert product.sku == "RUN-PRO-40"
+    assert [(v.sku, v.title, v.is_in_stock) for v in product.variants] == [
+        ("RUN-PRO-40", "40", False), ("RUN-PRO-41", "41", True),
+    ]
+    assert [(v.list_price, v.sale_price) for v in product.variants] == [
+        (119999.0, 89999.0), (119999.0, 99999.0),
+    ]
+    # Size 40 is cheaper but sold out
+    assert (product.list_price, product.sale_price) == (119999.0, 99999.0)
+    assert product.images == ["https://d3ugyf2ht6aenh.cloudfront.net/stores/001/234/products/9001-480-0.jpg"]
+    assert product.installments == "6 cuotas de $14999.83"
+
+
+def test_card_without_sku_or_compare_at_price():
+    _run, remera = _cards()
+
+    product = parse_tiendanube_card(remera, BASE_URL)
+
+    assert product.sku == "90021"
+    assert (product.list_price, product.sale_price) == (19999.0, 19999.0)
+    assert product.variants[0].title == "Único"
+
+
+def test_card_with_broken_data_variants_is_skipped():
+    card = lxml_html.fromstring('<div data-variants="[{&quot;id&quot;: 1,"><a href="/productos/x/">X</a></div>')
+
+    assert parse_tiendanube_card(card, BASE_URL) is None
+
+
+def test_installments_take_the_longest_plan():
+    plans = '{"mercadopago": {"3": {"installment_value": 100}, "12": {"installment_value": 25.5}}}'
+
+    assert _installments({"installments_data": plans}) == "12 cuotas de $25.5"
+    assert _installments({"installments_data": '{"mercadopago": {"1": {"installment_value": 300}}}'}) is None
+    assert _installments({"installments_data": "not json"}) is None
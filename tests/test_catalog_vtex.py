@@ -0,0 +1,131 @@
+"""VTEX catalog harvester over recorded catalog search pages."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import pytest
+
+from workers.deep_crawl.catalog import vtex
+from workers.deep_crawl.catalog.vtex import (
+    CATEGORY_TREE_PATH,
+    SEARCH_PATH,
+    VtexCatalogHarvester,
+    _parse_total,
+    parse_vtex_product,
+)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "vtex"
+# The recorded store: 2 products per page, nothing served past the 4th result
+PAGE_SIZE = 2
+RESULT_WINDOW = 4
+
+
+@pytest.fixture(autouse=True)
+def _small_window(monkeypatch):
+    monkeypatch.setattr(vtex, "PAGE_SIZE", PAGE_SIZE)
+    monkeypatch.setattr(vtex, "RESULT_WINDOW", RESULT_WINDOW)
+
+
+def _recorded(name: str) -> list:
+    return json.loads((FIXTURES_DIR / name).read_text(encoding="utf-8"))
+
+
+def _search_target(start: int, fq: str | None = None, order: str | None = None) -> str:
+    params: dict[str, str | int] = {"_from": start, "_to": start + PAGE_SIZE - 1}
+    if fq:
+        params["fq"] = fq
+    if order:
+        params["O"] = order
+    return f"{SEARCH_PATH}?{urlencode(params)}"
+
+
+def _serve_search(storefront, name: str, total: int, start: int, fq=None, order=None) -> None:
+    count = len(_recorded(name))
+    storefront.add_fixture(
+        _search_target(start, fq, order),
+        f"vtex/{name}",
+        headers={"resources": f"{start}-{start + count - 1}/{total}"},
+    )
+
+
+async def _harvest(storefront, fetch_client, rate_limiter) -> list:
+    harvester = VtexCatalogHarvester(fetch_client, storefront.url, rate_limiter=rate_limiter)
+    return [product async for product in harvester.iter_products()]
+
+
+async def test_splits_facets_past_the_result_window(storefront, fetch_client, rate_limiter):
+    storefront.add_fixture(f"{CATEGORY_TREE_PATH}/5", "vtex/category_tree.json")
+    # 11 products: over the window, split by category
+    _serve_search(storefront, "catalog_0.json", 11, 0)
+    # Running (9): over the window, split into its subcategories
+    _serve_search(storefront, "c1_0.json", 9, 0, "C:/1/")
+    _serve_search(storefront, "c1_10_0.json", 3, 0, "C:/1/10/")
+    _serve_search(storefront, "c1_10_2.json", 3, 2, "C:/1/10/")
+    # Running > Remeras (6): a leaf over the window, read from both price ends
+    _serve_search(storefront, "c1_11_0.json", 6, 0, "C:/1/11/")
+    _serve_search(storefront, "c1_11_asc_0.json", 6, 0, "C:/1/11/", "OrderByPriceASC")
+    _serve_search(storefront, "c1_11_asc_2.json", 6, 2, "C:/1/11/", "OrderByPriceASC")
+    _serve_search(storefront, "c1_11_desc_0.json", 6, 0, "C:/1/11/", "OrderByPriceDESC")
+    _serve_search(storefront, "c1_11_desc_2.json", 6, 2, "C:/1/11/", "OrderByPriceDESC")
+    # Outdoor (2): within the window
+    _serve_search(storefront, "c2_0.json", 2, 0, "C:/2/")
+
+    products = await _harvest(storefront, fetch_client, rate_limiter)
+
+    assert [p.sku for p in products] == [
+        "1001", "1002", "1003",                # Zapatillas, paged
+        "1101", "1102", "1103", "1104",        # Remeras, cheapest first
+        "1106", "1105",                        # Remeras, priciest first (overlap dropped)
+        "2001", "2002",                        # Outdoor
+    ]
+    assert products[-1].source_url == f"{storefront.url}{_search_target(0, 'C:/2/')}"
+    searches = [urlsplit(target) for target in storefront.requests if target.startswith(SEARCH_PATH)]
+    # Never asks for a range VTEX would refuse, and never a route that is not recorded
+    assert all(int(parse_qs(url.query)["_to"][0]) < RESULT_WINDOW for url in searches)
+    assert set(storefront.requests) <= set(storefront.routes)
+    assert storefront.requests.count(f"{CATEGORY_TREE_PATH}/5") == 1
+
+
+async def test_catalog_within_the_window_is_paged(storefront, fetch_client, rate_limiter):
+    _serve_search(storefront, "c1_10_0.json", 3, 0)
+    _serve_search(storefront, "c1_10_2.json", 3, 2)
+
+    products = await _harvest(storefront, fetch_client, rate_limiter)
+
+    assert [p.sku for p in products] == ["1001", "1002", "1003"]
+    # No category tree needed
+    assert storefront.requests == [_search_target(0), _search_target(2)]
+
+
+def test_headline_price_skips_skus_out_of_stock():
+    raw = _recorded("c1_10_0.json")[0]
+
+    product = parse_vtex_product(raw, "https://www.nortesport.com.ar")
+
+    # Size 40 is the cheapest but has no stock
+    assert (product.list_price, product.sale_price) == (119999.0, 99999.0)
+    assert [v.is_in_stock for v in product.variants] == [False, True, True]
+    assert product.is_in_stock
+
+
+def test_product_fields():
+    raw = _recorded("c1_10_0.json")[0]
+
+    product = parse_vtex_product(raw, "https://www.nortesport.com.ar")
+
+    assert product.url == "https://www.nortesport.com.ar/zapatilla-run-pro/p"
+    assert product.category_tree == ["Running", "Zapatillas"]
+    assert [v.sku for v in product.variants] == ["10011", "10012", "10013"]
+    assert product.installments == "6 cuotas de $14999.83"
+    assert product.badges == ["Envío gratis"]
+
+
+@pytest.mark.parametrize(
+    ("header", "total"),
+    [("0-49/1234", 1234), ("0-0/0", 0), (None, None), ("", None), ("0-49/x", None)],
+)
+def test_parse_total(header, total):
+    assert _parse_total(header) == total
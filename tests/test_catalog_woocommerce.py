@@ -0,0 +1,113 @@
+"""WooCommerce catalog harvester over recorded Store API pages."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from workers.deep_crawl.catalog import woocommerce
+from workers.deep_crawl.catalog.woocommerce import (
+    STORE_API_PATH,
+    WooCommerceCatalogHarvester,
+    _money,
+    parse_woocommerce_product,
+    parse_woocommerce_variation,
+)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "woocommerce"
+# The recorded pages hold 2 items per page
+PAGE_SIZE = 2
+
+
+@pytest.fixture(autouse=True)
+def _small_pages(monkeypatch):
+    monkeypatch.setattr(woocommerce, "PAGE_SIZE", PAGE_SIZE)
+
+
+def _recorded(name: str) -> list:
+    return json.loads((FIXTURES_DIR / name).read_text(encoding="utf-8"))
+
+
+def _listing(page: int, product_type: str | None = None) -> str:
+    target = f"{STORE_API_PATH}?per_page={PAGE_SIZE}&page={page}"
+    return f"{target}&type={product_type}" if product_type else target
+
+
+@pytest.fixture
+def store(storefront):
+    storefront.add_fixture(_listing(1, "variation"), "woocommerce/variations_page1.json")
+    storefront.add_fixture(_listing(2, "variation"), "woocommerce/variations_page2.json")
+    storefront.add_fixture(_listing(1), "woocommerce/products_page1.json")
+    storefront.add_fixture(_listing(2), "woocommerce/products_page2.json")
+    return storefront
+
+
+async def test_variations_are_read_first_and_attached(store, fetch_client, rate_limiter):
+    harvester = WooCommerceCatalogHarvester(fetch_client, store.url, rate_limiter=rate_limiter)
+
+    products = [product async for product in harvester.iter_products()]
+
+    assert store.requests == [
+        _listing(1, "variation"), _listing(2, "variation"), _listing(1), _listing(2),
+    ]
+    assert [p.sku for p in products] == ["BUZO", "MED-01", "504"]
+    buzo = products[0]
+    assert [(v.sku, v.title) for v in buzo.variants] == [
+        ("BUZO-S", "Talle: S"), ("BUZO-M", "Talle: M"), ("5013", "L"),
+    ]
+    assert [p.variants for p in products[1:]] == [[], []]
+    assert buzo.source_url == f"{store.url}{STORE_API_PATH}"
+
+
+@pytest.mark.parametrize(
+    ("prices", "amount"),
+    [
+        ({"price": "129900", "currency_minor_unit": 2}, 1299.0),
+        ({"price": "15000", "currency_minor_unit": 0}, 15000.0),
+        ({"price": "15000"}, 15000.0),
+        ({"price": ""}, None),
+    ],
+)
+def test_money_uses_the_currency_minor_unit(prices, amount):
+    assert _money(prices, "price") == amount
+
+
+def test_simple_product_prices_in_major_units():
+    medias, = (raw for raw in _recorded("products_page1.json") if raw["id"] == 503)
+
+    product = parse_woocommerce_product(medias)
+
+    assert (product.list_price, product.sale_price) == (1499.0, 1299.0)
+    assert product.currency == "ARS"
+    assert product.description == "Pack de tres pares."
+
+
+def test_variable_product_headline_from_the_cheapest_variation_in_stock():
+    raw_variations = _recorded("variations_page1.json") + _recorded("variations_page2.json")
+    variants = [parse_woocommerce_variation(raw) for raw in raw_variations]
+    buzo, = (raw for raw in _recorded("products_page1.json") if raw["id"] == 501)
+
+    product = parse_woocommerce_product(buzo, variants)
+
+    # Size S is the cheapest (its price is the product's own "price") but sold out
+    assert (product.list_price, product.sale_price) == (59990.0, 49990.0)
+    assert [(v.list_price, v.sale_price, v.is_in_stock) for v in product.variants] == [
+        (59990.0, 45990.0, False), (59990.0, 49990.0, True), (59990.0, 59990.0, True),
+    ]
+    assert product.title == "Buzo Canguro & Capucha"
+    assert product.category_tree == ["Buzos & Camperas"]
+    assert product.brand == "Nortesport"
+    assert product.images == ["https://tienda.example.com.ar/wp-content/uploads/buzo.jpg"]
+    assert (product.rating, product.review_count, product.badges) == (4.5, 12, ["Oferta"])
+
+
+def test_product_without_variations_keeps_its_own_prices():
+    gorra, = _recorded("products_page2.json")
+
+    product = parse_woocommerce_product(gorra)
+
+    assert product.sku == "504"
+    assert (product.list_price, product.sale_price) == (15000.0, 15000.0)
+    assert not product.is_in_stock
@@ -0,0 +1,26 @@
+"""VtexStateIndex offer and installment resolution."""
+
+from __future__ import annotations
+
+from workers.web_monitor.extractors.vtex import VtexStateIndex
+
+
+def _seller(price: float, *plans: tuple[int, float]) -> dict:
+    return {
+        "commertialOffer": {
+            "Price": price,
+            "ListPrice": price,
+            "AvailableQuantity": 1,
+            "Installments": [{"NumberOfInstallments": n, "Value": value} for n, value in plans],
+        }
+    }
+
+
+def test_installments_take_the_longest_plan_across_sellers():
+    sku = {"itemId": "1", "sellers": [_seller(1200.0, (1, 1200.0), (12, 100.0)), _seller(1200.0, (3, 400.0))]}
+
+    assert VtexStateIndex({}).sku_installments(sku) == "12 cuotas de $100.0"
+
+
+def test_installments_without_plans():
+    assert VtexStateIndex({}).sku_installments({"itemId": "1", "sellers": [_seller(1200.0)]}) is None